@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+
+import requests
+import streamlit as st
+
+# ---------------------------------------------------------------------------
+# Client HTTP de l'API Iris pour app.py
+# Streamlit réexécute tout le script à chaque mouvement de slider :
+# la session (connexions keep-alive), l'état de l'API et les prédictions
+# déjà faites sont gardés en cache pour ne pas rappeler l'API à chaque fois.
+# La session partagée et les durées de cache viennent du client du dashboard
+# de la VersionNrt_0.0.2 (frontend/api_client.py) : seuls les appels propres
+# à l'API Iris sont écrits ici.
+# ---------------------------------------------------------------------------
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "VersionNrt_0.0.2"))
+
+from frontend.api_client import (  # noqa: E402
+    HEALTH_TIMEOUT,
+    HEALTH_TTL,
+    PREDICTION_CACHE_ENTRIES,
+    PREDICTION_TTL,
+    get_session,
+)
+
+# URL de l'API FastAPI (par défaut localhost:8000)
+API_URL = "http://127.0.0.1:8000"
+
+# Délais maximum (en secondes) : (connexion, réponse)
+TIMEOUT = (3.05, 5)
+
+
+@st.cache_data(ttl=HEALTH_TTL, show_spinner=False)
+def api_is_up(base_url=API_URL):
+    """True si GET / répond 200 ; le résultat est gardé HEALTH_TTL secondes."""
+    try:
+        return get_session(base_url).get(f"{base_url}/", timeout=HEALTH_TIMEOUT).status_code == 200
+    except requests.RequestException:
+        return False
+
+
+@st.cache_data(ttl=PREDICTION_TTL, max_entries=PREDICTION_CACHE_ENTRIES, show_spinner=False)
+def predict(sepal_length, sepal_width, petal_length, petal_width, base_url=API_URL):
+    """
+    Demande la classe prédite à GET /predict (mémorisée pour ces mesures exactes).
+
+    Une erreur (API injoignable, délai dépassé, code d'erreur) lève une
+    requests.RequestException et n'est jamais mise en cache.
+    """
+    params = {
+        "sepal_length": sepal_length,
+        "sepal_width": sepal_width,
+        "petal_length": petal_length,
+        "petal_width": petal_width,
+    }
+    response = get_session(base_url).get(f"{base_url}/predict", params=params, timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.json()
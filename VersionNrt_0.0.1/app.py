@@ -1,6 +1,9 @@
 import streamlit as st
 import requests
 
+# Session HTTP partagée, test de connexion et prédictions en cache (api_client.py)
+from api_client import api_is_up, predict
+
 # ---------------------------------------------------------------------------
 # Configuration de la page
 # ---------------------------------------------------------------------------
@@ -10,11 +13,6 @@ st.set_page_config(
     layout="centered",
 )
 
-# ---------------------------------------------------------------------------
-# URL de l'API FastAPI (par défaut localhost:8000)
-# ---------------------------------------------------------------------------
-API_URL = "http://127.0.0.1:8000"
-
 # ---------------------------------------------------------------------------
 # Mapping des classes Iris
 # ---------------------------------------------------------------------------
@@ -113,13 +111,8 @@ st.markdown(
 # ---------------------------------------------------------------------------
 # Vérification de la connexion API
 # ---------------------------------------------------------------------------
-api_ok = False
-try:
-    resp = requests.get(f"{API_URL}/", timeout=3)
-    if resp.status_code == 200:
-        api_ok = True
-except Exception:
-    pass
+# Le résultat est gardé quelques secondes : déplacer un slider ne rappelle pas l'API
+api_ok = api_is_up()
 
 if api_ok:
     st.markdown(
@@ -168,14 +161,8 @@ if predict_btn:
     else:
         with st.spinner("Envoi des données à l'API..."):
             try:
-                params = {
-                    "sepal_length": sepal_length,
-                    "sepal_width": sepal_width,
-                    "petal_length": petal_length,
-                    "petal_width": petal_width,
-                }
-                response = requests.get(f"{API_URL}/predict", params=params, timeout=5)
-                result = response.json()
+                # Les mêmes mesures déjà demandées sont servies depuis le cache
+                result = predict(sepal_length, sepal_width, petal_length, petal_width)
 
                 prediction = result.get("prediction", -1)
                 iris_info = IRIS_CLASSES.get(prediction, {
@@ -0,0 +1,281 @@
+# ============================================================
+# Fichier de l'arbre de décision "compilé"
+# Pour chaque GET /predict, main.py appelait scaler.transform puis
+# model.predict sur un tableau 1x4 : deux passages de validation
+# scikit-learn pour une poignée de comparaisons.
+#
+# Ce fichier exporte l'arbre dans un petit fichier iris_tree.npz :
+#   - la normalisation (moyenne / écart-type de scaler.joblib) est
+#     intégrée dans les seuils : on compare directement les mesures
+#     brutes, sans StandardScaler
+#   - l'arbre est mis à plat dans des tableaux contigus
+#     (feature, threshold, left, right, value)
+# et calcule les prédictions en parcourant l'arbre niveau par niveau
+# pour tout un lot de lignes à la fois.
+#
+# Les prédictions sont identiques à celles de scaler + model, pour
+# toute valeur (voir fold_thresholds).
+#
+# Utilisation (depuis VersionNrt_0.0.1/, après chaque entraînement) :
+#   python compiled_tree.py      # écrit iris_tree.npz et vérifie les prédictions
+# ============================================================
+
+import hashlib
+import logging
+import sys
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent
+TREE_PATH = BASE_DIR / 'iris_tree.npz'
+MODEL_PATH = BASE_DIR / 'model.joblib'
+SCALER_PATH = BASE_DIR / 'scaler.joblib'
+
+
+def source_version(model_path=MODEL_PATH, scaler_path=SCALER_PATH):
+    """Empreinte SHA-256 (12 caractères) de model.joblib + scaler.joblib (lus comme fichiers, sans les charger)."""
+    digest = hashlib.sha256()
+    for path in (model_path, scaler_path):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def _ordered(values):
+    """Float64 -> entiers dans le même ordre (pour une recherche dichotomique sur tous les float64)."""
+    bits = values.view(np.int64)
+    return np.where(bits < 0, np.int64(-0x8000000000000000) - bits, bits)
+
+
+def _unordered(keys):
+    """Inverse de _ordered."""
+    bits = np.where(keys < 0, np.int64(-0x8000000000000000) - keys, keys)
+    return bits.view(np.float64)
+
+
+def fold_thresholds(feature, threshold, mean, scale):
+    """
+    Calcule, pour chaque nœud, le seuil sur la mesure brute équivalent au seuil appris.
+
+    scikit-learn teste float32((x - mean) / scale) <= threshold : le calcul est fait en float64
+    par le StandardScaler, puis l'arbre convertit en float32. Cette fonction de x est croissante,
+    donc le test est vrai exactement pour x <= T, où T est le plus grand float64 qui passe le test.
+    T est trouvé par dichotomie sur tous les float64 (64 étapes) : le simple calcul
+    threshold * scale + mean se tromperait sur les valeurs proches du seuil.
+
+    Args:
+        feature (np.ndarray): La mesure testée par chaque nœud
+        threshold (np.ndarray): Le seuil appris (sur les valeurs normalisées)
+        mean (np.ndarray): scaler.mean_
+        scale (np.ndarray): scaler.scale_
+
+    Returns:
+        np.ndarray: Les seuils sur les mesures brutes (float64)
+    """
+    m, s = mean[feature], scale[feature]
+
+    def passes(x):
+        # Les très grandes valeurs deviennent +-inf en float32, comme dans scikit-learn
+        with np.errstate(over="ignore"):
+            return ((x - m) / s).astype(np.float32).astype(np.float64) <= threshold
+
+    # Bornes de départ : -1e300 passe toujours le test (-inf en float32), 1e300 jamais
+    low = _ordered(np.full(len(feature), -1e300))
+    high = _ordered(np.full(len(feature), 1e300))
+    # (low + high) // 2 sans dépasser les int64 : high - low peut valoir plus de 2**63
+    while (low + 1 < high).any():
+        middle = low // 2 + high // 2 + (low % 2 + high % 2) // 2
+        ok = passes(_unordered(middle))
+        low = np.where(ok, middle, low)
+        high = np.where(ok, high, middle)
+    return _unordered(low)
+
+
+def export(model, scaler, version=None):
+    """
+    Met à plat l'arbre entraîné, avec la normalisation intégrée dans les seuils.
+
+    Les feuilles pointent sur elles-mêmes (seuil +inf) : le parcours peut faire
+    toujours le même nombre de niveaux, les lignes arrivées à une feuille n'en bougent plus.
+
+    Args:
+        model (DecisionTreeClassifier): L'arbre entraîné sur les mesures normalisées
+        scaler (StandardScaler): Le scaler du notebook
+        version (str): L'empreinte des fichiers d'origine (source_version)
+
+    Returns:
+        dict: Les tableaux à enregistrer dans iris_tree.npz
+    """
+    tree = model.tree_
+    nodes = np.arange(tree.node_count)
+    leaf = tree.children_left < 0
+    feature = np.where(leaf, 0, tree.feature).astype(np.int32)
+    threshold = np.full(tree.node_count, np.inf)
+    threshold[~leaf] = fold_thresholds(
+        feature[~leaf], tree.threshold[~leaf], scaler.mean_.astype(np.float64), scaler.scale_.astype(np.float64)
+    )
+    value = tree.value[:, 0, :]
+    return {
+        "feature": feature,
+        "threshold": threshold,
+        "left": np.where(leaf, nodes, tree.children_left).astype(np.int32),
+        "right": np.where(leaf, nodes, tree.children_right).astype(np.int32),
+        # Proportion de chaque classe dans le nœud (la prédiction est la plus fréquente)
+        "value": value / value.sum(axis=1, keepdims=True),
+        "classes": model.classes_,
+        "depth": np.array(model.get_depth()),
+        "n_features": np.array(scaler.n_features_in_),
+        "version": np.array(version or ""),
+    }
+
+
+class CompiledTree:
+    """
+    Arbre de décision à plat, sur les mesures brutes (sans StandardScaler).
+
+    - predict : parcours vectorisé, niveau par niveau, pour un lot de lignes
+    - predict_one : parcours en Python pur pour une seule ligne (GET /predict),
+      sans le coût fixe des appels NumPy
+    """
+
+    def __init__(self, arrays):
+        """
+        Args:
+            arrays (dict): Les tableaux produits par export (ou lus depuis iris_tree.npz)
+        """
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.classes = arrays["classes"]
+        self.depth = int(arrays["depth"])
+        self.n_features = int(arrays["n_features"])
+        self.version = str(arrays["version"])
+        # Enfants côte à côte : l'enfant de node est _children[2 * node + (va à droite)]
+        self._children = np.stack([self.left, self.right], axis=1).ravel().astype(np.intp)
+        self._feature = self.feature.astype(np.intp)
+        # Classe prédite par chaque nœud (en cas d'égalité, la première, comme scikit-learn)
+        self.labels = self.classes[self.value.argmax(axis=1)]
+        # Copies en listes Python pour predict_one
+        self._nodes = list(zip(
+            self.feature.tolist(), self.threshold.tolist(), self.left.tolist(), self.right.tolist()
+        ))
+        self._labels = self.labels.tolist()
+
+    @classmethod
+    def load(cls, path=TREE_PATH):
+        """Charge iris_tree.npz (sans pickle)."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls({name: data[name] for name in data.files})
+
+    def save(self, path=TREE_PATH):
+        """Écrit les tableaux dans un fichier .npz."""
+        np.savez(path, feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+                 value=self.value, classes=self.classes, depth=self.depth, n_features=self.n_features,
+                 version=self.version)
+
+    def _check(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"{self.n_features} mesures attendues par ligne, reçu un tableau {X.shape}")
+        # Comme scikit-learn : pas de NaN ni d'infini
+        if not np.isfinite(X).all():
+            raise ValueError("Les mesures doivent être des nombres finis")
+        return X
+
+    def leaves(self, X):
+        """Retourne la feuille atteinte par chaque ligne (parcours niveau par niveau)."""
+        X = np.ascontiguousarray(self._check(X))
+        # Indices dans X.ravel() : une seule indexation par niveau au lieu de X[lignes, colonnes]
+        flat = X.ravel()
+        offsets = np.arange(len(X), dtype=np.intp) * self.n_features
+        node = np.zeros(len(X), dtype=np.intp)
+        for _ in range(self.depth):
+            go_right = flat[offsets + self._feature[node]] > self.threshold[node]
+            node = self._children[2 * node + go_right]
+        return node
+
+    def predict(self, X):
+        """Classe prédite pour chaque ligne de X (n, 4), identique à model.predict(scaler.transform(X))."""
+        return self.labels[self.leaves(X)]
+
+    def predict_proba(self, X):
+        """Proportion de chaque classe dans la feuille atteinte, identique à model.predict_proba."""
+        return self.value[self.leaves(X)]
+
+    def predict_one(self, *measures):
+        """Classe prédite pour une seule ligne (les 4 mesures en arguments)."""
+        if len(measures) != self.n_features:
+            raise ValueError(f"{self.n_features} mesures attendues, reçu {len(measures)}")
+        if not all(np.isfinite(measures)):
+            raise ValueError("Les mesures doivent être des nombres finis")
+        node = 0
+        for _ in range(self.depth):
+            feature, threshold, left, right = self._nodes[node]
+            node = left if measures[feature] <= threshold else right
+        return self._labels[node]
+
+
+def compile_tree(model_path=MODEL_PATH, scaler_path=SCALER_PATH):
+    """Charge model.joblib + scaler.joblib (scikit-learn) et retourne l'arbre compilé."""
+    import joblib
+
+    model, scaler = joblib.load(model_path), joblib.load(scaler_path)
+    return CompiledTree(export(model, scaler, source_version(model_path, scaler_path)))
+
+
+def load_tree(path=TREE_PATH, model_path=MODEL_PATH, scaler_path=SCALER_PATH):
+    """
+    Charge l'arbre compilé utilisé par main.py.
+
+    Si iris_tree.npz est absent ou ne correspond plus aux fichiers du notebook
+    (modèle réentraîné sans relancer l'export), l'arbre est recompilé en mémoire
+    depuis les fichiers joblib : l'API ne répond jamais avec un ancien modèle.
+    """
+    if path.exists():
+        tree = CompiledTree.load(path)
+        if not model_path.exists() or tree.version == source_version(model_path, scaler_path):
+            return tree
+        logger.warning("%s ne correspond plus à %s : lancer python compiled_tree.py", path.name, model_path.name)
+    return compile_tree(model_path, scaler_path)
+
+
+def verify(tree, model_path=MODEL_PATH, scaler_path=SCALER_PATH, rows=200_000, seed=0):
+    """
+    Compare l'arbre compilé à scaler + model sur des mesures aléatoires et sur les valeurs
+    qui entourent chaque seuil (le float64 juste avant, le seuil, le float64 juste après).
+
+    Returns:
+        int: Le nombre de lignes dont la prédiction diffère (0 attendu)
+    """
+    import joblib
+
+    model, scaler = joblib.load(model_path), joblib.load(scaler_path)
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0.0, 8.0, size=(rows, tree.n_features))
+    # Lignes placées exactement autour des seuils de chaque nœud
+    internal = np.isfinite(tree.threshold)
+    edges = []
+    for feature, threshold in zip(tree.feature[internal], tree.threshold[internal]):
+        for value in (np.nextafter(threshold, -np.inf), threshold, np.nextafter(threshold, np.inf)):
+            row = X[rng.integers(rows)].copy()
+            row[feature] = value
+            edges.append(row)
+    X = np.vstack([X, *edges])
+    expected = model.predict(scaler.transform(X))
+    return int((tree.predict(X) != expected).sum())
+
+
+if __name__ == "__main__":
+    import warnings
+
+    warnings.filterwarnings("ignore", category=UserWarning)
+    tree = compile_tree()
+    tree.save()
+    differences = verify(tree)
+    print(f"{TREE_PATH.name} : {len(tree.feature)} nœuds, profondeur {tree.depth}, version {tree.version}")
+    print(f"Prédictions différentes de scaler + model : {differences}")
+    sys.exit(1 if differences else 0)
@@ -1,14 +1,60 @@
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
 import pandas as pd
-import joblib
-import numpy as np
 from fastapi import FastAPI, Query
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 import uvicorn
 
-app = FastAPI()
+# Les fichiers du modèle sont cherchés à côté de main.py, quel que soit le dossier de lancement
+BASE_DIR = Path(__file__).resolve().parent
+# Les briques communes aux deux API (exécuteur d'inférence, cache de prédictions, métriques)
+# ne sont écrites qu'une fois, dans VersionNrt_0.0.2/app/services/ : ce dossier passe en tête du chemin d'import
+# (avant app.py, l'interface Streamlit de ce dossier, qui masquerait le paquet app)
+sys.path.insert(0, str(BASE_DIR.parent / "VersionNrt_0.0.2"))
+
+from app.services.cache import PredictionCache  # noqa: E402
+from app.services.executor import InferenceExecutor  # noqa: E402
+from app.services.metrics import metrics, mark, TimedRoute, MetricsMiddleware  # noqa: E402
+from compiled_tree import load_tree  # noqa: E402
+# Arbre compilé (normalisation intégrée aux seuils), produit par : python compiled_tree.py
+TREE_PATH = BASE_DIR / 'iris_tree.npz'
+MODEL_PATH = BASE_DIR / 'model.joblib'
+SCALER_PATH = BASE_DIR / 'scaler.joblib'
+
+# Nombre maximal de prédictions gardées en cache (0 = cache désactivé)
+PREDICTION_CACHE_SIZE = 10_000
+
+# Où tourne le calcul du modèle : "inline" (boucle asyncio), "thread" (pool de threads dédié)
+# ou "process" (pool de processus ; chaque processus charge le modèle en important ce fichier)
+INFERENCE_EXECUTOR = "thread"
+INFERENCE_WORKERS = 2
+
+# Remplace model.joblib + scaler.joblib : mêmes prédictions, sans scikit-learn à chaque appel
+tree = load_tree(TREE_PATH, MODEL_PATH, SCALER_PATH)
+
+# La version du modèle invalide le cache : un autre modèle ne réutilise jamais les anciens résultats
+# (c'est l'empreinte de model.joblib + scaler.joblib, gardée dans iris_tree.npz)
+model_version = tree.version
+cache = PredictionCache(PREDICTION_CACHE_SIZE)
+executor = InferenceExecutor(INFERENCE_EXECUTOR, INFERENCE_WORKERS)
+# Famille propre à cette API, ajoutée au registre partagé
+metrics.histogram("model_stage_seconds", "Durée des étapes du calcul du modèle (predict)", ("stage",))
 
-model = joblib.load('Nirintsoa0.0.1/model.joblib')
-scaler = joblib.load('Nirintsoa0.0.1/scaler.joblib')
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    executor.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+# Les routes déclarées ci-dessous mesurent la durée de leurs étapes (voir GET /metrics)
+app.router.route_class = TimedRoute
+app.add_middleware(MetricsMiddleware)
 
 class Irisinput(BaseModel):
     sepal_length: float
@@ -16,21 +62,80 @@ class Irisinput(BaseModel):
     petal_length: float
     petal_width: float
 
+
+def _predict(sepal_length, sepal_width, petal_length, petal_width):
+    # Les durées sont enregistrées par le thread qui calcule (en mode "process",
+    # elles restent dans le processus du pool et n'apparaissent pas dans /metrics)
+    # La normalisation est intégrée aux seuils de l'arbre : il n'y a plus d'étape "scale"
+    start = time.perf_counter()
+    prediction = int(tree.predict_one(sepal_length, sepal_width, petal_length, petal_width))
+    metrics.observe("model_stage_seconds", time.perf_counter() - start, "predict")
+    return prediction
+
+
+def _to_tenths(value):
+    """Retourne la mesure en dixièmes si elle tombe sur le pas de 0.1, sinon None."""
+    tenths = round(value * 10)
+    return tenths if tenths / 10 == value else None
+
 @app.get("/")
 def home():
     return {"message": "Bienvenue dans mon API"}
 
 @app.get('/predict')
-def predict_iris(
+async def predict_iris(
     sepal_length: float = Query(..., description="Longueur du sépale"),
     sepal_width: float = Query(..., description="Largeur du sépale"),
     petal_length: float = Query(..., description="Longueur du pétale"),
     petal_width: float = Query(..., description="Largeur du pétale"),
 ):
-    input_data = np.array([[sepal_length, sepal_width, petal_length, petal_width]])
-    new_data = scaler.transform(input_data)
-    prediction = model.predict(new_data)[0]
-    return {'prediction': int(prediction)}
+    mark("validate")
+    measures = (sepal_length, sepal_width, petal_length, petal_width)
+    # Seules les valeurs sur le pas de 0.1 (celui des sliders) passent par le cache :
+    # les autres gardent leur précision
+    key = tuple(_to_tenths(value) for value in measures)
+    cacheable = None not in key
+
+    prediction = cache.get(key, model_version) if cacheable else None
+    mark("lookup")
+    if prediction is None:
+        prediction = await executor.run(_predict, *measures)
+        if cacheable:
+            cache.put(key, prediction, model_version)
+        mark("inference")
+    return {'prediction': prediction}
+
+
+@app.get('/cache/stats')
+def cache_stats():
+    return cache.stats()
+
+
+@app.get('/executor/stats')
+def executor_stats():
+    return executor.stats()
+
+
+def collect_state():
+    """Version du modèle, cache et exécuteur, lus au moment de la lecture de /metrics."""
+    cache_state = cache.stats()
+    executor_state = executor.stats()
+    return [
+        ("model_info", "gauge", "Version du modèle (sha de model.joblib + scaler.joblib)",
+         [({"version": model_version}, 1)]),
+        ("prediction_cache_hits_total", "counter", "Prédictions servies par le cache", [({}, cache_state["hits"])]),
+        ("prediction_cache_misses_total", "counter", "Prédictions absentes du cache", [({}, cache_state["misses"])]),
+        ("inference_executor_pending", "gauge", "Appels en cours ou en attente dans l'exécuteur d'inférence",
+         [({"kind": executor_state["kind"]}, executor_state["pending"])]),
+    ]
+
+
+metrics.add_collector(collect_state)
+
+
+@app.get('/metrics', response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 if __name__ == "__main__":
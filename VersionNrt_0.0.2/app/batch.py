@@ -0,0 +1,195 @@
+# ============================================================
+# Outil en ligne de commande de scoring par lots (hors API)
+# Ce fichier évalue un fichier entier avec le modèle entraîné,
+# sans passer par HTTP. Le fichier est lu par blocs et les blocs
+# sont répartis sur plusieurs processus (un par cœur).
+#
+# Utilisation (depuis VersionNrt_0.0.2/) :
+#   py -m app.batch score data/Social_Network_Ads.csv resultats.parquet
+#   py -m app.batch score entree.csv sortie.csv --workers 4 --chunk-rows 100000
+# ============================================================
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from app.config.config import DEFAULT_MODEL_VERSION
+from app.models.inference import build_inference
+from app.models.load_model import get_model
+from app.models.registry import ModelRegistry
+from app.services.scoring import score_frame
+
+# Moteur d'inférence du processus courant (rempli une seule fois par processus)
+_engine = None
+
+
+def _init_worker(model_path):
+    """Charge le modèle une seule fois au démarrage de chaque processus du pool."""
+    global _engine
+    _engine = build_inference(get_model(model_path, mmap_mode="r"))
+
+
+def _score_chunk(frame):
+    """Évalue un bloc avec le modèle du processus courant."""
+    return score_frame(_engine, frame)
+
+
+def default_workers():
+    """Nombre de cœurs réellement disponibles pour ce processus."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # os.sched_getaffinity n'existe pas sous Windows
+        return os.cpu_count() or 1
+
+
+class ResultWriter:
+    """
+    Écrit les blocs de résultats les uns après les autres, en Parquet ou en CSV selon l'extension.
+
+    En Parquet, toutes les tables d'un fichier doivent avoir le même schéma : il est fixé
+    une fois pour toutes (schema()) et chaque bloc y est converti avant d'être écrit.
+    Sans cela, un bloc sans ligne rejetée (colonne error entièrement vide, de type null)
+    et un bloc avec des rejets (type chaîne) ne pourraient pas aller dans le même fichier.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self._writer = None
+        self._schema = None
+        self._first = True
+
+    @staticmethod
+    def schema(table):
+        """
+        Schéma Parquet des résultats (colonnes de score_frame).
+
+        Le type de User ID est lu dans le premier bloc : entier (ou colonne absente)
+        comme dans Social_Network_Ads.csv, chaîne pour des identifiants alphanumériques.
+
+        Args:
+            table (pa.Table): Le premier bloc de résultats
+
+        Returns:
+            pa.Schema: User ID, prediction (int8), probability (float64), error (chaîne)
+        """
+        import pyarrow as pa
+
+        user_id = table.schema.field("User ID").type
+        return pa.schema([
+            ("User ID", pa.int64() if pa.types.is_integer(user_id) or pa.types.is_null(user_id) else pa.string()),
+            ("prediction", pa.int8()),
+            ("probability", pa.float64()),
+            ("error", pa.string()),
+        ])
+
+    def write(self, frame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._schema = self.schema(table)
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            self._writer.write_table(table.select(self._schema.names).cast(self._schema))
+        else:
+            frame.to_csv(self.path, mode="w" if self._first else "a", header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def score_file(input_path, output_path, version=DEFAULT_MODEL_VERSION, workers=None, chunk_rows=50_000):
+    """
+    Évalue tout un fichier CSV et écrit les résultats dans le même ordre que les lignes d'entrée.
+
+    Au plus 2 blocs par processus sont en cours à un instant donné : la mémoire
+    reste bornée même si le fichier est beaucoup plus gros que la RAM.
+
+    Args:
+        input_path (str): Fichier CSV au format Social_Network_Ads.csv
+        output_path (str): Fichier de sortie (.parquet ou .csv)
+        version (str): Version du modèle (voir GET /ml/models)
+        workers (int | None): Nombre de processus (par défaut : nombre de cœurs disponibles)
+        chunk_rows (int): Nombre de lignes par bloc
+
+    Returns:
+        dict: Nombre de lignes, nombre de lignes rejetées, durée et débit (lignes/s)
+    """
+    import pandas as pd
+
+    model_path = ModelRegistry().discover().get(version)
+    if model_path is None:
+        raise KeyError(f"Version de modèle inconnue : {version}")
+    workers = workers or default_workers()
+
+    start = time.perf_counter()
+    rows, rejected = 0, 0
+    writer = ResultWriter(output_path)
+    chunks = pd.read_csv(input_path, chunksize=chunk_rows)
+    try:
+        if workers == 1:
+            _init_worker(model_path)
+            results = (_score_chunk(chunk) for chunk in chunks)
+            for result in results:
+                writer.write(result)
+                rows += len(result)
+                rejected += int(result["error"].notna().sum())
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+                # File des blocs en cours, dans l'ordre de lecture : on écrit toujours le plus ancien d'abord
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(_score_chunk, chunk))
+                    if len(pending) >= 2 * workers:
+                        result = pending.popleft().result()
+                        writer.write(result)
+                        rows += len(result)
+                        rejected += int(result["error"].notna().sum())
+                while pending:
+                    result = pending.popleft().result()
+                    writer.write(result)
+                    rows += len(result)
+                    rejected += int(result["error"].notna().sum())
+    finally:
+        writer.close()
+
+    seconds = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "rejected": rejected,
+        "workers": workers,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds) if seconds else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.batch", description="Scoring par lots avec model.joblib")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    score = commands.add_parser("score", help="Évaluer un fichier CSV")
+    score.add_argument("input", help="Fichier CSV d'entrée (User ID, Gender, Age, EstimatedSalary)")
+    score.add_argument("output", help="Fichier de sortie : .parquet ou .csv")
+    score.add_argument("--version", default=DEFAULT_MODEL_VERSION, help="Version du modèle (défaut : %(default)s)")
+    score.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut : nombre de cœurs)")
+    score.add_argument("--chunk-rows", type=int, default=50_000, help="Lignes par bloc (défaut : %(default)s)")
+
+    args = parser.parse_args(argv)
+    report = score_file(args.input, args.output, args.version, args.workers, args.chunk_rows)
+    print(
+        f"{report['rows']} lignes ({report['rejected']} rejetées) en {report['seconds']} s "
+        f"avec {report['workers']} processus : {report['rows_per_second']} lignes/s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,3 +9,192 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
 # MODEL_PATH construit le chemin complet vers le fichier model.joblib
 MODEL_PATH = BASE_DIR / "models" / "model.joblib"
+
+# MAX_BATCH_SIZE est le nombre maximal de lignes acceptées par l'endpoint POST /ml/predict/batch
+# Au-delà, la requête est refusée : cela borne la mémoire et le temps passés sur un seul appel
+MAX_BATCH_SIZE = 50_000
+
+# DATA_PATH est le chemin vers le jeu de données d'entraînement (utilisé pour les vérifications du modèle)
+DATA_PATH = BASE_DIR.parent / "data" / "Social_Network_Ads.csv"
+
+# INFERENCE_BACKEND choisit le moteur de calcul des prédictions :
+# - "numpy"   : le StandardScaler et la LogisticRegression sont fusionnés en un seul produit scalaire + sigmoïde
+# - "sklearn" : on appelle directement le pipeline scikit-learn (plus lent, mais accepte n'importe quel modèle)
+INFERENCE_BACKEND = "numpy"
+
+# --- MICRO-BATCHING (POST /ml/predict) ---
+# Les requêtes unitaires qui arrivent en même temps sont regroupées en un seul lot
+# MICRO_BATCH_ENABLED active ou désactive le regroupement
+MICRO_BATCH_ENABLED = True
+# MICRO_BATCH_WINDOW_MS est la durée maximale (en millisecondes) pendant laquelle on attend d'autres requêtes
+MICRO_BATCH_WINDOW_MS = 2.0
+# MICRO_BATCH_MAX_SIZE est le nombre de lignes à partir duquel le lot est envoyé sans attendre la fin de la fenêtre
+MICRO_BATCH_MAX_SIZE = 64
+
+# PREDICTION_CACHE_SIZE est le nombre maximal de prédictions gardées en mémoire (0 = cache désactivé)
+# Les entrées les moins récemment utilisées sont supprimées en premier (LRU)
+PREDICTION_CACHE_SIZE = 10_000
+
+# --- TABLE DE PROBABILITÉS PRÉCALCULÉE ---
+# Le domaine des entrées est fini (2 genres x 43 âges x 150 001 salaires) : on peut évaluer
+# le modèle une fois pour toutes et répondre par une simple lecture dans un tableau
+# PROBA_TABLE_ENABLED active la lecture de la table par POST /ml/predict (si elle existe et correspond au modèle)
+PROBA_TABLE_ENABLED = True
+# PROBA_TABLE_PATH est le fichier .npy de la table (ses métadonnées sont dans le .json du même nom)
+PROBA_TABLE_PATH = BASE_DIR / "models" / "proba_table.npy"
+# PROBA_TABLE_SALARY_STEP est le pas de la grille des salaires (1 = tous les salaires, 100 = une table 100 fois plus petite)
+PROBA_TABLE_SALARY_STEP = 1
+
+# --- REGISTRE DES MODÈLES ---
+# MODELS_DIR est le dossier où le registre cherche les modèles versionnés :
+# "model.joblib" est la version "default", "model-<version>.joblib" est la version "<version>"
+MODELS_DIR = BASE_DIR / "models"
+# DEFAULT_MODEL_VERSION est la version utilisée quand le client n'en choisit pas (POST /ml/predict)
+DEFAULT_MODEL_VERSION = "default"
+# MODEL_RELOAD_INTERVAL est le délai minimal (en secondes) entre deux vérifications du fichier d'un modèle chargé
+# Si le fichier a changé, la nouvelle version est chargée et remplace l'ancienne sans redémarrer l'API
+MODEL_RELOAD_INTERVAL = 2.0
+
+# --- DÉMARRAGE ---
+# WARMUP_PREDICTIONS est le nombre de prédictions fictives faites au démarrage pour "chauffer" le modèle
+# (le premier appel à un modèle est toujours plus lent que les suivants)
+WARMUP_PREDICTIONS = 5
+
+# --- SCORING DE FICHIERS (POST /ml/predict/stream) ---
+# GENDER_ENCODING est l'encodage du genre utilisé dans le notebook : data.replace({'Male': 0, 'Female': 1})
+GENDER_ENCODING = {"Male": 0, "Female": 1}
+# STREAM_CHUNK_ROWS est le nombre de lignes lues, validées et évaluées ensemble
+# La mémoire utilisée dépend de cette taille de bloc, pas de la taille du fichier
+STREAM_CHUNK_ROWS = 5_000
+# STREAM_MAX_LINE_BYTES est la longueur maximale d'une ligne reçue (une ligne valide fait une cinquantaine d'octets)
+# Une ligne plus longue est rejetée avec une erreur, sans être gardée en mémoire
+STREAM_MAX_LINE_BYTES = 64 * 1024
+
+# --- EXÉCUTION DES PRÉDICTIONS ---
+# INFERENCE_EXECUTOR choisit où tourne le calcul du modèle :
+# - "inline"  : directement dans la boucle asyncio (idéal pour le moteur numpy, qui prend quelques microsecondes)
+# - "thread"  : dans un pool de threads dédié et borné, séparé du threadpool partagé de Starlette
+# - "process" : dans un pool de processus où chaque processus a déjà chargé le modèle (pas de GIL partagé)
+INFERENCE_EXECUTOR = "inline"
+# INFERENCE_WORKERS est le nombre de threads ou de processus du pool ("thread" et "process")
+INFERENCE_WORKERS = 2
+
+# --- GRILLE DE PROBABILITÉS (GET /ml/predict/grid) ---
+# GRID_MAX_CELLS est le nombre maximal de points (genres x âges x salaires) calculés par un seul appel
+# Avec les pas par défaut (1 an, 1 000 €) la grille fait 2 x 43 x 151 = 12 986 points
+GRID_MAX_CELLS = 200_000
+
+# --- ENTRAÎNEMENT (py -m app.train) ---
+# TRAIN_TARGET_COLUMN est la colonne à prédire dans les fichiers d'entraînement (0 = n'achète pas, 1 = achète)
+TRAIN_TARGET_COLUMN = "Purchased"
+# TRAIN_CHUNK_ROWS est le nombre de lignes lues à la fois : la mémoire de l'entraînement dépend de ce nombre,
+# pas de la taille des fichiers
+TRAIN_CHUNK_ROWS = 100_000
+# TRAIN_EPOCHS est le nombre de passages sur les données d'entraînement (la descente de gradient en fait plusieurs)
+TRAIN_EPOCHS = 20
+# TRAIN_HOLDOUT_EVERY met une ligne sur N de côté pour mesurer les performances (jamais utilisée pour apprendre)
+TRAIN_HOLDOUT_EVERY = 5
+# TRAIN_ALPHA est la force de la régularisation L2 du SGDClassifier
+TRAIN_ALPHA = 1e-4
+
+# --- SERVEUR MULTI-MODÈLES (POST /models/{name}/predict) ---
+# MODEL_CATALOG déclare les modèles servis sous /models/{name} :
+# - kind   : "pipeline" (fichier joblib scikit-learn) ou "compiled_tree" (arbre compilé .npz de la v0.0.1)
+# - path   : le fichier du modèle
+# - schema : le nom du schéma d'entrée (classe de app/schemas/schema.py), dans l'ordre des colonnes du modèle
+# Ajouter un modèle = ajouter une entrée ; il n'est chargé qu'au premier appel
+MODEL_CATALOG = {
+    "purchase": {
+        "kind": "pipeline",
+        "path": MODEL_PATH,
+        "schema": "InputData",
+        "description": "Achat d'un produit (genre, âge, salaire estimé) — régression logistique",
+    },
+    "iris": {
+        "kind": "compiled_tree",
+        "path": BASE_DIR.parent.parent / "VersionNrt_0.0.1" / "iris_tree.npz",
+        "schema": "IrisInput",
+        "description": "Espèce d'Iris (0 = Setosa, 1 = Versicolor, 2 = Virginica) — arbre de décision compilé",
+    },
+}
+# MODEL_CACHE_BUDGET_MB est la mémoire maximale (en Mo) occupée par les modèles chargés
+# Au-delà, les modèles les moins récemment utilisés sont déchargés (ils seront rechargés au prochain appel)
+MODEL_CACHE_BUDGET_MB = 512
+
+# --- JOURNAL D'AUDIT DES PRÉDICTIONS ---
+# Chaque entrée et sortie de POST /ml/predict et /ml/predict/batch est gardée dans un tampon en mémoire,
+# puis écrite par un thread en arrière-plan dans des fichiers Parquet compressés (jamais pendant la requête)
+# AUDIT_ENABLED active le journal (il nécessite pyarrow)
+AUDIT_ENABLED = True
+# AUDIT_DIR est le dossier des fichiers audit-*.parquet
+AUDIT_DIR = BASE_DIR.parent / "audit"
+# AUDIT_BUFFER_ROWS est le nombre maximal de lignes en attente d'écriture dans le tampon
+AUDIT_BUFFER_ROWS = 100_000
+# AUDIT_FULL_POLICY décide quoi faire quand le tampon est plein :
+# - "drop"  : la ligne n'est pas journalisée (compteur audit_dropped_rows_total) ; la requête n'attend jamais
+# - "block" : la requête attend qu'il y ait de la place, au plus AUDIT_BLOCK_TIMEOUT_MS, puis la ligne est perdue
+#             (l'attente se fait dans un thread : les autres requêtes continuent d'être servies)
+AUDIT_FULL_POLICY = "drop"
+AUDIT_BLOCK_TIMEOUT_MS = 100
+# AUDIT_FLUSH_ROWS / AUDIT_FLUSH_SECONDS : le thread écrit dès qu'il y a ce nombre de lignes, ou au moins toutes
+# les AUDIT_FLUSH_SECONDS secondes
+AUDIT_FLUSH_ROWS = 10_000
+AUDIT_FLUSH_SECONDS = 1.0
+# AUDIT_ROTATE_ROWS / AUDIT_ROTATE_SECONDS : un nouveau fichier est commencé après ce nombre de lignes ou cette durée
+AUDIT_ROTATE_ROWS = 1_000_000
+AUDIT_ROTATE_SECONDS = 3600
+# AUDIT_COMPRESSION est la compression des fichiers Parquet ("zstd", "snappy", "gzip"...)
+AUDIT_COMPRESSION = "zstd"
+
+# --- SURVEILLANCE DE LA DÉRIVE DES ENTRÉES (GET /ml/drift) ---
+# Chaque prédiction de POST /ml/predict et /ml/predict/batch met à jour des statistiques de taille fixe
+# (moyenne, variance, histogramme de chaque feature et de la probabilité), comparées au profil des données
+# d'entraînement (fichier <modèle>.drift.json, écrit par py -m app.train)
+# DRIFT_ENABLED active la surveillance
+DRIFT_ENABLED = True
+# DRIFT_BINS est le nombre d'intervalles des histogrammes (âge, salaire et probabilité), entre les bornes de InputData
+DRIFT_BINS = 20
+# DRIFT_MIN_ROWS est le nombre de prédictions en dessous duquel la dérive n'est pas jugée (statut insufficient_data)
+DRIFT_MIN_ROWS = 1_000
+# DRIFT_PSI_WARNING / DRIFT_PSI_ALERT : seuils du PSI (Population Stability Index) pour les statuts warning et alert
+# (repères habituels : < 0.1 stable, 0.1 à 0.25 dérive modérée, > 0.25 dérive importante)
+DRIFT_PSI_WARNING = 0.1
+DRIFT_PSI_ALERT = 0.25
+# DRIFT_DIR est le dossier où chaque worker de app.serve dépose ses statistiques (drift-<pid>.json)
+# pour que GET /ml/drift additionne celles de tous les workers
+DRIFT_DIR = BASE_DIR.parent / "drift"
+# DRIFT_SYNC_SECONDS est l'intervalle entre deux écritures de ce fichier
+DRIFT_SYNC_SECONDS = 5.0
+
+# --- CONTRÔLE D'ADMISSION (surcharge) ---
+# Au-delà de ADMISSION_MAX_CONCURRENT requêtes de prédiction en cours, les suivantes attendent dans une file bornée ;
+# quand la file est pleine, ou que l'attente dépasse ADMISSION_QUEUE_TIMEOUT_MS, la réponse est immédiatement
+# 503 + Retry-After au lieu de laisser toutes les requêtes ralentir jusqu'au timeout des clients
+# ADMISSION_ENABLED active le contrôle d'admission
+ADMISSION_ENABLED = True
+# ADMISSION_MAX_CONCURRENT est le nombre maximal de requêtes de prédiction traitées en même temps
+ADMISSION_MAX_CONCURRENT = 32
+# ADMISSION_QUEUE_SIZE est le nombre maximal de requêtes en attente d'une place
+ADMISSION_QUEUE_SIZE = 128
+# ADMISSION_QUEUE_TIMEOUT_MS est l'attente maximale dans la file (en millisecondes)
+ADMISSION_QUEUE_TIMEOUT_MS = 500
+# ADMISSION_DEADLINE_HEADER est l'en-tête par lequel le client donne son échéance (temps Unix en secondes,
+# par exemple 1760790000.25) : une requête dont l'échéance est passée n'est pas traitée (504)
+ADMISSION_DEADLINE_HEADER = "x-request-deadline"
+# ADMISSION_ROUTES donne la priorité de chaque route soumise au contrôle (motifs de chemin, * = n'importe quel texte ;
+# le premier motif qui correspond l'emporte). Plus la priorité est haute, plus la requête passe tôt dans la file,
+# et une requête prioritaire peut prendre la place d'une requête moins prioritaire quand la file est pleine.
+# Les routes absentes (/, /health/..., /metrics, /docs...) ne sont jamais mises en attente ni refusées
+ADMISSION_ROUTES = [
+    # Prédictions unitaires : interactives (frontend, clients en ligne)
+    ("/ml/predict", 2),
+    ("/ml/v/*/predict", 2),
+    ("/models/*/predict", 2),
+    # Lots et grilles
+    ("/ml/predict/batch", 1),
+    ("/ml/v/*/predict/batch", 1),
+    ("/models/*/predict/batch", 1),
+    ("/ml/predict/grid", 1),
+    # Fichiers entiers : peuvent attendre
+    ("/ml/predict/stream", 0),
+]
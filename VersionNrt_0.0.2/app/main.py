@@ -5,6 +5,10 @@
 # C'est ce fichier qu'on lance avec uvicorn pour démarrer le serveur.
 # ============================================================
 
+# Chronomètre du démarrage : tout ce qui suit (imports compris) fait partie du rapport de démarrage
+import time
+_import_start = time.perf_counter()
+
 # Importation de sys et os pour configurer le chemin Python
 import sys
 import os
@@ -15,14 +19,93 @@ import os
 # os.path.abspath(..., "..") = le dossier parent (VersionNrt_0.0.2/)
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-# Importation de uvicorn : le serveur ASGI qui fait tourner notre application FastAPI
-import uvicorn
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 
 # Importation de la classe FastAPI : c'est le cœur du framework, elle crée l'application web
+# (uvicorn n'est importé que dans le bloc __main__ : il est inutile quand on lance "uvicorn app.main:app")
 from fastapi import FastAPI
 
 # Importation du routeur qui contient nos endpoints de prédiction (POST /ml/predict)
-from app.router.route import router
+# Le modèle n'est pas chargé pendant cet import : c'est le lifespan ci-dessous qui s'en charge
+from app.router.route import router, warm_up, executor
+
+# Importation du routeur de scoring de fichiers en streaming (POST /ml/predict/stream)
+from app.router.stream import router as stream_router
+
+# Importation du routeur des probes de santé (GET /health/live et /health/ready)
+from app.router.health import router as health_router
+
+# Importation du routeur des métriques Prometheus (GET /metrics) et du middleware qui compte les requêtes
+from app.router.metrics import router as metrics_router
+
+# Importation du routeur du serveur multi-modèles (POST /models/{name}/predict : achat, Iris...)
+from app.router.models import router as models_router
+from app.services.metrics import MetricsMiddleware
+from app.services.admission import AdmissionMiddleware
+
+# Importation de la route de la dérive des entrées (GET /ml/drift)
+from app.router.drift import router as drift_router
+
+# Importation du journal d'audit : son thread d'écriture est démarré et arrêté par le lifespan
+from app.services.audit import audit_log
+# Importation de la surveillance de la dérive : son thread de partage entre workers est démarré par le lifespan
+from app.services.drift import drift_monitor
+
+# Durée des imports (FastAPI, NumPy, nos modules...)
+IMPORT_SECONDS = time.perf_counter() - _import_start
+
+# On écrit dans le logger de uvicorn pour que le rapport apparaisse avec ses messages de démarrage
+logger = logging.getLogger("uvicorn.error")
+
+
+async def _warm_up_in_background(app):
+    """
+    Charge et chauffe le modèle dans un thread, sans bloquer le serveur.
+
+    Pendant ce temps, GET /health/live répond déjà 200 et GET /health/ready répond 503.
+    """
+    try:
+        report = await asyncio.to_thread(warm_up)
+    except Exception as exc:
+        app.state.startup_error = repr(exc)
+        logger.exception("Échec du chargement du modèle au démarrage")
+        return
+
+    app.state.startup_report.update(report)
+    app.state.startup_report["total_seconds"] = round(time.perf_counter() - _import_start, 4)
+    app.state.ready = True
+    logger.info(
+        "Démarrage : imports %.3f s, désérialisation %.3f s, chauffe %.3f s (total %.3f s)",
+        IMPORT_SECONDS, report["unpickle_seconds"], report["warmup_seconds"],
+        app.state.startup_report["total_seconds"],
+    )
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Cycle de vie de l'application : code exécuté au démarrage (avant yield) et à l'arrêt (après yield).
+
+    Au démarrage, on lance le chargement et la chauffe du modèle en tâche de fond
+    et on prépare le rapport de démarrage lu par GET /health/ready.
+    """
+    app.state.ready = False
+    app.state.startup_error = None
+    app.state.startup_report = {"imports_seconds": round(IMPORT_SECONDS, 4)}
+    warmup_task = asyncio.create_task(_warm_up_in_background(app))
+    # Le thread d'écriture est démarré ici (et non à l'import) : chaque worker de app.serve a le sien
+    audit_log.start()
+    drift_monitor.start()
+    yield
+    # À l'arrêt, on n'attend pas la fin d'une chauffe encore en cours
+    warmup_task.cancel()
+    # On arrête le pool de threads ou de processus de l'exécuteur d'inférence
+    executor.shutdown()
+    # Les prédictions encore dans le tampon sont écrites avant l'arrêt
+    await asyncio.to_thread(audit_log.close)
+    await asyncio.to_thread(drift_monitor.close)
 
 # Création de l'instance de l'application FastAPI
 # title : le nom de l'API affiché dans la documentation Swagger
@@ -32,7 +115,8 @@ app = FastAPI(
     title="API de Prédiction d'Achat",
     description="API de Machine Learning pour prédire si un utilisateur va acheter un produit. "
                 "Le modèle utilise le genre, l'âge et le salaire estimé comme features.",
-    version="0.0.2"
+    version="0.0.2",
+    lifespan=lifespan
 )
 
 # Inclusion du routeur dans l'application principale
@@ -40,6 +124,17 @@ app = FastAPI(
 # Les routes du routeur auront le préfixe /ml (défini dans le routeur)
 # Exemple : POST /ml/predict
 app.include_router(router)
+app.include_router(stream_router)
+app.include_router(health_router)
+app.include_router(metrics_router)
+app.include_router(models_router)
+app.include_router(drift_router)
+
+# Le middleware compte toutes les requêtes par route et par statut et tient la jauge des requêtes en cours
+app.add_middleware(MetricsMiddleware)
+# Le contrôle d'admission est ajouté en dernier : c'est le premier middleware traversé, une requête refusée
+# (503 / 504) ne coûte presque rien (ses refus sont comptés dans admission_rejected_total)
+app.add_middleware(AdmissionMiddleware)
 
 
 # Décorateur @app.get("/") : définit une route HTTP GET sur le chemin racine "/"
@@ -66,4 +161,7 @@ def root():
     }
 
 if __name__ == "__main__":
-    uvicorn.run(app)
\ No newline at end of file
+    # Importation de uvicorn : le serveur ASGI qui fait tourner notre application FastAPI
+    import uvicorn
+
+    uvicorn.run(app)
@@ -0,0 +1,286 @@
+# ============================================================
+# Fichier du catalogue multi-modèles
+# Ce fichier permet à un seul processus de servir plusieurs modèles
+# (achat, Iris, ... : voir MODEL_CATALOG dans config.py) sous
+# /models/{name}/predict, chacun avec son propre schéma d'entrée.
+#
+# Les modèles sont chargés au premier appel et gardés dans un cache
+# LRU borné en mémoire (MODEL_CACHE_BUDGET_MB) : quand le budget est
+# dépassé, les modèles les moins récemment utilisés sont déchargés.
+# Pour chaque modèle, le cache compte les chargements, les appels
+# servis sans chargement (hits) et les déchargements (evictions).
+# ============================================================
+
+import importlib.util
+import io
+import logging
+import os
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict
+
+import numpy as np
+from pydantic import Field, create_model
+
+from app.config.config import MAX_BATCH_SIZE, MODEL_CACHE_BUDGET_MB, MODEL_CATALOG, MODEL_RELOAD_INTERVAL
+from app.models.inference import build_inference
+from app.models.load_model import read_file, read_model
+from app.schemas import schema as schemas
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(obj):
+    """
+    Estime la mémoire occupée par un objet chargé (modèle scikit-learn, arbre compilé...).
+
+    Parcourt les attributs, listes et dictionnaires de l'objet ; les tableaux NumPy comptent
+    pour leurs données (nbytes), tout le reste pour sys.getsizeof.
+
+    Returns:
+        int: La taille estimée en octets
+    """
+    total, seen, stack = 0, set(), [obj]
+    while stack:
+        item = stack.pop()
+        # Les classes, modules et fonctions sont partagés par tous les modèles : on ne les compte pas
+        if id(item) in seen or isinstance(item, (type, types.ModuleType, types.FunctionType, types.MethodType,
+                                                 types.BuiltinFunctionType)):
+            continue
+        seen.add(id(item))
+        if isinstance(item, np.ndarray):
+            total += item.nbytes + sys.getsizeof(item) * (item.base is not None)
+            if item.dtype == object:
+                stack.extend(item.ravel().tolist())
+            continue
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, "__dict__"):
+            stack.append(vars(item))
+    return total
+
+
+# Chaque predictor lit son fichier une seule fois et garde l'empreinte (sha) et le
+# os.stat_result (stat) des octets qu'il a chargés : CatalogModel les reprend tels quels.
+
+class PipelinePredictor:
+    """Modèle scikit-learn sauvegardé avec joblib (par exemple le pipeline d'achat)."""
+
+    def __init__(self, path):
+        self.model, self.sha, self.stat = read_model(path)
+        self.classes = np.asarray(self.model.classes_)
+        # Classifieur binaire : moteur numpy (ou scikit-learn) de app/models/inference.py
+        self.engine = build_inference(self.model) if len(self.classes) == 2 else None
+
+    def predict(self, matrix):
+        """
+        Returns:
+            tuple: (classes prédites (n,), probabilités de chaque classe (n, k))
+        """
+        if self.engine is None:
+            probabilities = self.model.predict_proba(matrix)
+            return self.classes[probabilities.argmax(axis=1)], probabilities
+        predictions, positive = self.engine.predict_with_proba(matrix)
+        return predictions, np.column_stack([1.0 - positive, positive])
+
+
+# compiled_tree.py importé depuis chaque dossier d'arbre (il n'est pas dans le package app)
+_tree_modules = {}
+
+
+def _import_compiled_tree(directory):
+    """Importe compiled_tree.py depuis le dossier de l'arbre (VersionNrt_0.0.1/), une seule fois."""
+    if directory not in _tree_modules:
+        spec = importlib.util.spec_from_file_location("compiled_tree", directory / "compiled_tree.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _tree_modules[directory] = module
+    return _tree_modules[directory]
+
+
+class CompiledTreePredictor:
+    """Arbre de décision compilé (iris_tree.npz, produit par compiled_tree.py de la VersionNrt_0.0.1)."""
+
+    def __init__(self, path):
+        data, self.sha, self.stat = read_file(path)
+        self.tree = _import_compiled_tree(path.parent).CompiledTree.load(io.BytesIO(data))
+        self.classes = self.tree.classes
+
+    def predict(self, matrix):
+        leaves = self.tree.leaves(matrix)
+        return self.tree.labels[leaves], self.tree.value[leaves]
+
+
+PREDICTORS = {"pipeline": PipelinePredictor, "compiled_tree": CompiledTreePredictor}
+
+
+class ModelSpec:
+    """
+    Un modèle déclaré dans MODEL_CATALOG : où le trouver, comment le charger et quelles entrées il attend.
+
+    Les champs du schéma d'entrée donnent l'ordre des colonnes de la matrice envoyée au modèle.
+    """
+
+    def __init__(self, name, kind, path, schema, description=""):
+        if kind not in PREDICTORS:
+            raise ValueError(f"Type de modèle inconnu pour {name} : {kind!r} (attendu : {', '.join(PREDICTORS)})")
+        self.name = name
+        self.kind = kind
+        self.path = path
+        self.description = description
+        self.schema = getattr(schemas, schema)
+        self.features = list(self.schema.model_fields)
+        # Schéma du corps de POST /models/{name}/predict/batch : {"instances": [...]}
+        self.batch_schema = create_model(
+            f"{schema}Batch",
+            instances=(list[self.schema], Field(..., min_length=1, max_length=MAX_BATCH_SIZE)),
+        )
+
+    def to_matrix(self, instances):
+        """Matrice (n, nombre de champs) dans l'ordre des champs du schéma."""
+        return np.array([[getattr(item, field) for field in self.features] for item in instances], dtype=np.float64)
+
+
+class CatalogModel:
+    """Un modèle du catalogue chargé en mémoire (jamais modifié : un rechargement crée un nouvel objet)."""
+
+    def __init__(self, spec, predictor, load_seconds):
+        # Empreinte et date du fichier tel qu'il a été lu par le predictor (pas une seconde lecture)
+        stat = predictor.stat
+        self.spec = spec
+        self.predictor = predictor
+        self.sha = predictor.sha
+        self.size_bytes = estimate_size(predictor)
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+        self.mtime_ns = stat.st_mtime_ns
+        self.file_size = stat.st_size
+        self.checked_at = time.monotonic()
+
+
+class ModelCache:
+    """
+    Cache LRU des modèles du catalogue, borné par une taille mémoire totale.
+
+    - Chargement à la demande, un seul chargement à la fois par modèle
+    - Quand la taille des modèles chargés dépasse budget_bytes, les moins récemment
+      utilisés sont déchargés (un modèle seul plus gros que le budget reste chargé)
+    - Comme le registre, un fichier modifié est rechargé (vérifié au plus toutes les reload_interval secondes)
+    """
+
+    def __init__(self, specs, budget_bytes, reload_interval=MODEL_RELOAD_INTERVAL):
+        self.specs = specs
+        self.budget_bytes = budget_bytes
+        self.reload_interval = reload_interval
+        self._entries = OrderedDict()
+        # _lock protège _entries et les compteurs ; _load_locks évite deux chargements du même modèle
+        self._lock = threading.Lock()
+        self._load_locks = {name: threading.Lock() for name in specs}
+        self._stats = {name: {"loads": 0, "hits": 0, "evictions": 0} for name in specs}
+
+    def get_if_loaded(self, name):
+        """
+        Retourne le modèle s'il est déjà chargé et à jour (compté comme un hit), sinon None.
+
+        N'attend jamais un chargement : la route l'appelle directement dans la boucle asyncio.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or self._needs_reload(entry):
+                return None
+            self._entries.move_to_end(name)
+            self._stats[name]["hits"] += 1
+            return entry
+
+    def get(self, name):
+        """
+        Retourne le modèle, en le chargeant si besoin (peut prendre du temps : à appeler dans un thread).
+
+        Raises:
+            KeyError: Si le modèle n'est pas dans le catalogue
+        """
+        spec = self.specs[name]
+        entry = self.get_if_loaded(name)
+        if entry is not None:
+            return entry
+
+        with self._load_locks[name]:
+            # Un autre thread a pu charger le modèle pendant qu'on attendait le verrou
+            entry = self.get_if_loaded(name)
+            if entry is not None:
+                return entry
+
+            start = time.perf_counter()
+            loaded = CatalogModel(spec, PREDICTORS[spec.kind](spec.path), time.perf_counter() - start)
+            with self._lock:
+                self._entries[name] = loaded
+                self._entries.move_to_end(name)
+                self._stats[name]["loads"] += 1
+                self._evict(keep=name)
+            logger.info("Modèle %s chargé (%s, %.1f Mo)", name, loaded.sha, loaded.size_bytes / 1e6)
+            return loaded
+
+    def _needs_reload(self, entry):
+        """Vérifie (au plus toutes les reload_interval secondes) si le fichier du modèle a changé."""
+        now = time.monotonic()
+        if now - entry.checked_at < self.reload_interval:
+            return False
+        entry.checked_at = now
+        try:
+            stat = os.stat(entry.spec.path)
+        except FileNotFoundError:
+            return False
+        return stat.st_mtime_ns != entry.mtime_ns or stat.st_size != entry.file_size
+
+    def used_bytes(self):
+        return sum(entry.size_bytes for entry in self._entries.values())
+
+    def _evict(self, keep):
+        """Décharge les modèles les moins récemment utilisés jusqu'à revenir sous le budget (verrou tenu)."""
+        while self.used_bytes() > self.budget_bytes and len(self._entries) > 1:
+            name = next(iter(self._entries))
+            if name == keep:
+                self._entries.move_to_end(name)
+                continue
+            evicted = self._entries.pop(name)
+            self._stats[name]["evictions"] += 1
+            logger.info("Modèle %s déchargé (%.1f Mo) : budget de %.0f Mo dépassé",
+                        name, evicted.size_bytes / 1e6, self.budget_bytes / 1e6)
+        if self.used_bytes() > self.budget_bytes:
+            logger.warning("Le modèle %s dépasse à lui seul le budget du cache de modèles", keep)
+
+    def describe(self):
+        """
+        Décrit le catalogue : état de chaque modèle et compteurs du cache.
+
+        Returns:
+            dict: Budget, mémoire utilisée et un dictionnaire par modèle
+        """
+        with self._lock:
+            models = []
+            for name, spec in self.specs.items():
+                entry = self._entries.get(name)
+                models.append({
+                    "name": name,
+                    "kind": spec.kind,
+                    "description": spec.description,
+                    "file": spec.path.name,
+                    "features": spec.features,
+                    "loaded": entry is not None,
+                    "sha": entry.sha if entry else None,
+                    "size_bytes": entry.size_bytes if entry else None,
+                    "load_seconds": round(entry.load_seconds, 4) if entry else None,
+                    **self._stats[name],
+                })
+            return {"budget_bytes": self.budget_bytes, "used_bytes": self.used_bytes(), "models": models}
+
+
+# Catalogue et cache partagés par toute l'application
+catalog = {name: ModelSpec(name, **entry) for name, entry in MODEL_CATALOG.items()}
+model_cache = ModelCache(catalog, MODEL_CACHE_BUDGET_MB * 1024 * 1024)
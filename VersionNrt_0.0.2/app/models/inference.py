@@ -0,0 +1,192 @@
+# ============================================================
+# Fichier des moteurs d'inférence
+# Ce fichier transforme le pipeline scikit-learn chargé depuis
+# model.joblib en un objet qui calcule, en un seul passage,
+# la classe prédite ET la probabilité d'achat.
+# ============================================================
+
+import logging
+
+import numpy as np
+
+from app.config.config import INFERENCE_BACKEND
+
+logger = logging.getLogger(__name__)
+
+
+class SklearnInference:
+    """
+    Moteur d'inférence qui délègue tout au pipeline scikit-learn.
+
+    Un seul appel à predict_proba suffit : la classe prédite est déduite
+    des probabilités au lieu d'appeler model.predict en plus.
+    """
+
+    name = "sklearn"
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict_with_proba(self, input_array):
+        """
+        Calcule les classes prédites et les probabilités d'achat.
+
+        Args:
+            input_array (np.ndarray): Matrice (n_lignes, 3) : gender, age, estimated_salary
+
+        Returns:
+            tuple: (classes prédites, probabilités de la classe 1), deux tableaux de taille n_lignes
+        """
+        probas = self.model.predict_proba(input_array)
+        return self.model.classes_[probas.argmax(axis=1)], probas[:, 1]
+
+
+class NumpyInference:
+    """
+    Moteur d'inférence NumPy pour un pipeline StandardScaler + régression logistique.
+
+    La normalisation est linéaire, on peut donc la fusionner avec les coefficients :
+        z = sum(coef * (x - mean) / scale) + intercept
+          = x @ (coef / scale) + (intercept - sum(coef * mean / scale))
+    Une prédiction se résume alors à un produit scalaire et une sigmoïde,
+    sans aucune validation scikit-learn par appel.
+    """
+
+    name = "numpy"
+
+    def __init__(self, weights, bias, classes):
+        self.weights = weights
+        self.bias = bias
+        self.classes = classes
+
+    @classmethod
+    def from_pipeline(cls, model):
+        """
+        Extrait les paramètres du pipeline et les fusionne en un vecteur de poids et un biais.
+
+        Args:
+            model: Le pipeline make_pipeline(StandardScaler(), LogisticRegression())
+
+        Returns:
+            NumpyInference: Le moteur prêt à prédire
+
+        Raises:
+            ValueError: Si le modèle n'a pas la forme StandardScaler + classifieur linéaire binaire
+        """
+        # scikit-learn est importé ici et non en haut du fichier : son import prend plus d'une seconde
+        # et il est de toute façon chargé au moment où le modèle est désérialisé
+        from sklearn.linear_model import LogisticRegression, SGDClassifier
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+
+        if not isinstance(model, Pipeline) or len(model.steps) != 2:
+            raise ValueError("Le modèle doit être un pipeline à deux étapes (scaler + classifieur)")
+
+        scaler, classifier = model.steps[0][1], model.steps[1][1]
+        if not isinstance(scaler, StandardScaler):
+            raise ValueError("La première étape du pipeline doit être un StandardScaler")
+        if not isinstance(classifier, (LogisticRegression, SGDClassifier)) or len(classifier.classes_) != 2:
+            raise ValueError("La seconde étape doit être un classifieur linéaire binaire")
+        if isinstance(classifier, SGDClassifier) and classifier.loss != "log_loss":
+            raise ValueError("Seul un SGDClassifier avec loss='log_loss' donne des probabilités sigmoïdes")
+
+        coef = classifier.coef_[0]
+        # Si le scaler a été créé avec with_mean=False ou with_std=False, mean_/scale_ valent None
+        mean = scaler.mean_ if scaler.mean_ is not None else np.zeros_like(coef)
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones_like(coef)
+
+        weights = coef / scale
+        bias = float(classifier.intercept_[0] - np.dot(weights, mean))
+        return cls(weights, bias, classifier.classes_)
+
+    def predict_with_proba(self, input_array):
+        """
+        Calcule les classes prédites et les probabilités d'achat en un seul passage.
+
+        Args:
+            input_array (np.ndarray): Matrice (n_lignes, 3) : gender, age, estimated_salary
+
+        Returns:
+            tuple: (classes prédites, probabilités de la classe 1), deux tableaux de taille n_lignes
+        """
+        z = input_array @ self.weights + self.bias
+        # Sigmoïde 1 / (1 + exp(-z)) écrite sous une forme qui ne déborde pas pour les grands |z|
+        probabilities = np.exp(-np.logaddexp(0.0, -z))
+        # Même règle que LogisticRegression.predict : classe 1 si z > 0
+        return self.classes[(z > 0).astype(np.intp)], probabilities
+
+
+def build_inference(model, backend=INFERENCE_BACKEND):
+    """
+    Construit le moteur d'inférence demandé pour un modèle chargé.
+
+    Si le moteur "numpy" est demandé mais que le modèle n'a pas la forme attendue
+    (par exemple un arbre de décision), on revient au moteur scikit-learn.
+
+    Args:
+        model: Le pipeline scikit-learn chargé par get_model()
+        backend (str): "numpy" ou "sklearn" (par défaut INFERENCE_BACKEND de config.py)
+
+    Returns:
+        SklearnInference | NumpyInference: Un objet qui expose predict_with_proba()
+    """
+    if backend == "numpy":
+        try:
+            return NumpyInference.from_pipeline(model)
+        except ValueError as exc:
+            logger.warning("Moteur numpy indisponible (%s), utilisation de scikit-learn", exc)
+            return SklearnInference(model)
+    if backend == "sklearn":
+        return SklearnInference(model)
+    raise ValueError(f"INFERENCE_BACKEND inconnu : {backend!r} (attendu : 'numpy' ou 'sklearn')")
+
+
+def check_parity(model, csv_path, tolerance=1e-9):
+    """
+    Vérifie que le moteur NumPy donne les mêmes résultats que scikit-learn.
+
+    Toutes les lignes du CSV sont évaluées par les deux moteurs, avec le même
+    encodage du genre que dans le notebook (Male = 0, Female = 1).
+
+    Args:
+        model: Le pipeline scikit-learn chargé par get_model()
+        csv_path: Chemin vers un fichier au format Social_Network_Ads.csv
+        tolerance (float): Écart maximal accepté entre les probabilités
+
+    Returns:
+        dict: Nombre de lignes comparées, nombre de classes différentes et écart maximal de probabilité
+    """
+    import pandas as pd
+
+    data = pd.read_csv(csv_path)
+    input_array = np.column_stack([
+        data["Gender"].map({"Male": 0, "Female": 1}),
+        data["Age"],
+        data["EstimatedSalary"],
+    ]).astype(float)
+
+    sklearn_labels, sklearn_probas = SklearnInference(model).predict_with_proba(input_array)
+    numpy_labels, numpy_probas = NumpyInference.from_pipeline(model).predict_with_proba(input_array)
+
+    # On compare aussi avec model.predict, la référence utilisée historiquement par l'API
+    reference_labels = model.predict(input_array)
+    report = {
+        "rows": len(input_array),
+        "label_mismatches": int(np.sum(numpy_labels != reference_labels) + np.sum(sklearn_labels != reference_labels)),
+        "max_proba_diff": float(np.max(np.abs(numpy_probas - sklearn_probas))),
+    }
+    report["ok"] = report["label_mismatches"] == 0 and report["max_proba_diff"] <= tolerance
+    return report
+
+
+if __name__ == "__main__":
+    # Vérification de parité : py -m app.models.inference (depuis VersionNrt_0.0.2/)
+    # La même vérification tourne avec les tests : python -m pytest VersionNrt_0.0.2/tests
+    import sys
+
+    from app.config.config import DATA_PATH
+    from app.models.load_model import get_model
+
+    result = check_parity(get_model(), DATA_PATH)
+    print(result)
+    sys.exit(0 if result["ok"] else 1)
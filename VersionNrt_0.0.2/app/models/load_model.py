@@ -4,11 +4,15 @@
 # le disque et le met à disposition pour les prédictions.
 # ============================================================
 
+import hashlib
+import io
+import os
+
 import joblib
 
 from app.config.config import MODEL_PATH
 
-def get_model():
+def get_model(path=MODEL_PATH, mmap_mode=None):
     """
     Fonction qui charge et retourne le modèle ML depuis le fichier .joblib.
 
@@ -16,13 +20,85 @@ def get_model():
     - StandardScaler : pour normaliser les données (mise à l'échelle)
     - LogisticRegression : pour faire la classification binaire (0 ou 1)
 
+    Args:
+        path: Chemin du fichier .joblib (par défaut MODEL_PATH)
+        mmap_mode: Si "r", les grands tableaux NumPy du fichier sont projetés en mémoire au lieu d'être copiés
+
     Returns:
         model: Le pipeline scikit-learn prêt à faire des prédictions
     """
     # joblib.load() lit le fichier .joblib et reconstruit l'objet Python (le pipeline)
     # MODEL_PATH est le chemin absolu vers le fichier model.joblib défini dans config.py
-    model = joblib.load(MODEL_PATH)
+    model = joblib.load(path, mmap_mode=mmap_mode)
 
     # On retourne le modèle chargé pour qu'il puisse être utilisé dans les routes
     return model
 
+
+def file_sha256(path):
+    """
+    Calcule l'empreinte SHA-256 complète d'un fichier (modèle, jeu de données...).
+
+    Args:
+        path: Chemin du fichier
+
+    Returns:
+        str: L'empreinte en hexadécimal (64 caractères)
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        # Lecture par blocs de 1 Mo pour ne pas charger tout le fichier en mémoire
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_model_version(path=MODEL_PATH):
+    """
+    Calcule la version d'un fichier de modèle à partir de son contenu.
+
+    Deux fichiers model.joblib identiques ont la même version ; dès qu'un autre
+    modèle est sauvegardé, la version change. Cela permet d'invalider tout
+    ce qui dépend du modèle (cache de prédictions, tables précalculées...).
+
+    Args:
+        path: Chemin du fichier .joblib (par défaut MODEL_PATH)
+
+    Returns:
+        str: Les 12 premiers caractères de l'empreinte SHA-256 du fichier
+    """
+    return file_sha256(path)[:12]
+
+
+def read_file(path):
+    """
+    Lit un fichier de modèle en une seule fois.
+
+    Args:
+        path: Chemin du fichier
+
+    Returns:
+        tuple: (octets du fichier, version (12 caractères de SHA-256), os.stat_result du fichier lu)
+    """
+    with open(path, "rb") as file:
+        stat = os.fstat(file.fileno())
+        data = file.read()
+    return data, hashlib.sha256(data).hexdigest()[:12], stat
+
+
+def read_model(path=MODEL_PATH):
+    """
+    Charge un fichier de modèle en le lisant une seule fois.
+
+    L'empreinte et la date de modification viennent des octets qui ont été désérialisés :
+    si le fichier est remplacé pendant le chargement, la version décrit quand même
+    le modèle réellement chargé (et le prochain contrôle verra que le fichier a changé).
+
+    Args:
+        path: Chemin du fichier .joblib (par défaut MODEL_PATH)
+
+    Returns:
+        tuple: (modèle, version (12 caractères de SHA-256), os.stat_result du fichier lu)
+    """
+    data, sha, stat = read_file(path)
+    return joblib.load(io.BytesIO(data)), sha, stat
@@ -0,0 +1,154 @@
+# ============================================================
+# Fichier de la table de probabilités précalculée
+# Ce fichier évalue le modèle une seule fois sur tout le domaine
+# des entrées (genre x âge x salaire) et enregistre le résultat
+# sur le disque. L'API lit ensuite la table avec np.memmap :
+# une prédiction devient une simple lecture dans un tableau.
+# ============================================================
+
+import json
+import logging
+
+import numpy as np
+
+from app.config.config import PROBA_TABLE_PATH, PROBA_TABLE_SALARY_STEP
+from app.schemas.schema import get_field_bounds
+
+logger = logging.getLogger(__name__)
+
+# Chaque cellule est un entier non signé sur 16 bits :
+# - les 15 bits de poids faible contiennent la probabilité arrondie à 4 décimales (p = q / 10 000),
+#   c'est-à-dire exactement la valeur que l'API retourne
+# - le bit de poids fort contient la classe prédite par le modèle
+PROBA_SCALE = 10_000
+LABEL_BIT = 1 << 15
+
+
+def _metadata_path(path):
+    """Le fichier .json des métadonnées est à côté du fichier .npy."""
+    return path.with_suffix(".json")
+
+
+def build_table(engine, model_version, path=PROBA_TABLE_PATH, salary_step=PROBA_TABLE_SALARY_STEP):
+    """
+    Évalue le modèle sur tout le domaine des entrées et enregistre la table.
+
+    La table a la forme (genres, âges, salaires) ; chaque (genre, âge) est
+    évalué en un seul appel vectorisé sur toute la grille des salaires.
+
+    Args:
+        engine: Le moteur d'inférence (build_inference) qui expose predict_with_proba()
+        model_version (str): La version du modèle (get_model_version), écrite dans les métadonnées
+        path: Chemin du fichier .npy à écrire
+        salary_step (int): Pas de la grille des salaires
+
+    Returns:
+        dict: Les métadonnées de la table
+    """
+    gender_min, gender_max = get_field_bounds("gender")
+    age_min, age_max = get_field_bounds("age")
+    salary_min, salary_max = get_field_bounds("estimated_salary")
+
+    genders = np.arange(gender_min, gender_max + 1)
+    ages = np.arange(age_min, age_max + 1)
+    salaries = np.arange(salary_min, salary_max + 1, salary_step)
+
+    table = np.empty((len(genders), len(ages), len(salaries)), dtype=np.uint16)
+    input_array = np.empty((len(salaries), 3), dtype=float)
+    input_array[:, 2] = salaries
+
+    for i, gender in enumerate(genders):
+        for j, age in enumerate(ages):
+            input_array[:, 0] = gender
+            input_array[:, 1] = age
+            predictions, probabilities = engine.predict_with_proba(input_array)
+            quantized = np.rint(probabilities * PROBA_SCALE).astype(np.uint16)
+            table[i, j] = quantized | np.where(predictions == 1, LABEL_BIT, 0).astype(np.uint16)
+
+    metadata = {
+        "model_version": model_version,
+        "gender_min": int(gender_min),
+        "age_min": int(age_min),
+        "salary_min": int(salary_min),
+        "salary_max": int(salary_max),
+        "salary_step": int(salary_step),
+        "shape": list(table.shape),
+    }
+    np.save(path, table)
+    _metadata_path(path).write_text(json.dumps(metadata, indent=2))
+    return metadata
+
+
+class ProbaTable:
+    """
+    Table de probabilités ouverte en lecture seule avec np.memmap.
+
+    Le fichier n'est pas copié en mémoire : toutes les instances (et tous les
+    workers uvicorn) partagent les mêmes pages du cache disque du système.
+    """
+
+    def __init__(self, table, metadata):
+        self.table = table
+        self.model_version = metadata["model_version"]
+        self.gender_min = metadata["gender_min"]
+        self.age_min = metadata["age_min"]
+        self.salary_min = metadata["salary_min"]
+        self.salary_step = metadata["salary_step"]
+
+    def lookup(self, gender, age, estimated_salary):
+        """
+        Lit la prédiction d'une ligne dans la table.
+
+        Args:
+            gender (int): 0 ou 1
+            age (int): Âge (déjà validé par InputData)
+            estimated_salary (int): Salaire (déjà validé par InputData)
+
+        Returns:
+            tuple | None: (prédiction, probabilité), ou None si le salaire n'est pas sur la grille
+        """
+        offset, remainder = divmod(estimated_salary - self.salary_min, self.salary_step)
+        if remainder:
+            return None
+        cell = int(self.table[gender - self.gender_min, age - self.age_min, offset])
+        return int(cell >= LABEL_BIT), (cell & (LABEL_BIT - 1)) / PROBA_SCALE
+
+
+def load_table(model_version, path=PROBA_TABLE_PATH):
+    """
+    Ouvre la table précalculée si elle correspond au modèle chargé.
+
+    Args:
+        model_version (str): La version du modèle actuellement chargé
+        path: Chemin du fichier .npy de la table
+
+    Returns:
+        ProbaTable | None: La table, ou None si elle est absente ou calculée avec un autre modèle
+            (l'API utilise alors l'inférence normale)
+    """
+    metadata_path = _metadata_path(path)
+    if not path.exists() or not metadata_path.exists():
+        return None
+
+    metadata = json.loads(metadata_path.read_text())
+    if metadata["model_version"] != model_version:
+        logger.warning(
+            "Table %s calculée pour le modèle %s, modèle chargé %s : inférence normale",
+            path.name, metadata["model_version"], model_version,
+        )
+        return None
+
+    # mmap_mode="r" : le fichier est projeté en mémoire au lieu d'être lu
+    return ProbaTable(np.load(path, mmap_mode="r"), metadata)
+
+
+if __name__ == "__main__":
+    # Construction de la table : py -m app.models.proba_table (depuis VersionNrt_0.0.2/)
+    import time
+
+    from app.models.inference import build_inference
+    from app.models.load_model import get_model, get_model_version
+
+    start = time.perf_counter()
+    result = build_table(build_inference(get_model()), get_model_version())
+    print(f"Table {PROBA_TABLE_PATH.name} {result['shape']} écrite en {time.perf_counter() - start:.1f} s")
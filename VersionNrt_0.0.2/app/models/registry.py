@@ -0,0 +1,217 @@
+# ============================================================
+# Fichier du registre des modèles
+# Ce fichier découvre les modèles versionnés du dossier models/,
+# les charge seulement quand ils sont utilisés pour la première fois
+# et recharge automatiquement un modèle dont le fichier a changé.
+# ============================================================
+
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from app.config.config import DEFAULT_MODEL_VERSION, MODEL_RELOAD_INTERVAL, MODELS_DIR
+from app.models.inference import build_inference
+from app.models.load_model import read_model
+
+logger = logging.getLogger(__name__)
+
+
+class LoadedModel:
+    """
+    Une version de modèle chargée en mémoire.
+
+    Le modèle d'un LoadedModel n'est jamais remplacé : lors d'un rechargement,
+    le registre crée un nouvel objet et remplace la référence. Une requête
+    en cours garde donc l'ancien modèle jusqu'à la fin.
+    """
+
+    def __init__(self, version, path, model, sha, stat, load_seconds):
+        self.version = version
+        self.path = path
+        self.model = model
+        # sha : empreinte des octets désérialisés (invalide le cache et la table précalculée)
+        self.sha = sha
+        self.engine = build_inference(model)
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.loaded_at = time.time()
+        self.load_seconds = load_seconds
+        self.checked_at = time.monotonic()
+
+
+def version_from_filename(filename):
+    """
+    Déduit le nom de version à partir du nom de fichier.
+
+    "model.joblib" -> "default", "model-2024-06.joblib" -> "2024-06"
+    """
+    stem = filename[: -len(".joblib")]
+    return DEFAULT_MODEL_VERSION if stem == "model" else stem[len("model-"):]
+
+
+class ModelRegistry:
+    """
+    Registre des versions de modèles disponibles dans un dossier.
+
+    - Chargement paresseux : un modèle est chargé au premier get() qui le demande
+    - Rechargement à chaud : au plus toutes les reload_interval secondes, le fichier
+      d'un modèle chargé est comparé (date de modification, taille) ; s'il a changé,
+      la nouvelle version remplace l'ancienne en une seule affectation
+    """
+
+    def __init__(self, models_dir=MODELS_DIR, default_version=DEFAULT_MODEL_VERSION,
+                 reload_interval=MODEL_RELOAD_INTERVAL):
+        self.models_dir = models_dir
+        self.default_version = default_version
+        self.reload_interval = reload_interval
+        self._loaded = {}
+        # Le verrou ne protège que le chargement : la lecture d'un modèle déjà chargé n'attend jamais
+        self._load_lock = threading.Lock()
+
+    def discover(self):
+        """
+        Liste les fichiers de modèles présents dans le dossier.
+
+        Returns:
+            dict: {version: chemin du fichier .joblib}
+        """
+        paths = {}
+        for path in sorted(self.models_dir.glob("model*.joblib")):
+            if path.name == "model.joblib" or path.name.startswith("model-"):
+                paths[version_from_filename(path.name)] = path
+        return paths
+
+    def get(self, version=None):
+        """
+        Retourne une version chargée du modèle, en la chargeant ou la rechargeant si besoin.
+
+        Args:
+            version (str | None): La version demandée (None = DEFAULT_MODEL_VERSION)
+
+        Returns:
+            LoadedModel: Le modèle prêt à prédire
+
+        Raises:
+            KeyError: Si aucun fichier ne correspond à cette version
+        """
+        version = version or self.default_version
+        loaded = self._loaded.get(version)
+        if loaded is not None and not self._needs_reload(loaded):
+            return loaded
+        return self._load_once(version, loaded)
+
+    async def get_async(self, version=None):
+        """
+        Comme get(), pour les routes asynchrones.
+
+        Un modèle déjà chargé et à jour est servi directement ; un premier chargement
+        ou un rechargement (lecture du fichier + joblib.load) se fait dans un thread
+        pour ne pas bloquer la boucle asyncio. Pendant ce temps, les autres requêtes
+        continuent avec l'ancienne version.
+
+        Raises:
+            KeyError: Si aucun fichier ne correspond à cette version
+        """
+        version = version or self.default_version
+        loaded = self._loaded.get(version)
+        if loaded is not None and not self._needs_reload(loaded):
+            return loaded
+        return await asyncio.to_thread(self._load_once, version, loaded)
+
+    def _load_once(self, version, previous):
+        """Charge une version sous le verrou, sauf si un autre thread vient de le faire."""
+        with self._load_lock:
+            # Un autre thread a pu charger la version pendant qu'on attendait le verrou
+            current = self._loaded.get(version)
+            if current is not None and current is not previous:
+                return current
+            return self._load(version, previous)
+
+    def _needs_reload(self, loaded):
+        """Vérifie (au plus toutes les reload_interval secondes) si le fichier du modèle a changé."""
+        now = time.monotonic()
+        if now - loaded.checked_at < self.reload_interval:
+            return False
+        loaded.checked_at = now
+        try:
+            stat = os.stat(loaded.path)
+        except FileNotFoundError:
+            # Le fichier a été supprimé : on garde la version en mémoire
+            return False
+        return stat.st_mtime_ns != loaded.mtime_ns or stat.st_size != loaded.size
+
+    def _load(self, version, previous):
+        """Charge une version et la publie dans le registre."""
+        path = self.discover().get(version)
+        if path is None:
+            if previous is not None:
+                return previous
+            raise KeyError(version)
+
+        start = time.perf_counter()
+        try:
+            model, sha, stat = read_model(path)
+        except Exception:
+            # Fichier en cours d'écriture ou corrompu : on continue avec l'ancienne version
+            if previous is None:
+                raise
+            logger.exception("Rechargement du modèle %s impossible, ancienne version conservée", version)
+            return previous
+
+        loaded = LoadedModel(version, path, model, sha, stat, time.perf_counter() - start)
+        # Une seule affectation : les requêtes voient soit l'ancien objet, soit le nouveau
+        self._loaded[version] = loaded
+        if previous is not None:
+            logger.info("Modèle %s rechargé (%s -> %s)", version, previous.sha, loaded.sha)
+        return loaded
+
+    def describe(self):
+        """
+        Décrit les versions disponibles et celles qui sont chargées.
+
+        Returns:
+            list: Un dictionnaire par version trouvée dans le dossier
+        """
+        versions = []
+        for version, path in self.discover().items():
+            loaded = self._loaded.get(version)
+            versions.append({
+                "version": version,
+                "file": path.name,
+                "default": version == self.default_version,
+                "loaded": loaded is not None,
+                "sha": loaded.sha if loaded else None,
+                "engine": loaded.engine.name if loaded else None,
+                "load_seconds": round(loaded.load_seconds, 4) if loaded else None,
+            })
+        return versions
+
+
+# Registre partagé par toute l'application
+registry = ModelRegistry()
+
+
+def preload(version=None):
+    """
+    Charge une version du modèle dans le registre du processus courant.
+
+    Sert d'initializer au pool de processus d'inférence : chaque processus
+    charge le modèle une seule fois, à son démarrage.
+    """
+    registry.get(version)
+
+
+def predict_with_version(version, input_array):
+    """
+    Prédit avec le registre du processus courant (fonction envoyée au pool de processus).
+
+    Args:
+        version (str): La version du modèle
+        input_array (np.ndarray): Matrice (n_lignes, 3)
+
+    Returns:
+        tuple: (classes prédites, probabilités de la classe 1)
+    """
+    return registry.get(version).engine.predict_with_proba(input_array)
@@ -0,0 +1,63 @@
+# ============================================================
+# Endpoint de la dérive des entrées (GET /ml/drift)
+# Ce fichier compare le trafic reçu par POST /ml/predict et
+# /ml/predict/batch au profil des données d'entraînement du
+# modèle (voir app/services/drift.py), et expose le PSI de chaque
+# feature dans GET /metrics.
+# ============================================================
+
+from fastapi import APIRouter, Query
+
+from app.models.registry import registry
+from app.router.route import get_model_or_404
+from app.services.drift import drift_monitor
+from app.services.metrics import metrics
+
+router = APIRouter(
+    prefix="/ml",
+    tags=["Monitoring"]
+)
+
+
+@router.get(
+    "/drift",
+    summary="Dérive des entrées par rapport aux données d'entraînement",
+    description="Pour l'âge, le salaire, le genre et la probabilité prédite : moyenne, écart-type, histogramme, "
+                "PSI et statistique de Kolmogorov-Smirnov du trafic (tous workers confondus), comparés au profil "
+                "des données d'entraînement. Statut : ok (PSI < 0.1), warning, alert (PSI ≥ 0.25), ou "
+                "insufficient_data tant que trop peu de prédictions ont été faites."
+)
+def get_drift(version: str | None = Query(None, description="Version du modèle (défaut : la version par défaut)")):
+    """
+    Endpoint de la dérive.
+
+    Args:
+        version (str | None): La version du modèle à examiner
+
+    Returns:
+        dict: Le statut global, le profil de référence utilisé et le détail par feature
+    """
+    return drift_monitor.report(get_model_or_404(version))
+
+
+def collect_drift():
+    """PSI de chaque feature des versions chargées, lu au moment de la lecture de /metrics."""
+    rows, psi = [], []
+    for model in registry.describe():
+        if not model["loaded"]:
+            continue
+        report = drift_monitor.report(registry.get(model["version"]))
+        rows.append(({"version": report["model_version"]}, report["rows"]))
+        psi.extend(
+            ({"version": report["model_version"], "feature": name}, result["psi"])
+            for name, result in report["features"].items()
+        )
+    return [
+        ("drift_observed_rows", "gauge", "Prédictions comptées par la surveillance de la dérive (tous workers)",
+         rows),
+        ("drift_psi", "gauge", "PSI de chaque feature par rapport aux données d'entraînement", psi),
+    ]
+
+
+if drift_monitor.enabled:
+    metrics.add_collector(collect_drift)
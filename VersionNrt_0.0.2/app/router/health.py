@@ -0,0 +1,59 @@
+# ============================================================
+# Fichier des routes de santé (probes)
+# Ces endpoints permettent à un orchestrateur (Kubernetes, load balancer...)
+# de savoir si le processus tourne (live) et s'il est prêt
+# à recevoir du trafic de prédiction (ready).
+# ============================================================
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+router = APIRouter(
+    prefix="/health",
+    tags=["Santé"]
+)
+
+
+@router.get(
+    "/live",
+    summary="Le processus est-il vivant ?",
+    description="Répond 200 dès que le serveur accepte des connexions, même si le modèle n'est pas encore chargé."
+)
+def live():
+    """
+    Probe de vivacité (liveness).
+
+    Returns:
+        dict: {"status": "alive"}
+    """
+    return {"status": "alive"}
+
+
+@router.get(
+    "/ready",
+    summary="L'API est-elle prête à prédire ?",
+    description="Répond 200 quand le modèle est chargé et chauffé, 503 pendant le démarrage."
+)
+def ready(request: Request):
+    """
+    Probe de disponibilité (readiness).
+
+    L'état est rempli par le lifespan de main.py. La réponse contient aussi
+    le rapport de démarrage : temps d'import, de désérialisation et de chauffe.
+
+    Args:
+        request (Request): La requête, qui donne accès à app.state
+
+    Returns:
+        JSONResponse: 200 si prêt, 503 sinon
+    """
+    state = request.app.state
+    report = getattr(state, "startup_report", {})
+    if getattr(state, "ready", False):
+        return {"status": "ready", "startup": report}
+
+    error = getattr(state, "startup_error", None)
+    return JSONResponse(
+        status_code=503,
+        content={"status": "error" if error else "starting", "error": error, "startup": report},
+    )
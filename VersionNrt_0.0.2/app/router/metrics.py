@@ -0,0 +1,90 @@
+# ============================================================
+# Endpoint des métriques Prometheus (GET /metrics)
+# Ce fichier expose les compteurs et histogrammes de
+# app/services/metrics.py, ainsi que l'état du registre des modèles,
+# du micro-batching, du cache et de l'exécuteur d'inférence.
+# ============================================================
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.models.registry import registry
+from app.router.route import batchers, caches, executor
+from app.services.admission import admission
+from app.services.audit import audit_log
+from app.services.metrics import metrics
+
+router = APIRouter(tags=["Monitoring"])
+
+
+def collect_state():
+    """
+    Lit l'état des composants au moment de la lecture de /metrics (rien n'est compté sur le chemin des requêtes).
+
+    Returns:
+        list: Des tuples (nom, type, aide, [(labels, valeur), ...])
+    """
+    models = [
+        ({"version": model["version"], "sha": model["sha"], "engine": model["engine"]}, 1)
+        for model in registry.describe() if model["loaded"]
+    ]
+    executor_state = executor.stats()
+    audit = audit_log.stats()
+    admission_state = admission.stats()
+    return [
+        ("model_info", "gauge", "Versions du modèle chargées (sha et moteur d'inférence en labels)", models),
+        ("model_default_info", "gauge", "Version par défaut du modèle",
+         [({"version": registry.default_version}, 1)]),
+        ("prediction_cache_hits_total", "counter", "Prédictions servies par le cache",
+         [({"version": version}, cache.stats()["hits"]) for version, cache in caches.items()]),
+        ("prediction_cache_misses_total", "counter", "Prédictions absentes du cache",
+         [({"version": version}, cache.stats()["misses"]) for version, cache in caches.items()]),
+        ("micro_batches_total", "counter", "Lots évalués par le micro-batcher",
+         [({"version": version}, batcher.stats()["batches"]) for version, (_, batcher) in batchers.items()]),
+        ("micro_batch_rows_total", "counter", "Lignes évaluées par le micro-batcher",
+         [({"version": version}, batcher.stats()["rows"]) for version, (_, batcher) in batchers.items()]),
+        ("inference_executor_pending", "gauge", "Appels en cours ou en attente dans l'exécuteur d'inférence",
+         [({"kind": executor_state["kind"]}, executor_state["pending"])]),
+        ("inference_executor_queued", "gauge", "Appels en attente d'un worker libre",
+         [({"kind": executor_state["kind"]}, executor_state["queued"])]),
+        ("admission_in_flight", "gauge", "Requêtes de prédiction admises et en cours de traitement",
+         [({}, admission_state["in_flight"])]),
+        ("admission_max_concurrent", "gauge", "Nombre maximal de requêtes de prédiction traitées en même temps",
+         [({}, admission_state["max_concurrent"])]),
+        ("admission_queued", "gauge", "Requêtes en attente d'une place (contrôle d'admission)",
+         [({}, admission_state["queued"])]),
+        ("audit_buffered_rows", "gauge", "Prédictions en attente d'écriture dans le journal d'audit",
+         [({}, audit["buffered_rows"])]),
+        ("audit_appended_rows_total", "counter", "Prédictions ajoutées au journal d'audit",
+         [({}, audit["appended_rows"])]),
+        ("audit_dropped_rows_total", "counter", "Prédictions non journalisées (tampon plein)",
+         [({"policy": audit["policy"]}, audit["dropped_rows"])]),
+        ("audit_blocked_calls_total", "counter", "Requêtes qui ont attendu de la place dans le tampon (politique block)",
+         [({}, audit["blocked_calls"])]),
+        ("audit_written_rows_total", "counter", "Prédictions écrites dans les fichiers d'audit",
+         [({}, audit["written_rows"])]),
+        ("audit_lost_rows_total", "counter", "Prédictions perdues sur une erreur d'écriture",
+         [({}, audit["lost_rows"])]),
+        ("audit_files_written_total", "counter", "Fichiers d'audit terminés", [({}, audit["files_written"])]),
+        ("audit_write_errors_total", "counter", "Erreurs d'écriture du journal d'audit", [({}, audit["write_errors"])]),
+    ]
+
+
+metrics.add_collector(collect_state)
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Métriques Prometheus",
+    description="Compteurs de requêtes par statut, requêtes en cours, histogrammes de latence par étape "
+                "et versions du modèle, au format texte de Prometheus."
+)
+def get_metrics():
+    """
+    Endpoint lu par Prometheus.
+
+    Returns:
+        PlainTextResponse: Les métriques au format texte Prometheus (version 0.0.4)
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,205 @@
+# ============================================================
+# Fichier des routes du serveur multi-modèles
+# Ces endpoints servent tous les modèles déclarés dans MODEL_CATALOG
+# (config.py) depuis le même processus :
+#   GET  /models                      : le catalogue et les compteurs du cache
+#   GET  /models/{name}               : la description et le schéma d'entrée d'un modèle
+#   POST /models/{name}/predict       : une prédiction
+#   POST /models/{name}/predict/batch : un lot {"instances": [...]}
+# Chaque modèle valide son corps avec son propre schéma Pydantic.
+# ============================================================
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import ValidationError
+
+from app.models.catalog import catalog, model_cache
+from app.router.route import request_validation_error
+from app.schemas.schema import ModelBatchPredictionResponse, ModelPredictionResponse
+from app.services.metrics import mark, metrics, TimedRoute
+
+router = APIRouter(
+    prefix="/models",
+    tags=["Multi-modèles"],
+    route_class=TimedRoute
+)
+
+
+def get_spec(name):
+    """Retourne la déclaration du modèle, ou une erreur 404 s'il n'est pas dans le catalogue."""
+    try:
+        return catalog[name]
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Modèle inconnu : {name} (voir GET /models)")
+
+
+async def get_loaded(name):
+    """
+    Retourne le modèle chargé.
+
+    Un modèle déjà en cache est servi directement ; sinon il est chargé dans un thread
+    pour ne pas bloquer la boucle asyncio pendant la lecture du fichier.
+    """
+    loaded = model_cache.get_if_loaded(name)
+    if loaded is None:
+        loaded = await asyncio.to_thread(model_cache.get, name)
+    return loaded
+
+
+async def validate_body(request, schema):
+    """
+    Valide le corps JSON de la requête avec le schéma du modèle.
+
+    Raises:
+        RequestValidationError: Même réponse 422 que lorsque FastAPI valide le corps lui-même
+            (y compris pour un corps qui n'est pas de l'UTF-8)
+    """
+    try:
+        return schema.model_validate_json(await request.body())
+    except ValidationError as exc:
+        raise request_validation_error(exc)
+
+
+def schema_documentation():
+    """Corps documentés dans Swagger : un exemple par modèle du catalogue."""
+    return {
+        name: {"summary": spec.description or name, "value": spec.schema.model_config.get("json_schema_extra", {})
+               .get("example", {})}
+        for name, spec in catalog.items()
+    }
+
+
+@router.get(
+    "",
+    summary="Catalogue des modèles",
+    description="Liste les modèles servis, leur schéma d'entrée, leur état (chargé ou non, taille en mémoire) "
+                "et les compteurs du cache : chargements, hits et déchargements."
+)
+def list_models():
+    """
+    Endpoint du catalogue.
+
+    Returns:
+        dict: Le budget mémoire, la mémoire utilisée et la description de chaque modèle
+    """
+    return model_cache.describe()
+
+
+@router.get(
+    "/{name}",
+    summary="Description d'un modèle",
+    description="Retourne la description du modèle et le schéma JSON de ses entrées."
+)
+def describe_model(name: str):
+    """
+    Args:
+        name (str): Le nom du modèle dans le catalogue
+
+    Returns:
+        dict: L'état du modèle et son schéma d'entrée
+    """
+    spec = get_spec(name)
+    state = next(model for model in model_cache.describe()["models"] if model["name"] == name)
+    return {**state, "input_schema": spec.schema.model_json_schema()}
+
+
+@router.post(
+    "/{name}/predict",
+    response_model=ModelPredictionResponse,
+    summary="Prédiction avec un modèle du catalogue",
+    description="Le corps est validé avec le schéma d'entrée du modèle (voir GET /models/{name}).",
+    openapi_extra={"requestBody": {"required": True, "content": {"application/json": {
+        "schema": {"type": "object"}, "examples": schema_documentation()
+    }}}}
+)
+async def predict_model(name: str, request: Request):
+    """
+    Endpoint de prédiction unitaire du serveur multi-modèles.
+
+    Args:
+        name (str): Le nom du modèle dans le catalogue
+        request (Request): La requête, dont le corps suit le schéma du modèle
+
+    Returns:
+        ModelPredictionResponse: La classe prédite et la probabilité de chaque classe
+    """
+    spec = get_spec(name)
+    data = await validate_body(request, spec.schema)
+    mark("validate")
+    loaded = await get_loaded(name)
+    mark("lookup")
+    predictions, probabilities = loaded.predictor.predict(spec.to_matrix([data]))
+    metrics.inc("catalog_model_rows_total", name)
+    mark("inference")
+    return ModelPredictionResponse(
+        model=name,
+        model_sha=loaded.sha,
+        prediction=int(predictions[0]),
+        probabilities={
+            str(label): round(float(p), 4) for label, p in zip(loaded.predictor.classes.tolist(), probabilities[0])
+        },
+    )
+
+
+@router.post(
+    "/{name}/predict/batch",
+    response_model=ModelBatchPredictionResponse,
+    summary="Prédiction par lot avec un modèle du catalogue",
+    description="Le corps est {\"instances\": [...]}, chaque instance suivant le schéma d'entrée du modèle.",
+    openapi_extra={"requestBody": {"required": True, "content": {"application/json": {
+        "schema": {"type": "object", "properties": {"instances": {"type": "array", "items": {"type": "object"}}}}
+    }}}}
+)
+async def predict_model_batch(name: str, request: Request):
+    """
+    Endpoint de prédiction par lot du serveur multi-modèles.
+
+    Args:
+        name (str): Le nom du modèle dans le catalogue
+        request (Request): La requête : {"instances": [...]}
+
+    Returns:
+        ModelBatchPredictionResponse: Les classes et probabilités, dans l'ordre des instances
+    """
+    spec = get_spec(name)
+    data = await validate_body(request, spec.batch_schema)
+    matrix = spec.to_matrix(data.instances)
+    mark("validate")
+    loaded = await get_loaded(name)
+    mark("lookup")
+    predictions, probabilities = loaded.predictor.predict(matrix)
+    metrics.inc("catalog_model_rows_total", name, amount=len(matrix))
+    mark("inference")
+    return ModelBatchPredictionResponse(
+        model=name,
+        model_sha=loaded.sha,
+        classes=loaded.predictor.classes.tolist(),
+        predictions=predictions.tolist(),
+        probabilities=probabilities.round(4).tolist(),
+    )
+
+
+def collect_catalog():
+    """État du cache de modèles, lu au moment de la lecture de /metrics."""
+    state = model_cache.describe()
+    models = state["models"]
+    return [
+        ("model_cache_budget_bytes", "gauge", "Mémoire maximale des modèles chargés du catalogue",
+         [({}, state["budget_bytes"])]),
+        ("model_cache_used_bytes", "gauge", "Mémoire estimée des modèles chargés du catalogue",
+         [({}, state["used_bytes"])]),
+        ("model_cache_loaded", "gauge", "Modèle du catalogue chargé (1) ou non (0)",
+         [({"model": model["name"]}, int(model["loaded"])) for model in models]),
+        ("model_cache_size_bytes", "gauge", "Mémoire estimée de chaque modèle chargé",
+         [({"model": model["name"]}, model["size_bytes"]) for model in models if model["loaded"]]),
+        ("model_cache_loads_total", "counter", "Chargements de chaque modèle du catalogue",
+         [({"model": model["name"]}, model["loads"]) for model in models]),
+        ("model_cache_hits_total", "counter", "Appels servis par un modèle déjà chargé",
+         [({"model": model["name"]}, model["hits"]) for model in models]),
+        ("model_cache_evictions_total", "counter", "Déchargements de chaque modèle (budget mémoire dépassé)",
+         [({"model": model["name"]}, model["evictions"]) for model in models]),
+    ]
+
+
+metrics.add_collector(collect_catalog)
@@ -1,15 +1,432 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+import json
+import time
 import numpy as np
-from app.schemas.schema import InputData
+from app.schemas.schema import InputData, get_field_bounds
 from app.schemas.schema import PredictionResponse # Importation du schéma de sortie (la réponse que l'API retourne)
-from app.models.load_model import get_model # Importation de la fonction qui charge le modèle ML 
+from app.schemas.schema import BatchInputData, BatchPredictionResponse # Schémas d'entrée/sortie pour les prédictions par lot
+from app.schemas.schema import ColumnarBatchInputData, ColumnarPredictionResponse # Lots envoyés par colonnes
+from app.schemas.schema import GridPredictionResponse # Schéma de la grille de probabilités (vue "what-if" du frontend)
+from app.models.registry import registry, preload, predict_with_version # Registre des versions du modèle (chargement paresseux + rechargement à chaud)
+from app.models.proba_table import load_table # Table de probabilités précalculée (lecture np.memmap)
+from app.services.batcher import MicroBatcher # Regroupement des requêtes unitaires simultanées
+from app.services.cache import PredictionCache # Cache LRU des dernières prédictions
+from app.services.executor import InferenceExecutor # Où tourne le calcul : boucle asyncio, threads ou processus
+from app.services.metrics import metrics, mark, TimedRoute # Métriques Prometheus et chronométrage des étapes
+from app.services.audit import audit_log # Journal d'audit des prédictions (écrit en arrière-plan)
+from app.services.drift import drift_monitor # Statistiques du trafic comparées aux données d'entraînement
+from app.services.formats import JSON, ARROW_STREAM, NDARRAY, CODECS, FormatError, media_type, validate_matrix # Formats binaires des lots
+from app.services.validation import validate_columns, validate_records # Validation des lots colonne par colonne
+from app.config.config import MAX_BATCH_SIZE, GRID_MAX_CELLS
+from app.config.config import MICRO_BATCH_ENABLED, MICRO_BATCH_WINDOW_MS, MICRO_BATCH_MAX_SIZE
+from app.config.config import PREDICTION_CACHE_SIZE, PROBA_TABLE_ENABLED, WARMUP_PREDICTIONS
+from app.config.config import INFERENCE_EXECUTOR, INFERENCE_WORKERS
 
+# route_class=TimedRoute : chaque route mesure la durée de ses étapes (voir GET /metrics)
 router = APIRouter(
     prefix="/ml",
-    tags=["Prediction"]
+    tags=["Prediction"],
+    route_class=TimedRoute
 )
 
-model = get_model()
+# Le modèle n'est plus chargé à l'import : le registre le charge à la première requête
+# et le recharge automatiquement quand son fichier change.
+# Les objets ci-dessous sont rangés par version du modèle ("default", "v2", ...).
+
+# L'exécuteur d'inférence choisi dans config.py ; en mode "process", chaque processus précharge le modèle par défaut
+executor = InferenceExecutor(INFERENCE_EXECUTOR, INFERENCE_WORKERS, initializer=preload)
+
+# Un micro-batcher par version : il regroupe les appels à POST /ml/predict arrivés dans la même fenêtre de temps
+# On garde le sha du modèle avec le batcher pour en créer un nouveau quand le modèle est rechargé
+batchers = {}
+
+# Un cache par version : il garde les dernières prédictions et se vide quand le sha du modèle change
+caches = {}
+
+# Tables précalculées déjà ouvertes, rangées par sha (None = pas de table pour ce modèle)
+tables = {}
+
+
+def get_model_or_404(version=None):
+    """
+    Retourne la version demandée du modèle, ou une erreur 404 si elle n'existe pas.
+
+    Args:
+        version (str | None): La version demandée (None = version par défaut)
+
+    Returns:
+        LoadedModel: Le modèle chargé par le registre
+    """
+    try:
+        return registry.get(version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Version de modèle inconnue : {version}")
+
+
+async def get_loaded_or_404(version=None):
+    """
+    Comme get_model_or_404, pour les routes asynchrones : un chargement ou un rechargement
+    du modèle se fait dans un thread (registry.get_async) au lieu de bloquer la boucle asyncio.
+    """
+    try:
+        return await registry.get_async(version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Version de modèle inconnue : {version}")
+
+
+async def infer(loaded, input_array):
+    """
+    Calcule les prédictions d'une matrice avec l'exécuteur d'inférence.
+
+    En mode "process", le calcul est fait par le modèle préchargé dans le processus du pool
+    (seuls la version et la matrice voyagent entre les processus).
+
+    Args:
+        loaded (LoadedModel): La version du modèle à utiliser
+        input_array (np.ndarray): Matrice (n_lignes, 3)
+
+    Returns:
+        tuple: (classes prédites, probabilités de la classe 1)
+    """
+    start = time.perf_counter()
+    if executor.kind == "process":
+        result = await executor.run(predict_with_version, loaded.version, input_array)
+    else:
+        result = await executor.run(loaded.engine.predict_with_proba, input_array)
+    metrics.observe("model_inference_seconds", time.perf_counter() - start, loaded.version)
+    metrics.inc("model_inference_rows_total", loaded.version, amount=len(input_array))
+    return result
+
+
+def get_batcher(loaded):
+    """Retourne le micro-batcher du modèle chargé (un nouveau si le modèle a été rechargé)."""
+    entry = batchers.get(loaded.version)
+    if entry is None or entry[0] != loaded.sha:
+        # L'ancien batcher termine ses lots en cours avec l'ancien modèle
+        batcher = MicroBatcher(
+            lambda input_array: infer(loaded, input_array), MICRO_BATCH_WINDOW_MS, MICRO_BATCH_MAX_SIZE,
+            version=loaded.version
+        )
+        entry = (loaded.sha, batcher)
+        batchers[loaded.version] = entry
+    return entry[1]
+
+
+def get_cache(loaded):
+    """Retourne le cache de prédictions de cette version du modèle."""
+    cache = caches.get(loaded.version)
+    if cache is None:
+        cache = caches[loaded.version] = PredictionCache(PREDICTION_CACHE_SIZE)
+    return cache
+
+
+def get_table(loaded):
+    """Retourne la table précalculée si elle a été construite avec ce modèle, sinon None."""
+    if not PROBA_TABLE_ENABLED:
+        return None
+    if loaded.sha not in tables:
+        tables[loaded.sha] = load_table(loaded.sha)
+    return tables[loaded.sha]
+
+
+def predict_one(engine, row):
+    """
+    Évalue une seule ligne directement avec le moteur d'inférence (utilisé pour la chauffe).
+
+    Args:
+        engine: Le moteur d'inférence du modèle chargé
+        row (tuple): (gender, age, estimated_salary)
+
+    Returns:
+        tuple: (prédiction, probabilité de la classe 1)
+    """
+    input_array = np.array([row], dtype=float)
+
+    # engine.predict_with_proba() retourne les classes prédites et les probabilités de la classe 1
+    # (achat = OUI) pour chaque ligne ; ici il n'y a qu'une ligne, d'où le [0]
+    predictions, probabilities = engine.predict_with_proba(input_array)
+    return predictions[0], probabilities[0]
+
+
+async def predict_row(loaded, data):
+    """
+    Calcule la prédiction d'une ligne avec une version donnée du modèle.
+
+    Ordre des sources : table précalculée (lecture O(1)), puis cache, puis modèle
+    (via le micro-batcher quand MICRO_BATCH_ENABLED est actif, puis l'exécuteur d'inférence).
+
+    Args:
+        loaded (LoadedModel): La version du modèle à utiliser
+        data (InputData): Les données d'entrée validées par Pydantic
+
+    Returns:
+        dict: La prédiction (0 ou 1) et la probabilité d'achat
+    """
+    # Le tuple des features sert à la fois de ligne pour le modèle et de clé pour le cache
+    row = (data.gender, data.age, data.estimated_salary)
+
+    cached = None
+    table = get_table(loaded)
+    if table is not None:
+        cached = table.lookup(*row)
+    cache = get_cache(loaded)
+    if cached is None:
+        cached = cache.get(row, loaded.sha)
+    mark("lookup")
+
+    if cached is not None:
+        prediction, probability = cached
+        probability = round(probability, 4)
+    else:
+        if MICRO_BATCH_ENABLED:
+            prediction, probability = await get_batcher(loaded).submit(row)
+        else:
+            predictions, probabilities = await infer(loaded, np.array([row], dtype=float))
+            prediction, probability = predictions[0], probabilities[0]
+
+        # round(..., 4) arrondit à 4 décimales pour une meilleure lisibilité
+        prediction = int(prediction)
+        probability = round(float(probability), 4)
+        cache.put(row, (prediction, probability), loaded.sha)
+        mark("inference")
+
+    # Chaque réponse est journalisée, qu'elle vienne de la table, du cache ou du modèle
+    await audit_log.record(loaded, "predict", row, prediction, probability)
+    drift_monitor.observe(loaded, row, probability)
+
+    # On retourne un dictionnaire qui sera automatiquement converti en JSON par FastAPI
+    # Ce dictionnaire correspond au schéma PredictionResponse (prediction + probability)
+    return {
+        "prediction": prediction,       # Le résultat : 0 (n'achète pas) ou 1 (achète)
+        "probability": probability       # La probabilité d'achat (entre 0.0 et 1.0)
+    }
+
+
+async def predict_rows(loaded, input_array):
+    """
+    Calcule les prédictions d'un lot avec une version donnée du modèle.
+
+    Toutes les instances sont dans une seule matrice (n_lignes x 3) : le moteur
+    d'inférence est appelé une seule fois et son coût fixe est payé une fois
+    pour tout le lot au lieu d'une fois par ligne.
+
+    Args:
+        loaded (LoadedModel): La version du modèle à utiliser
+        input_array (np.ndarray): Matrice (n_lignes, 3) des instances validées
+
+    Returns:
+        tuple: (classes prédites, probabilités arrondies), dans l'ordre des instances
+    """
+    predictions, probabilities = await infer(loaded, input_array)
+    mark("inference")
+    probabilities = np.round(probabilities, 4)
+    await audit_log.record_batch(loaded, "batch", input_array, predictions, probabilities)
+    drift_monitor.observe_batch(loaded, input_array, probabilities)
+    return predictions, probabilities
+
+
+def request_validation_error(exc):
+    """
+    Convertit l'erreur de model_validate_json en la même réponse 422 que lorsque FastAPI valide le corps lui-même.
+
+    Pour un corps qui n'est pas du JSON (ou pas de l'UTF-8), Pydantic cite le corps brut (bytes) dans "input" :
+    il est remplacé par son texte décodé, sinon la réponse 422 elle-même ne pourrait pas être encodée en JSON.
+
+    Args:
+        exc (ValidationError): L'erreur levée par Pydantic
+
+    Returns:
+        RequestValidationError: L'exception à lever
+    """
+    errors = []
+    for error in exc.errors(include_url=False):
+        error = {**error, "loc": ("body", *error["loc"])}
+        if isinstance(error.get("input"), bytes):
+            error["input"] = error["input"].decode("utf-8", errors="replace")
+        errors.append(error)
+    return RequestValidationError(errors)
+
+
+def validate_json_batch(body):
+    """
+    Valide le corps JSON de POST /ml/predict/batch, colonne par colonne.
+
+    - {"instances": [...]} (BatchInputData) : si une ligne est invalide, tout le lot est refusé ;
+      Pydantic revalide alors le corps pour renvoyer ses erreurs 422 habituelles
+    - {"columns": {...}} (ColumnarBatchInputData) : les lignes invalides sont rejetées une à une
+
+    Aucun objet InputData n'est construit pour un lot valide.
+
+    Args:
+        body (bytes): Le corps de la requête
+
+    Returns:
+        tuple: (ColumnReport, True pour un corps par colonnes)
+
+    Raises:
+        RequestValidationError: Si le corps "instances" ne respecte pas BatchInputData
+        HTTPException: 422 si le corps "columns" est mal formé
+    """
+    try:
+        payload = json.loads(body)
+    except (ValueError, UnicodeDecodeError):
+        payload = None
+
+    if isinstance(payload, dict) and isinstance(payload.get("columns"), dict):
+        try:
+            report = validate_columns(payload["columns"])
+        except (ValueError, TypeError) as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        if not 1 <= len(report.matrix) <= MAX_BATCH_SIZE:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Le lot doit contenir entre 1 et {MAX_BATCH_SIZE} lignes (reçu {len(report.matrix)})"
+            )
+        return report, True
+
+    instances = payload.get("instances") if isinstance(payload, dict) else None
+    if (
+        isinstance(instances, list)
+        and 1 <= len(instances) <= MAX_BATCH_SIZE
+        and all(isinstance(row, dict) for row in instances)
+    ):
+        try:
+            report = validate_records(instances)
+        except (ValueError, TypeError):
+            # Valeurs que la validation par colonnes ne sait pas lire (listes imbriquées...) : voir Pydantic
+            report = None
+        if report is not None and not report.n_invalid:
+            return report, False
+
+    # Lot refusé : InputData reste la référence, Pydantic donne le détail des erreurs
+    try:
+        data = BatchInputData.model_validate_json(body)
+    except ValidationError as exc:
+        raise request_validation_error(exc)
+    return validate_records([row.model_dump() for row in data.instances]), False
+
+
+async def predict_batch_request(loaded, request):
+    """
+    Calcule les prédictions d'un lot dans le format choisi par le client (en-tête Content-Type).
+
+    - application/json (défaut) : BatchInputData, réponse BatchPredictionResponse ;
+      ou ColumnarBatchInputData, réponse ColumnarPredictionResponse
+    - Arrow IPC ou tableau NumPy brut : le corps est lu sans passer par Pydantic
+      (voir app/services/formats.py) et la réponse revient dans le même format
+
+    Args:
+        loaded (LoadedModel): La version du modèle à utiliser
+        request (Request): La requête, dont le corps n'a pas encore été lu
+
+    Returns:
+        dict | Response: Le dictionnaire BatchPredictionResponse ou ColumnarPredictionResponse (JSON),
+        ou la réponse binaire
+    """
+    fmt = media_type(request.headers.get("content-type"))
+    if fmt == JSON:
+        report, columnar = validate_json_batch(await request.body())
+        mark("validate")
+        if not columnar:
+            predictions, probabilities = await predict_rows(loaded, report.matrix)
+            return {"predictions": predictions.tolist(), "probabilities": probabilities.tolist()}
+
+        # Lot par colonnes : seules les lignes valides sont évaluées, les autres restent à null
+        valid = report.valid
+        n_rows = len(valid)
+        predictions, probabilities = [None] * n_rows, [None] * n_rows
+        if valid.any():
+            valid_predictions, valid_probabilities = await predict_rows(loaded, report.matrix[valid])
+            for row, prediction, probability in zip(
+                np.flatnonzero(valid).tolist(), valid_predictions.tolist(), valid_probabilities.tolist()
+            ):
+                predictions[row] = prediction
+                probabilities[row] = probability
+        return {"predictions": predictions, "probabilities": probabilities, "errors": report.errors()}
+
+    if fmt not in CODECS:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Content-Type non pris en charge : {fmt} (attendu : {JSON}, {ARROW_STREAM} ou {NDARRAY})"
+        )
+    decode, encode = CODECS[fmt]
+    try:
+        input_array = decode(await request.body())
+        mark("decode")
+        validate_matrix(input_array, MAX_BATCH_SIZE)
+    except FormatError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    mark("validate")
+
+    predictions, probabilities = await predict_rows(loaded, input_array)
+    return Response(encode(predictions, probabilities), media_type=fmt)
+
+
+# Documentation OpenAPI du corps des endpoints par lot : JSON (BatchInputData ou ColumnarBatchInputData) ou binaire.
+# InputData est déjà dans les composants du schéma OpenAPI (POST /ml/predict), d'où le ref_template.
+_batch_schema = BatchInputData.model_json_schema(ref_template="#/components/schemas/{model}")
+_batch_schema.pop("$defs", None)
+# InputColumns n'est pas dans les composants : sa définition remplace la référence
+_columnar_schema = ColumnarBatchInputData.model_json_schema()
+_columnar_schema["properties"]["columns"] = {
+    **_columnar_schema.pop("$defs")["InputColumns"],
+    "description": _columnar_schema["properties"]["columns"]["description"],
+}
+BATCH_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            JSON: {"schema": {"oneOf": [_batch_schema, _columnar_schema]}},
+            ARROW_STREAM: {"schema": {"type": "string", "format": "binary"}},
+            NDARRAY: {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+BATCH_RESPONSES = {200: {"content": {ARROW_STREAM: {}, NDARRAY: {}}}}
+
+
+def warm_up(version=None):
+    """
+    Charge une version du modèle et la prépare avant la première vraie requête.
+
+    Appelé au démarrage de l'application (lifespan dans main.py) : on désérialise
+    le modèle, on fait quelques prédictions fictives couvrant les bornes de InputData
+    (une par une puis en lot) et on ouvre la table précalculée si elle existe.
+
+    Args:
+        version (str | None): La version à préparer (None = version par défaut)
+
+    Returns:
+        dict: Les durées (en secondes) de désérialisation et de chauffe, et la version chargée
+    """
+    loaded = registry.get(version)
+
+    start = time.perf_counter()
+    # Lignes fictives entre les bornes minimales et maximales de chaque champ
+    bounds = [get_field_bounds(name) for name in ("gender", "age", "estimated_salary")]
+    rows = [
+        tuple(low + (high - low) * i // max(WARMUP_PREDICTIONS - 1, 1) for low, high in bounds)
+        for i in range(WARMUP_PREDICTIONS)
+    ]
+    for row in rows:
+        predict_one(loaded.engine, row)
+    loaded.engine.predict_with_proba(np.array(rows, dtype=float))
+
+    table = get_table(loaded)
+    if table is not None:
+        table.lookup(*rows[0])
+
+    return {
+        "model_version": loaded.version,
+        "model_sha": loaded.sha,
+        "engine": loaded.engine.name,
+        "proba_table": table is not None,
+        "unpickle_seconds": round(loaded.load_seconds, 4),
+        "warmup_seconds": round(time.perf_counter() - start, 4),
+    }
+
 
 @router.post(
     "/predict",
@@ -17,13 +434,13 @@ model = get_model()
     summary="Prédire si une personne va acheter",
     description="Envoyer les données (gender, age, estimated_salary) pour obtenir une prédiction d'achat."
 )
-def predict(data: InputData):
+async def predict(data: InputData):
     """
     Endpoint de prédiction.
 
     Reçoit les données d'un utilisateur (genre, âge, salaire estimé)
     et retourne si la personne est susceptible d'acheter (0 ou 1)
-    avec la probabilité associée.
+    avec la probabilité associée, calculée par la version par défaut du modèle.
 
     Args:
         data (InputData): Les données d'entrée validées par Pydantic
@@ -31,21 +448,197 @@ def predict(data: InputData):
     Returns:
         PredictionResponse: La prédiction (0 ou 1) et la probabilité d'achat
     """
-    
-    input_array = np.array([[data.gender, data.age, data.estimated_salary]])
+    mark("validate")
+    return await predict_row(await get_loaded_or_404(), data)
+
+
+@router.post(
+    "/predict/batch",
+    response_model=BatchPredictionResponse | ColumnarPredictionResponse,
+    summary="Prédire pour plusieurs personnes en un seul appel",
+    description="Envoyer une liste de (gender, age, estimated_salary) pour obtenir toutes les prédictions "
+                "en un seul passage du modèle. Les résultats sont retournés dans l'ordre des instances. "
+                "Avec un corps par colonnes ({\"columns\": {\"gender\": [...], \"age\": [...], "
+                "\"estimated_salary\": [...]}}), les lignes invalides sont rejetées une à une (null + errors) "
+                "et les autres sont évaluées. "
+                f"Pour les gros volumes, le lot peut aussi être envoyé en Arrow IPC ({ARROW_STREAM}) "
+                f"ou en tableau NumPy float64 brut ({NDARRAY}) : la réponse revient dans le même format.",
+    openapi_extra=BATCH_OPENAPI,
+    responses=BATCH_RESPONSES
+)
+async def predict_batch(request: Request):
+    """
+    Endpoint de prédiction par lot (version par défaut du modèle).
 
-    prediction = int(model.predict(input_array)[0])
+    Args:
+        request (Request): La requête ; son corps est lu selon son Content-Type
 
-    # model.predict_proba() retourne un tableau de probabilités pour chaque classe
-    # La forme du résultat est [[proba_classe_0, proba_classe_1]]
-    # [0] accède à la première observation
-    # [1] accède à la probabilité de la classe 1 (achat = OUI)
-    # round(..., 4) arrondit à 4 décimales pour une meilleure lisibilité
-    probability = round(float(model.predict_proba(input_array)[0][1]), 4)
+    Returns:
+        BatchPredictionResponse: Les prédictions et les probabilités, dans l'ordre des instances
+    """
+    return await predict_batch_request(await get_loaded_or_404(), request)
+
+
+@router.get(
+    "/predict/grid",
+    response_model=GridPredictionResponse,
+    summary="Probabilité d'achat sur toute la grille âge x salaire",
+    description="Calcule en un seul passage du modèle la probabilité d'achat pour chaque genre, "
+                "chaque âge (pas age_step) et chaque salaire (pas salary_step) entre les bornes de InputData. "
+                "Sert à tracer la carte de probabilité et la frontière de décision (probabilité 0.5)."
+)
+async def predict_grid(
+    age_step: int = Query(1, ge=1, description="Pas de la grille des âges (en années)"),
+    salary_step: int = Query(1000, ge=1, description="Pas de la grille des salaires (en €)"),
+    version: str | None = Query(None, description="Version du modèle (défaut : la version par défaut)"),
+):
+    """
+    Endpoint de la grille de probabilités.
+
+    Args:
+        age_step (int): Pas de la grille des âges
+        salary_step (int): Pas de la grille des salaires
+        version (str | None): Version du modèle à utiliser
+
+    Returns:
+        GridPredictionResponse: Les axes de la grille et les prédictions de chaque point
+    """
+    mark("validate")
+    loaded = await get_loaded_or_404(version)
+
+    (gender_min, gender_max), (age_min, age_max), (salary_min, salary_max) = [
+        get_field_bounds(name) for name in ("gender", "age", "estimated_salary")
+    ]
+    genders = np.arange(gender_min, gender_max + 1)
+    ages = np.arange(age_min, age_max + 1, age_step)
+    salaries = np.arange(salary_min, salary_max + 1, salary_step)
+    shape = (len(genders), len(ages), len(salaries))
+    if np.prod(shape) > GRID_MAX_CELLS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Grille trop grande ({int(np.prod(shape))} points, maximum {GRID_MAX_CELLS}) : augmenter les pas"
+        )
+
+    # Tous les points de la grille dans une seule matrice (n_points, 3), dans l'ordre genre -> âge -> salaire
+    input_array = np.stack(np.meshgrid(genders, ages, salaries, indexing="ij"), axis=-1).reshape(-1, 3).astype(float)
+    mark("build_array")
+
+    predictions, probabilities = await infer(loaded, input_array)
+    mark("inference")
 
-    # On retourne un dictionnaire qui sera automatiquement converti en JSON par FastAPI
-    # Ce dictionnaire correspond au schéma PredictionResponse (prediction + probability)
     return {
-        "prediction": prediction,       # Le résultat : 0 (n'achète pas) ou 1 (achète)
-        "probability": probability       # La probabilité d'achat (entre 0.0 et 1.0)
+        "model_version": loaded.version,
+        "model_sha": loaded.sha,
+        "genders": genders.tolist(),
+        "ages": ages.tolist(),
+        "salaries": salaries.tolist(),
+        "predictions": np.asarray(predictions).reshape(shape).tolist(),
+        "probabilities": np.round(probabilities, 4).reshape(shape).tolist(),
+    }
+
+
+@router.post(
+    "/v/{version}/predict",
+    response_model=PredictionResponse,
+    summary="Prédire avec une version précise du modèle",
+    description="Comme POST /ml/predict, mais avec la version du modèle choisie dans l'URL (voir GET /ml/models)."
+)
+async def predict_version(version: str, data: InputData):
+    """
+    Endpoint de prédiction avec une version épinglée du modèle.
+
+    Args:
+        version (str): La version du modèle, par exemple "default" ou "2024-06"
+        data (InputData): Les données d'entrée validées par Pydantic
+
+    Returns:
+        PredictionResponse: La prédiction (0 ou 1) et la probabilité d'achat
+    """
+    mark("validate")
+    return await predict_row(await get_loaded_or_404(version), data)
+
+
+@router.post(
+    "/v/{version}/predict/batch",
+    response_model=BatchPredictionResponse | ColumnarPredictionResponse,
+    summary="Prédire un lot avec une version précise du modèle",
+    description="Comme POST /ml/predict/batch (JSON, Arrow IPC ou tableau NumPy brut), "
+                "mais avec la version du modèle choisie dans l'URL.",
+    openapi_extra=BATCH_OPENAPI,
+    responses=BATCH_RESPONSES
+)
+async def predict_batch_version(version: str, request: Request):
+    """
+    Endpoint de prédiction par lot avec une version épinglée du modèle.
+
+    Args:
+        version (str): La version du modèle
+        request (Request): La requête ; son corps est lu selon son Content-Type
+
+    Returns:
+        BatchPredictionResponse: Les prédictions et les probabilités, dans l'ordre des instances
+    """
+    return await predict_batch_request(await get_loaded_or_404(version), request)
+
+
+@router.get(
+    "/models",
+    summary="Versions du modèle disponibles",
+    description="Liste les fichiers model*.joblib trouvés par le registre et indique ceux qui sont chargés."
+)
+def list_models():
+    """
+    Endpoint qui décrit le registre des modèles.
+
+    Returns:
+        dict: La version par défaut et la description de chaque version
+    """
+    return {"default": registry.default_version, "versions": registry.describe()}
+
+
+@router.get(
+    "/batching/stats",
+    summary="Statistiques du micro-batching",
+    description="Nombre de lots, taille moyenne et distribution des tailles de lot pour POST /ml/predict."
+)
+def batching_stats():
+    """
+    Endpoint des statistiques du micro-batching.
+
+    Returns:
+        dict: Les statistiques calculées par MicroBatcher.stats(), par version du modèle
+    """
+    return {
+        "enabled": MICRO_BATCH_ENABLED,
+        "versions": {version: batcher.stats() for version, (_, batcher) in batchers.items()}
     }
+
+
+@router.get(
+    "/cache/stats",
+    summary="Statistiques du cache de prédictions",
+    description="Taille, hits, misses et version du modèle du cache utilisé par POST /ml/predict."
+)
+def cache_stats():
+    """
+    Endpoint des statistiques du cache de prédictions.
+
+    Returns:
+        dict: Les compteurs calculés par PredictionCache.stats(), par version du modèle
+    """
+    return {version: cache.stats() for version, cache in caches.items()}
+
+
+@router.get(
+    "/executor/stats",
+    summary="Jauge de l'exécuteur d'inférence",
+    description="Mode d'exécution, nombre de workers et nombre d'appels en cours ou en file d'attente."
+)
+def executor_stats():
+    """
+    Endpoint de la jauge de saturation de l'exécuteur d'inférence.
+
+    Returns:
+        dict: Les compteurs calculés par InferenceExecutor.stats()
+    """
+    return executor.stats()
@@ -0,0 +1,137 @@
+# ============================================================
+# Fichier de la route de scoring en streaming
+# Cet endpoint reçoit un fichier CSV ou NDJSON aussi gros que l'on veut,
+# le lit par blocs pendant qu'il arrive, et renvoie les résultats
+# au fur et à mesure dans une réponse découpée (chunked).
+# ============================================================
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from app.config.config import STREAM_CHUNK_ROWS
+from app.router.route import get_loaded_or_404
+from app.services.scoring import (
+    OUTPUT_COLUMNS,
+    format_csv,
+    format_ndjson,
+    iter_lines,
+    parse_csv_header,
+    read_csv_records,
+    read_ndjson_records,
+    score_records,
+)
+
+router = APIRouter(
+    prefix="/ml",
+    tags=["Prediction"]
+)
+
+# Type de contenu reçu -> format ("csv" ou "ndjson")
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse qui lit le corps de la requête pendant qu'elle répond.
+
+    La StreamingResponse de Starlette écoute en parallèle les messages du client
+    pour détecter une déconnexion : cette écoute consommerait les blocs du corps
+    que notre générateur est en train de lire. Ici, seul le générateur lit les
+    messages ; une déconnexion lève ClientDisconnect dans request.stream().
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+def score_block(engine, fmt, columns, numbered_lines, rejected=()):
+    """
+    Lit, valide, évalue et formate un bloc de lignes (exécuté dans le threadpool).
+
+    rejected contient les lignes du bloc déjà rejetées par iter_lines (numéro de ligne, message) :
+    elles reprennent leur place dans la sortie, dans l'ordre des lignes reçues.
+    """
+    if fmt == "csv":
+        records = read_csv_records(numbered_lines, columns)
+    else:
+        records = read_ndjson_records(numbered_lines)
+    if rejected:
+        records = sorted(records + list(rejected), key=lambda record: record[0])
+    results = score_records(engine, records)
+    return format_csv(results) if fmt == "csv" else format_ndjson(results)
+
+
+@router.post(
+    "/predict/stream",
+    summary="Évaluer un fichier CSV ou NDJSON en streaming",
+    description="Envoyer un fichier au format Social_Network_Ads.csv (User ID, Gender, Age, EstimatedSalary) "
+                "avec Content-Type text/csv ou application/x-ndjson. Les résultats reviennent au fil de l'eau, "
+                "dans le même format, avec le User ID d'origine. Les lignes invalides sont signalées "
+                "dans la colonne error sans interrompre le traitement."
+)
+async def predict_stream(request: Request, version: str | None = None):
+    """
+    Endpoint de scoring en streaming.
+
+    Le corps de la requête est lu bloc par bloc : au plus STREAM_CHUNK_ROWS lignes
+    sont en mémoire à un instant donné, quelle que soit la taille du fichier.
+    Chaque bloc est évalué en un seul appel vectorisé.
+
+    Args:
+        request (Request): La requête dont le corps est lu en streaming
+        version (str | None): Version du modèle à utiliser (paramètre de requête, optionnel)
+
+    Returns:
+        BodyStreamingResponse: Les résultats en CSV ou en NDJSON, dans l'ordre des lignes reçues
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    fmt = CONTENT_TYPES.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Content-Type non supporté : {content_type!r} (attendu : text/csv ou application/x-ndjson)"
+        )
+    loaded = await get_loaded_or_404(version)
+
+    async def generate():
+        columns = None
+        block = []
+        rejected = []
+        line_no = 0
+        if fmt == "csv":
+            yield ",".join(OUTPUT_COLUMNS) + "\n"
+
+        async for line, error in iter_lines(request.stream()):
+            line_no += 1
+            if error is None and not line.strip():
+                continue
+            if fmt == "csv" and columns is None:
+                try:
+                    if error is not None:
+                        raise ValueError(f"En-tête CSV illisible : {error}")
+                    columns = parse_csv_header(line)
+                except ValueError as exc:
+                    # Sans en-tête valide, aucune ligne ne peut être lue : on arrête le flux avec l'erreur
+                    yield format_csv([{"line": line_no, "user_id": None, "prediction": None,
+                                       "probability": None, "error": str(exc)}])
+                    return
+                continue
+
+            if error is None:
+                block.append((line_no, line))
+            else:
+                rejected.append((line_no, error))
+            if len(block) + len(rejected) >= STREAM_CHUNK_ROWS:
+                yield await run_in_threadpool(score_block, loaded.engine, fmt, columns, block, rejected)
+                block, rejected = [], []
+
+        if block or rejected:
+            yield await run_in_threadpool(score_block, loaded.engine, fmt, columns, block, rejected)
+
+    return BodyStreamingResponse(generate(), media_type=MEDIA_TYPES[fmt])
@@ -9,6 +9,9 @@
 from pydantic import BaseModel
 from pydantic import Field
 
+# Taille maximale d'un lot de prédictions (définie dans config.py)
+from app.config.config import MAX_BATCH_SIZE
+
 class InputData(BaseModel):
     """
     Schéma des données d'entrée pour la prédiction.
@@ -45,6 +48,29 @@ class InputData(BaseModel):
         }
 
 
+
+def get_field_bounds(field_name):
+    """
+    Retourne les bornes (ge, le) déclarées pour un champ de InputData.
+
+    InputData reste la seule source de vérité : les autres modules
+    (tables précalculées, validation par colonnes...) relisent ces bornes
+    au lieu de les recopier.
+
+    Args:
+        field_name (str): "gender", "age" ou "estimated_salary"
+
+    Returns:
+        tuple: (borne minimale, borne maximale) converties en int
+    """
+    lower, upper = None, None
+    for constraint in InputData.model_fields[field_name].metadata:
+        if hasattr(constraint, "ge"):
+            lower = int(constraint.ge)
+        if hasattr(constraint, "le"):
+            upper = int(constraint.le)
+    return lower, upper
+
 class PredictionResponse(BaseModel):
     """
     Schéma de la réponse retournée par l'API après une prédiction.
@@ -67,3 +93,167 @@ class PredictionResponse(BaseModel):
         ...,  # Champ obligatoire
         description="Probabilité (entre 0 et 1) que la personne achète le produit"
     )
+
+
+class BatchInputData(BaseModel):
+    """
+    Schéma des données d'entrée pour la prédiction par lot.
+
+    - instances : La liste des personnes à évaluer, chacune au format InputData
+      (au moins 1 ligne, au plus MAX_BATCH_SIZE lignes)
+    """
+    instances: list[InputData] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        description=f"Liste des personnes à évaluer (entre 1 et {MAX_BATCH_SIZE} lignes)"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "instances": [
+                    {"gender": 0, "age": 30, "estimated_salary": 50000},
+                    {"gender": 1, "age": 47, "estimated_salary": 110000}
+                ]
+            }
+        }
+
+
+class InputColumns(BaseModel):
+    """
+    Les instances d'un lot rangées par colonnes : gender[i], age[i] et estimated_salary[i] forment la ligne i.
+
+    Mêmes contraintes que InputData, vérifiées colonne par colonne (app/services/validation.py).
+    """
+    gender: list[int | None] = Field(..., description="Genres (0 = Homme, 1 = Femme)")
+    age: list[int | None] = Field(..., description="Âges (entre 18 et 60 ans)")
+    estimated_salary: list[int | None] = Field(..., description="Salaires estimés (entre 0 et 150 000)")
+
+
+class ColumnarBatchInputData(BaseModel):
+    """
+    Schéma du corps "par colonnes" de POST /ml/predict/batch.
+
+    Ce corps n'est pas validé par Pydantic ligne par ligne : les colonnes sont vérifiées
+    d'un bloc, les lignes invalides sont rejetées une à une et les autres sont évaluées.
+    """
+    columns: InputColumns = Field(
+        ...,
+        description=f"Une liste par champ de InputData, toutes de même longueur (entre 1 et {MAX_BATCH_SIZE} lignes)"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "columns": {
+                    "gender": [0, 1, 1],
+                    "age": [30, 47, 75],
+                    "estimated_salary": [50000, 110000, 20000]
+                }
+            }
+        }
+
+
+class RowError(BaseModel):
+    """Une ligne rejetée par la validation par colonnes."""
+    row: int = Field(..., description="Index de la ligne dans le lot (à partir de 0)")
+    field: str = Field(..., description="Premier champ en erreur")
+    type: str = Field(..., description="missing, invalid, not_integer ou out_of_range")
+    message: str = Field(..., description="Description de l'erreur")
+
+
+class ColumnarPredictionResponse(BaseModel):
+    """
+    Schéma de la réponse à un corps par colonnes (ColumnarBatchInputData).
+
+    predictions[i] et probabilities[i] valent null pour une ligne rejetée ;
+    errors décrit les lignes rejetées (vide si tout le lot est valide).
+    """
+    predictions: list[int | None] = Field(..., description="Résultats des prédictions (null = ligne rejetée)")
+    probabilities: list[float | None] = Field(..., description="Probabilités d'achat (null = ligne rejetée)")
+    errors: list[RowError] = Field(..., description="Les lignes rejetées et la raison du rejet")
+
+
+class BatchPredictionResponse(BaseModel):
+    """
+    Schéma de la réponse retournée après une prédiction par lot.
+
+    Les deux listes sont dans le même ordre que les instances envoyées :
+    predictions[i] et probabilities[i] correspondent à instances[i].
+    """
+    predictions: list[int] = Field(
+        ...,
+        description="Résultats des prédictions : 0 = N'achète pas, 1 = Achète"
+    )
+    probabilities: list[float] = Field(
+        ...,
+        description="Probabilités (entre 0 et 1) que chaque personne achète le produit"
+    )
+
+
+class GridPredictionResponse(BaseModel):
+    """
+    Schéma de la réponse de GET /ml/predict/grid : la probabilité d'achat sur toute
+    la grille âge x salaire, pour chaque genre.
+
+    probabilities[g][i][j] correspond à genders[g], ages[i] et salaries[j]
+    (même disposition pour predictions).
+    """
+    model_version: str = Field(..., description="Version du modèle qui a calculé la grille")
+    model_sha: str = Field(..., description="Empreinte du fichier du modèle")
+    genders: list[int] = Field(..., description="Valeurs de gender (0 = Homme, 1 = Femme)")
+    ages: list[int] = Field(..., description="Âges de la grille")
+    salaries: list[int] = Field(..., description="Salaires estimés de la grille")
+    predictions: list[list[list[int]]] = Field(
+        ...,
+        description="Prédictions (0 ou 1), de forme (genres, âges, salaires)"
+    )
+    probabilities: list[list[list[float]]] = Field(
+        ...,
+        description="Probabilités d'achat, de forme (genres, âges, salaires)"
+    )
+
+
+class IrisInput(BaseModel):
+    """
+    Schéma des données d'entrée du modèle Iris (servi par POST /models/iris/predict).
+
+    Mêmes mesures, dans le même ordre, que GET /predict de la VersionNrt_0.0.1 (en cm).
+    """
+    sepal_length: float = Field(..., ge=0, allow_inf_nan=False, description="Longueur du sépale (cm)")
+    sepal_width: float = Field(..., ge=0, allow_inf_nan=False, description="Largeur du sépale (cm)")
+    petal_length: float = Field(..., ge=0, allow_inf_nan=False, description="Longueur du pétale (cm)")
+    petal_width: float = Field(..., ge=0, allow_inf_nan=False, description="Largeur du pétale (cm)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {"sepal_length": 5.8, "sepal_width": 3.0, "petal_length": 4.0, "petal_width": 1.2}
+        }
+
+
+class ModelPredictionResponse(BaseModel):
+    """
+    Schéma de la réponse de POST /models/{name}/predict, commun à tous les modèles du catalogue.
+
+    - prediction : La classe prédite
+    - probabilities : La probabilité de chaque classe (la clé est la classe)
+    """
+    model: str = Field(..., description="Nom du modèle dans le catalogue")
+    model_sha: str = Field(..., description="Empreinte du fichier du modèle")
+    prediction: int = Field(..., description="Classe prédite")
+    probabilities: dict[str, float] = Field(..., description="Probabilité de chaque classe")
+
+
+class ModelBatchPredictionResponse(BaseModel):
+    """
+    Schéma de la réponse de POST /models/{name}/predict/batch.
+
+    predictions[i] et probabilities[i] correspondent à instances[i] ;
+    probabilities[i][k] est la probabilité de classes[k].
+    """
+    model: str = Field(..., description="Nom du modèle dans le catalogue")
+    model_sha: str = Field(..., description="Empreinte du fichier du modèle")
+    classes: list[int] = Field(..., description="Les classes du modèle, dans l'ordre des probabilités")
+    predictions: list[int] = Field(..., description="Classes prédites")
+    probabilities: list[list[float]] = Field(..., description="Probabilités de chaque classe, par ligne")
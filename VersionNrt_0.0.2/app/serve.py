@@ -0,0 +1,224 @@
+# ============================================================
+# Lanceur de production multi-processus (Linux / macOS)
+# Ce fichier charge le modèle UNE fois dans un processus parent,
+# puis crée N workers par fork(). Les workers partagent la mémoire
+# du modèle en copie-sur-écriture au lieu de le recharger chacun.
+#
+# Utilisation (depuis VersionNrt_0.0.2/) :
+#   py -m app.serve --workers 4 --port 8000
+# Signaux envoyés au parent :
+#   SIGHUP  : remplace les workers un par un (rechargement sans coupure)
+#   SIGUSR1 : affiche la mémoire (RSS / PSS) de chaque worker
+#   SIGTERM / SIGINT : arrêt propre de tous les workers
+# ============================================================
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+from app.main import app
+from app.router.route import warm_up
+
+
+def read_memory(pid):
+    """
+    Lit la mémoire d'un processus dans /proc (Linux).
+
+    - rss_mb : mémoire résidente, pages partagées comprises
+    - pss_mb : part proportionnelle (une page partagée par 4 processus compte pour 1/4)
+    - shared_mb : pages partagées avec d'autres processus (le modèle hérité du parent)
+
+    Returns:
+        dict: Les trois valeurs en Mo (None si /proc n'est pas disponible)
+    """
+    values = {"rss_mb": None, "pss_mb": None, "shared_mb": None}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as file:
+            fields = {}
+            for line in file:
+                parts = line.split()
+                if len(parts) >= 2 and parts[1].isdigit():
+                    fields[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        return values
+    values["rss_mb"] = round(fields.get("Rss", 0) / 1024, 1)
+    values["pss_mb"] = round(fields.get("Pss", 0) / 1024, 1)
+    values["shared_mb"] = round((fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)) / 1024, 1)
+    return values
+
+
+class Launcher:
+    """
+    Processus parent : garde le socket d'écoute, crée, surveille et recycle les workers.
+    """
+
+    def __init__(self, host, port, workers, max_worker_age=None, report_interval=None):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_worker_age = max_worker_age
+        self.report_interval = report_interval
+        self.children = {}  # pid -> date de création
+        self.stopping = False
+        self.recycle_requested = False
+        self.report_requested = False
+        self.sock = None
+
+    def preload(self):
+        """Charge et chauffe le modèle, puis gèle les objets suivis par le ramasse-miettes."""
+        start = time.perf_counter()
+        report = warm_up()
+        # gc.freeze() déplace tous les objets existants dans une génération permanente :
+        # le ramasse-miettes des workers ne les parcourt plus, donc n'écrit plus dans leurs en-têtes
+        # et les pages mémoire du modèle restent partagées au lieu d'être copiées
+        gc.collect()
+        gc.freeze()
+        print(
+            f"[parent {os.getpid()}] modèle {report['model_version']} ({report['model_sha']}) chargé en "
+            f"{time.perf_counter() - start:.2f} s, {gc.get_freeze_count()} objets gelés",
+            flush=True,
+        )
+
+    def bind(self):
+        """Ouvre le socket d'écoute une seule fois : tous les workers acceptent sur le même socket."""
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.sock.listen(2048)
+        self.sock.set_inheritable(True)
+
+    def spawn(self):
+        """Crée un worker par fork() : il hérite du modèle déjà chargé."""
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker()
+        self.children[pid] = time.monotonic()
+        return pid
+
+    def _run_worker(self):
+        """Code exécuté dans le worker : un serveur uvicorn sur le socket hérité."""
+        import uvicorn
+
+        for signum in (signal.SIGHUP, signal.SIGUSR1, signal.SIGCHLD):
+            signal.signal(signum, signal.SIG_DFL)
+        config = uvicorn.Config(app, log_level="warning", timeout_graceful_shutdown=30)
+        server = uvicorn.Server(config)
+        try:
+            server.run(sockets=[self.sock])
+        finally:
+            os._exit(0)
+
+    def report(self):
+        """Affiche la mémoire de chaque worker."""
+        for pid, started in sorted(self.children.items()):
+            memory = read_memory(pid)
+            print(
+                f"[parent] worker {pid} : RSS {memory['rss_mb']} Mo, PSS {memory['pss_mb']} Mo, "
+                f"partagé {memory['shared_mb']} Mo, âge {time.monotonic() - started:.0f} s",
+                flush=True,
+            )
+
+    def recycle(self, pid):
+        """Remplace un worker sans coupure : le nouveau démarre avant que l'ancien s'arrête."""
+        self.spawn()
+        # SIGTERM : uvicorn termine les requêtes en cours avant de s'arrêter
+        os.kill(pid, signal.SIGTERM)
+        self.children.pop(pid, None)
+
+    def reap(self):
+        """Récupère les workers terminés et remplace ceux qui se sont arrêtés d'eux-mêmes."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid in self.children:
+                del self.children[pid]
+                if not self.stopping:
+                    print(f"[parent] worker {pid} arrêté (statut {status}), remplacement", flush=True)
+                    self.spawn()
+
+    def run(self):
+        """Boucle principale du parent."""
+        self.preload()
+        self.bind()
+        for _ in range(self.workers):
+            self.spawn()
+        print(f"[parent] {self.workers} workers sur http://{self.host}:{self.port}", flush=True)
+
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "recycle_requested", True))
+        signal.signal(signal.SIGUSR1, lambda *_: setattr(self, "report_requested", True))
+
+        last_report = time.monotonic()
+        while not self.stopping:
+            time.sleep(0.5)
+            self.reap()
+            if self.recycle_requested:
+                self.recycle_requested = False
+                for pid in list(self.children):
+                    self.recycle(pid)
+                    time.sleep(1)
+            if self.max_worker_age:
+                for pid, started in list(self.children.items()):
+                    if time.monotonic() - started > self.max_worker_age:
+                        self.recycle(pid)
+            if self.report_requested or (
+                self.report_interval and time.monotonic() - last_report > self.report_interval
+            ):
+                self.report_requested = False
+                last_report = time.monotonic()
+                self.report()
+
+        self.shutdown()
+
+    def _on_stop(self, *_):
+        self.stopping = True
+
+    def shutdown(self, timeout=30):
+        """Demande l'arrêt à tous les workers et attend qu'ils terminent leurs requêtes."""
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + timeout
+        while self.children and time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                self.children.pop(pid, None)
+            else:
+                time.sleep(0.1)
+        for pid in self.children:
+            os.kill(pid, signal.SIGKILL)
+        print("[parent] arrêt terminé", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.serve", description="Serveur multi-processus (pré-fork)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Nombre de workers (défaut : nombre de cœurs)")
+    parser.add_argument("--max-worker-age", type=float, default=None, help="Recycler un worker après N secondes")
+    parser.add_argument("--report-interval", type=float, default=60.0, help="Afficher la mémoire des workers toutes les N secondes (0 = jamais)")
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, "fork"):
+        print("Ce lanceur utilise os.fork() : il n'est pas disponible sous Windows (utiliser uvicorn directement).")
+        return 1
+    Launcher(args.host, args.port, args.workers, args.max_worker_age, args.report_interval or None).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
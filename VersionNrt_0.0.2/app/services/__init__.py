@@ -0,0 +1 @@
+# Ce fichier __init__.py rend le dossier "services" reconnaissable comme un package Python
@@ -0,0 +1,291 @@
+# ============================================================
+# Fichier du contrôle d'admission (surcharge)
+# Sans limite, un pic de trafic remplit la boucle asyncio et le
+# threadpool : toutes les requêtes ralentissent ensemble, jusqu'à
+# ce que tous les clients abandonnent (timeout). Ce middleware :
+#   - limite le nombre de requêtes de prédiction en cours
+#     (ADMISSION_MAX_CONCURRENT)
+#   - fait attendre les suivantes dans une file bornée, par ordre
+#     de priorité de la route (ADMISSION_ROUTES), puis d'arrivée
+#   - répond tout de suite 503 + Retry-After quand la file est
+#     pleine, ou quand l'attente dépasse ADMISSION_QUEUE_TIMEOUT_MS
+#   - ne traite pas une requête dont l'échéance donnée par le client
+#     (en-tête X-Request-Deadline) est déjà passée : 504
+# Les routes qui ne sont pas dans ADMISSION_ROUTES (/, /health/...,
+# /metrics) ne passent jamais par la file : elles restent rapides
+# pendant une surcharge.
+#
+# Tout se passe dans la boucle asyncio : pas de verrou.
+# ============================================================
+
+import asyncio
+import fnmatch
+import heapq
+import itertools
+import json
+import math
+import re
+import time
+
+from app.config.config import (
+    ADMISSION_DEADLINE_HEADER,
+    ADMISSION_ENABLED,
+    ADMISSION_MAX_CONCURRENT,
+    ADMISSION_QUEUE_SIZE,
+    ADMISSION_QUEUE_TIMEOUT_MS,
+    ADMISSION_ROUTES,
+)
+from app.services.metrics import metrics
+
+# Poids d'une nouvelle mesure dans la moyenne glissante de la durée des requêtes (Retry-After)
+SERVICE_TIME_SMOOTHING = 0.05
+
+
+class Rejected(Exception):
+    """Requête refusée par le contrôle d'admission (réponse 503 ou 504)."""
+
+    def __init__(self, status, reason, detail, retry_after=None):
+        super().__init__(detail)
+        self.status = status
+        self.reason = reason
+        self.detail = detail
+        self.retry_after = retry_after
+
+    async def send(self, send):
+        """Envoie la réponse JSON ({"detail": ...}, comme HTTPException) directement au serveur ASGI."""
+        body = json.dumps({"detail": self.detail}, ensure_ascii=False).encode()
+        headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        if self.retry_after is not None:
+            headers.append((b"retry-after", str(self.retry_after).encode()))
+        await send({"type": "http.response.start", "status": self.status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+class Waiter:
+    """Une requête dans la file : le futur reçoit la place libérée (ou le refus)."""
+
+    __slots__ = ("priority", "deadline", "future", "active")
+
+    def __init__(self, priority, deadline, future):
+        self.priority = priority
+        self.deadline = deadline
+        self.future = future
+        # False dès que la requête a quitté la file (place obtenue, refus, abandon) ; son entrée
+        # reste dans le tas et sera ignorée
+        self.active = True
+
+
+class AdmissionController:
+    """
+    Places de traitement et file d'attente par priorité.
+
+    - acquire : prend une place, attend dans la file, ou lève Rejected
+    - release : rend la place, qui passe directement à la requête la plus prioritaire de la file
+    """
+
+    def __init__(self, enabled=ADMISSION_ENABLED, max_concurrent=ADMISSION_MAX_CONCURRENT,
+                 queue_size=ADMISSION_QUEUE_SIZE, queue_timeout_ms=ADMISSION_QUEUE_TIMEOUT_MS,
+                 routes=ADMISSION_ROUTES, deadline_header=ADMISSION_DEADLINE_HEADER):
+        self.enabled = enabled
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout_ms / 1000
+        self.deadline_header = deadline_header.lower().encode("latin-1")
+        self._routes = [(re.compile(fnmatch.translate(pattern)), priority) for pattern, priority in routes]
+        # Priorité de chaque chemin déjà vu (les chemins des routes, sans les paramètres de requête)
+        self._priorities = {}
+        self.in_flight = 0
+        self.queued = 0
+        self.max_queued = 0
+        # Tas de (-priorité, numéro d'arrivée, Waiter) : la plus haute priorité, puis la plus ancienne
+        self._heap = []
+        self._sequence = itertools.count()
+        # Moyenne glissante de la durée d'une requête admise (secondes)
+        self.service_seconds = 0.0
+
+    def priority(self, path):
+        """Priorité de la route (None = route non soumise au contrôle)."""
+        try:
+            return self._priorities[path]
+        except KeyError:
+            pass
+        priority = next((priority for pattern, priority in self._routes if pattern.match(path)), None)
+        # On ne garde que les chemins soumis au contrôle : le dictionnaire ne grossit pas avec des URL au hasard
+        if priority is not None and len(self._priorities) < 10_000:
+            self._priorities[path] = priority
+        return priority
+
+    def deadline(self, headers):
+        """Échéance donnée par le client (temps Unix), None si l'en-tête est absent ou invalide."""
+        for name, value in headers:
+            if name == self.deadline_header:
+                try:
+                    deadline = float(value)
+                except ValueError:
+                    return None
+                return deadline if math.isfinite(deadline) else None
+        return None
+
+    def retry_after(self):
+        """Secondes conseillées avant de réessayer : le temps de vider la file, au moins 1."""
+        return max(1, math.ceil(self.queued * self.service_seconds / max(self.max_concurrent, 1)))
+
+    async def acquire(self, priority, deadline=None):
+        """
+        Prend une place de traitement, en attendant dans la file si besoin.
+
+        Args:
+            priority (int): La priorité de la route
+            deadline (float | None): L'échéance du client (temps Unix)
+
+        Returns:
+            float: Le temps passé dans la file (secondes)
+
+        Raises:
+            Rejected: 503 (file pleine, attente trop longue, place prise par une requête prioritaire)
+                ou 504 (échéance du client passée)
+        """
+        if deadline is not None and deadline <= time.time():
+            raise Rejected(504, "expired", "L'échéance de la requête est déjà passée : elle n'est pas traitée")
+        # Place libre et personne dans la file : cas normal, sans attente
+        if self.in_flight < self.max_concurrent and not self.queued:
+            self.in_flight += 1
+            return 0.0
+
+        if self.queued >= self.queue_size:
+            victim = self._lowest_waiter(below=priority)
+            if victim is None:
+                raise Rejected(503, "queue_full", "Serveur surchargé : réessayer plus tard", self.retry_after())
+            self._leave(victim)
+            victim.future.set_exception(Rejected(
+                503, "evicted", "Serveur surchargé : place donnée à une requête prioritaire", self.retry_after()
+            ))
+
+        start = time.perf_counter()
+        timeout, expires = self.queue_timeout, False
+        if deadline is not None and deadline - time.time() < timeout:
+            timeout, expires = max(deadline - time.time(), 0.0), True
+        waiter = Waiter(priority, deadline, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._heap, (-priority, next(self._sequence), waiter))
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+
+        try:
+            # asyncio.wait n'annule pas le futur à l'expiration : on sait si la place est arrivée entre-temps
+            done, _ = await asyncio.wait((waiter.future,), timeout=timeout)
+        except asyncio.CancelledError:
+            # Client parti pendant l'attente
+            self._abandon(waiter)
+            raise
+        if not done:
+            self._abandon(waiter)
+            if expires:
+                raise Rejected(504, "expired", "L'échéance de la requête est passée pendant l'attente")
+            raise Rejected(503, "queue_timeout", "Serveur surchargé : attente trop longue", self.retry_after())
+        # Lève Rejected si la requête a été retirée de la file (place prise, échéance passée)
+        waiter.future.result()
+        return time.perf_counter() - start
+
+    def release(self, seconds):
+        """
+        Rend une place : elle passe à la requête la plus prioritaire de la file, sinon elle est libérée.
+
+        Args:
+            seconds (float): La durée de la requête qui se termine (pour Retry-After)
+        """
+        self.service_seconds += SERVICE_TIME_SMOOTHING * (seconds - self.service_seconds)
+        while self._heap:
+            _, _, waiter = heapq.heappop(self._heap)
+            if not waiter.active:
+                continue
+            self._leave(waiter)
+            if waiter.deadline is not None and waiter.deadline <= time.time():
+                # Le client a déjà abandonné : inutile de calculer la réponse
+                waiter.future.set_exception(
+                    Rejected(504, "expired", "L'échéance de la requête est passée pendant l'attente")
+                )
+                continue
+            # La place passe directement à cette requête : in_flight ne change pas
+            waiter.future.set_result(None)
+            return
+        self.in_flight -= 1
+
+    def _leave(self, waiter):
+        waiter.active = False
+        self.queued -= 1
+
+    def _abandon(self, waiter):
+        """La requête quitte la file d'elle-même (expiration ou annulation)."""
+        if waiter.active:
+            self._leave(waiter)
+            waiter.future.cancel()
+        elif waiter.future.done() and not waiter.future.cancelled():
+            if waiter.future.exception() is None:
+                # La place est arrivée au même moment : on la rend
+                self.release(self.service_seconds)
+
+    def _lowest_waiter(self, below):
+        """La dernière arrivée des requêtes en attente de plus basse priorité, si elle est sous `below`."""
+        candidates = [
+            (-key, sequence, waiter) for key, sequence, waiter in self._heap if waiter.active and -key < below
+        ]
+        if not candidates:
+            return None
+        lowest = min(priority for priority, _, _ in candidates)
+        return max((entry for entry in candidates if entry[0] == lowest), key=lambda entry: entry[1])[2]
+
+    def stats(self):
+        """
+        État du contrôle d'admission (lu par GET /metrics).
+
+        Returns:
+            dict: Places occupées et maximales, requêtes en attente, maximum observé, durée moyenne
+        """
+        return {
+            "enabled": self.enabled,
+            "in_flight": self.in_flight,
+            "max_concurrent": self.max_concurrent,
+            "queued": self.queued,
+            "queue_size": self.queue_size,
+            "max_queued": self.max_queued,
+            "service_seconds": round(self.service_seconds, 6),
+        }
+
+
+class AdmissionMiddleware:
+    """
+    Middleware ASGI (comme MetricsMiddleware) qui fait passer les routes de ADMISSION_ROUTES
+    par le contrôleur d'admission.
+    """
+
+    def __init__(self, app, controller=None):
+        self.app = app
+        self.controller = controller or admission
+
+    async def __call__(self, scope, receive, send):
+        controller = self.controller
+        priority = None
+        if scope["type"] == "http" and controller.enabled:
+            priority = controller.priority(scope["path"])
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        label = str(priority)
+        try:
+            waited = await controller.acquire(priority, controller.deadline(scope["headers"]))
+        except Rejected as rejected:
+            metrics.inc("admission_rejected_total", label, rejected.reason)
+            await rejected.send(send)
+            return
+        metrics.observe("admission_queue_wait_seconds", waited, label)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(time.perf_counter() - start)
+
+
+# Contrôleur partagé par toute l'application (un par processus : chaque worker de app.serve a ses places)
+admission = AdmissionController()
@@ -0,0 +1,422 @@
+# ============================================================
+# Fichier du journal d'audit des prédictions
+# Chaque prédiction servie (entrées, sortie, version du modèle) doit
+# être gardée pour la conformité et pour le réentraînement.
+# L'écrire sur disque pendant la requête ajouterait la latence du
+# disque à chaque appel, donc :
+#   - la requête ajoute seulement la ligne à un tampon en mémoire borné
+#     (politique "drop" ou "block" quand il est plein, avec compteurs ;
+#     "block" attend dans un thread, jamais dans la boucle asyncio)
+#   - un thread en arrière-plan écrit le tampon par lots dans des
+#     fichiers Parquet compressés, et change de fichier régulièrement
+#   - à l'arrêt de l'API, le tampon est vidé avant de fermer le fichier
+# Un fichier en cours d'écriture s'appelle audit-*.parquet.inprogress :
+# seuls les fichiers terminés (audit-*.parquet) sont lus.
+#
+# Relire le journal au format des données d'entraînement (depuis VersionNrt_0.0.2/) :
+#   py -m app.services.audit export audit.csv --since 2026-10-01
+# ============================================================
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from app.config.config import (
+    AUDIT_BLOCK_TIMEOUT_MS,
+    AUDIT_BUFFER_ROWS,
+    AUDIT_COMPRESSION,
+    AUDIT_DIR,
+    AUDIT_ENABLED,
+    AUDIT_FLUSH_ROWS,
+    AUDIT_FLUSH_SECONDS,
+    AUDIT_FULL_POLICY,
+    AUDIT_ROTATE_ROWS,
+    AUDIT_ROTATE_SECONDS,
+    GENDER_ENCODING,
+)
+
+logger = logging.getLogger(__name__)
+
+def audit_schema():
+    """Schéma Arrow des fichiers d'audit (pyarrow est importé seulement quand le journal est utilisé)."""
+    import pyarrow as pa
+
+    return pa.schema([
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("model_version", pa.string()),
+        ("model_sha", pa.string()),
+        ("source", pa.string()),
+        ("gender", pa.int8()),
+        ("age", pa.int16()),
+        ("estimated_salary", pa.int32()),
+        ("prediction", pa.int8()),
+        ("probability", pa.float64()),
+    ])
+
+
+class AuditLog:
+    """
+    Journal d'audit : tampon borné en mémoire + thread d'écriture en Parquet.
+
+    - record / record_batch sont attendus (await) sur le chemin des requêtes : ils ne font
+      qu'ajouter une référence au tampon (quelques centaines de nanosecondes)
+    - le thread d'écriture vide le tampon dès flush_rows lignes, ou toutes les flush_seconds secondes
+    - quand le tampon est plein : "drop" perd la ligne (comptée), "block" attend au plus block_timeout_ms
+      dans un thread (asyncio.to_thread) : la boucle continue de servir les autres requêtes pendant l'attente
+    """
+
+    def __init__(self, enabled=AUDIT_ENABLED, directory=AUDIT_DIR, capacity=AUDIT_BUFFER_ROWS,
+                 policy=AUDIT_FULL_POLICY, block_timeout_ms=AUDIT_BLOCK_TIMEOUT_MS, flush_rows=AUDIT_FLUSH_ROWS,
+                 flush_seconds=AUDIT_FLUSH_SECONDS, rotate_rows=AUDIT_ROTATE_ROWS,
+                 rotate_seconds=AUDIT_ROTATE_SECONDS, compression=AUDIT_COMPRESSION):
+        if policy not in ("drop", "block"):
+            raise ValueError(f"AUDIT_FULL_POLICY inconnue : {policy!r} (attendu : 'drop' ou 'block')")
+        self.enabled = enabled
+        self.directory = directory
+        self.capacity = capacity
+        self.policy = policy
+        self.block_timeout = block_timeout_ms / 1000
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.rotate_rows = rotate_rows
+        self.rotate_seconds = rotate_seconds
+        self.compression = compression
+        self.running = False
+
+        # Le tampon : les prédictions unitaires (tuples) et les lots (tableaux NumPy), dans deux listes
+        self._singles = []
+        self._batches = []
+        self._pending_rows = 0
+        self._stopping = False
+        # Le chemin des requêtes prend directement le verrou (with self._lock, en C) plutôt que la Condition
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._thread = None
+
+        # Fichier en cours (utilisé seulement par le thread d'écriture)
+        self._writer = None
+        self._path = None
+        self._file_rows = 0
+        self._file_opened = 0.0
+        self._sequence = 0
+
+        self.appended_rows = 0
+        self.dropped_rows = 0
+        self.blocked_calls = 0
+        self.written_rows = 0
+        self.lost_rows = 0
+        self.files_written = 0
+        self.write_errors = 0
+
+    # --- Chemin des requêtes ---
+
+    async def record(self, loaded, source, row, prediction, probability):
+        """
+        Ajoute une prédiction unitaire au tampon.
+
+        Args:
+            loaded (LoadedModel): La version du modèle qui a répondu
+            source (str): L'endpoint ("predict", "batch"...)
+            row (tuple): (gender, age, estimated_salary)
+            prediction (int): La classe prédite
+            probability (float): La probabilité d'achat renvoyée au client
+        """
+        if self.running:
+            await self._append((time.time(), loaded.version, loaded.sha, source, row, prediction, probability), 1)
+
+    async def record_batch(self, loaded, source, input_array, predictions, probabilities):
+        """
+        Ajoute un lot de prédictions au tampon (les tableaux sont gardés tels quels, sans copie ligne par ligne).
+
+        Args:
+            input_array (np.ndarray): Matrice (n_lignes, 3) : gender, age, estimated_salary
+            predictions (np.ndarray): Les classes prédites
+            probabilities (np.ndarray): Les probabilités d'achat
+        """
+        if self.running and len(input_array):
+            await self._append(
+                (time.time(), loaded.version, loaded.sha, source, input_array, predictions, probabilities),
+                len(input_array),
+                batch=True,
+            )
+
+    async def _append(self, entry, rows, batch=False):
+        """
+        Ajoute l'entrée au tampon, ou la compte comme perdue s'il reste plein.
+
+        Returns:
+            bool: True si l'entrée a été ajoutée
+        """
+        if self._try_append(entry, rows, batch):
+            return True
+        # Tampon plein : l'attente de la politique "block" bloque un thread, pas la boucle asyncio
+        if self.policy == "block" and await asyncio.to_thread(self._try_append, entry, rows, batch, self.block_timeout):
+            return True
+        with self._lock:
+            self.dropped_rows += rows
+        return False
+
+    def _try_append(self, entry, rows, batch, timeout=None):
+        """
+        Ajoute l'entrée s'il y a de la place dans le tampon.
+
+        Args:
+            timeout (float | None): Si donné, attendre au plus ce délai (en secondes) que le thread
+                d'écriture libère de la place (à n'appeler que hors de la boucle asyncio)
+
+        Returns:
+            bool: True si l'entrée a été ajoutée
+        """
+        with self._lock:
+            if self._pending_rows + rows > self.capacity:
+                if timeout is None:
+                    return False
+                self.blocked_calls += 1
+                self._condition.wait_for(
+                    lambda: self._pending_rows + rows <= self.capacity or self._stopping, timeout
+                )
+                if self._pending_rows + rows > self.capacity:
+                    return False
+            # La liste est choisie sous le verrou : le thread d'écriture a pu la remplacer entre-temps
+            (self._batches if batch else self._singles).append(entry)
+            self._pending_rows += rows
+            self.appended_rows += rows
+            # On ne réveille le thread qu'au passage du seuil (pas à chaque ligne)
+            if self._pending_rows >= self.flush_rows and self._pending_rows - rows < self.flush_rows:
+                self._condition.notify_all()
+            return True
+
+    # --- Cycle de vie ---
+
+    def start(self):
+        """Démarre le thread d'écriture (à appeler dans chaque processus, après un éventuel fork)."""
+        if self.running or not self.enabled:
+            return
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            logger.error("Journal d'audit désactivé : pyarrow n'est pas installé")
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        self.running = True
+
+    def close(self, timeout=10.0):
+        """Arrête le journal : les lignes du tampon sont écrites et le fichier en cours est fermé."""
+        if not self.running:
+            return
+        self.running = False
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error("Le journal d'audit n'a pas fini d'écrire en %.0f s", timeout)
+
+    # --- Thread d'écriture ---
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._stopping and self._pending_rows < self.flush_rows:
+                    self._condition.wait(self.flush_seconds)
+                singles, batches, rows = self._singles, self._batches, self._pending_rows
+                # Les listes sont remplacées (pas vidées) : record() ajoute aux nouvelles
+                self._singles, self._batches, self._pending_rows = [], [], 0
+                stopping = self._stopping
+                # Des appels "block" peuvent attendre de la place
+                self._condition.notify_all()
+
+            if rows:
+                self._write(singles, batches, rows)
+            if self._writer is not None and (
+                stopping or self._file_rows >= self.rotate_rows
+                or time.monotonic() - self._file_opened >= self.rotate_seconds
+            ):
+                self._close_file()
+            if stopping:
+                return
+
+    def _write(self, singles, batches, rows):
+        try:
+            table = self._to_table(singles, batches)
+            if self._writer is None:
+                self._open_file(table.schema)
+            # Un groupe de lignes Parquet par écriture
+            self._writer.write_table(table)
+            self._file_rows += rows
+            self.written_rows += rows
+        except Exception:
+            self.write_errors += 1
+            self.lost_rows += rows
+            logger.exception("Écriture du journal d'audit impossible (%d lignes perdues)", rows)
+
+    def _to_table(self, singles, batches):
+        """
+        Assemble les enregistrements du tampon en une table Arrow.
+
+        Les colonnes numériques sont assemblées en tableaux NumPy ; les colonnes de texte restent
+        des listes Python (pyarrow les convertit bien plus vite qu'un tableau NumPy d'objets).
+        """
+        import pyarrow as pa
+
+        numbers = {"timestamp": [], "matrix": [], "prediction": [], "probability": []}
+        texts = {"model_version": [], "model_sha": [], "source": []}
+        if singles:
+            timestamps, versions, shas, sources, rows, predictions, probabilities = zip(*singles)
+            numbers["timestamp"].append(np.array(timestamps))
+            numbers["matrix"].append(np.array(rows, dtype=np.float64))
+            numbers["prediction"].append(np.array(predictions))
+            numbers["probability"].append(np.array(probabilities, dtype=np.float64))
+            texts["model_version"].extend(versions)
+            texts["model_sha"].extend(shas)
+            texts["source"].extend(sources)
+        for timestamp, version, sha, source, matrix, predictions, probabilities in batches:
+            count = len(matrix)
+            numbers["timestamp"].append(np.full(count, timestamp))
+            numbers["matrix"].append(matrix)
+            numbers["prediction"].append(np.asarray(predictions))
+            numbers["probability"].append(np.asarray(probabilities, dtype=np.float64))
+            texts["model_version"].extend([version] * count)
+            texts["model_sha"].extend([sha] * count)
+            texts["source"].extend([source] * count)
+
+        columns = {name: np.concatenate(values) for name, values in numbers.items()}
+        matrix = columns.pop("matrix")
+        columns.update(gender=matrix[:, 0], age=matrix[:, 1], estimated_salary=matrix[:, 2])
+        columns["timestamp"] = (columns["timestamp"] * 1e6).astype(np.int64)
+        columns.update(texts)
+
+        schema = audit_schema()
+        arrays = [
+            pa.array(columns[field.name].astype(field.type.to_pandas_dtype()), type=field.type)
+            if pa.types.is_integer(field.type) else pa.array(columns[field.name], type=field.type)
+            for field in schema
+        ]
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def _open_file(self, schema):
+        import pyarrow.parquet as pq
+
+        self._sequence += 1
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        # Le pid distingue les workers de app.serve, qui écrivent dans le même dossier
+        self._path = self.directory / f"audit-{stamp}-{os.getpid()}-{self._sequence:04d}.parquet"
+        self._writer = pq.ParquetWriter(
+            self._path.with_name(self._path.name + ".inprogress"), schema, compression=self.compression
+        )
+        self._file_rows = 0
+        self._file_opened = time.monotonic()
+
+    def _close_file(self):
+        """Ferme le fichier en cours et lui donne son nom définitif (il devient lisible)."""
+        try:
+            self._writer.close()
+            os.replace(self._path.with_name(self._path.name + ".inprogress"), self._path)
+            self.files_written += 1
+        except Exception:
+            self.write_errors += 1
+            logger.exception("Fermeture du fichier d'audit %s impossible", self._path.name)
+        self._writer = None
+
+    def stats(self):
+        """
+        Compteurs du journal (lus par GET /metrics).
+
+        Returns:
+            dict: Lignes ajoutées, perdues (tampon plein), écrites, en attente, fichiers écrits...
+        """
+        return {
+            "running": self.running,
+            "policy": self.policy,
+            "capacity_rows": self.capacity,
+            "buffered_rows": self._pending_rows,
+            "appended_rows": self.appended_rows,
+            "dropped_rows": self.dropped_rows,
+            "blocked_calls": self.blocked_calls,
+            "written_rows": self.written_rows,
+            "lost_rows": self.lost_rows,
+            "files_written": self.files_written,
+            "write_errors": self.write_errors,
+        }
+
+
+def read_audit(directory=AUDIT_DIR, since=None, until=None):
+    """
+    Relit les fichiers d'audit terminés au format des données d'entraînement.
+
+    Les premières colonnes sont celles de Social_Network_Ads.csv (Gender en "Male"/"Female",
+    Age, EstimatedSalary) : le DataFrame passe tel quel dans scoring.frame_features et,
+    une fois la colonne Purchased ajoutée, dans py -m app.train.
+
+    Args:
+        directory (Path): Le dossier des fichiers audit-*.parquet
+        since (datetime | None): Garder seulement les prédictions faites à partir de cette date
+        until (datetime | None): Garder seulement les prédictions faites avant cette date
+
+    Returns:
+        pd.DataFrame: Gender, Age, EstimatedSalary puis prediction, probability, model_version,
+        model_sha, source et timestamp, dans l'ordre des fichiers
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    paths = sorted(str(path) for path in directory.glob("audit-*.parquet"))
+    if not paths:
+        table = audit_schema().empty_table()
+    else:
+        dataset = ds.dataset(paths, format="parquet", schema=audit_schema())
+        condition = None
+        for value, operator in ((since, "__ge__"), (until, "__lt__")):
+            if value is not None:
+                value = value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+                term = getattr(ds.field("timestamp"), operator)(pa.scalar(value, type=pa.timestamp("us", tz="UTC")))
+                condition = term if condition is None else condition & term
+        table = dataset.to_table(filter=condition)
+
+    frame = table.to_pandas()
+    genders = {code: name for name, code in GENDER_ENCODING.items()}
+    training = pd.DataFrame({
+        "Gender": frame["gender"].map(genders),
+        "Age": frame["age"],
+        "EstimatedSalary": frame["estimated_salary"],
+    })
+    return pd.concat(
+        [training, frame[["prediction", "probability", "model_version", "model_sha", "source", "timestamp"]]],
+        axis=1,
+    )
+
+
+# Journal partagé par toute l'application (démarré et arrêté par le lifespan de main.py)
+audit_log = AuditLog()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.services.audit", description="Lecture du journal d'audit")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Écrire le journal en CSV (colonnes de Social_Network_Ads.csv)")
+    export.add_argument("output", help="Fichier CSV de sortie")
+    export.add_argument("--since", type=datetime.fromisoformat, help="Date de début (ISO, UTC par défaut)")
+    export.add_argument("--until", type=datetime.fromisoformat, help="Date de fin (ISO, exclue)")
+    export.add_argument("--audit-dir", type=Path, default=AUDIT_DIR)
+    args = parser.parse_args(argv)
+
+    frame = read_audit(args.audit_dir, args.since, args.until)
+    frame.to_csv(args.output, index=False)
+    print(f"{len(frame)} prédictions écrites dans {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
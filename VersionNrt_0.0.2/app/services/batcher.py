@@ -0,0 +1,115 @@
+# ============================================================
+# Fichier du micro-batching
+# Ce fichier regroupe les requêtes de prédiction unitaires qui
+# arrivent presque en même temps, les évalue en un seul appel
+# vectorisé, puis rend à chaque appelant son propre résultat.
+# ============================================================
+
+import asyncio
+from collections import Counter
+
+import numpy as np
+
+from app.services.metrics import metrics
+
+
+class MicroBatcher:
+    """
+    Regroupe les lignes soumises pendant une courte fenêtre de temps.
+
+    Un lot est envoyé au modèle dès que l'une des deux conditions est remplie :
+    - la fenêtre de window_ms millisecondes depuis la première ligne en attente est écoulée
+    - max_batch_size lignes sont en attente
+
+    Chaque appelant attend un asyncio.Future qui reçoit sa propre ligne de résultat.
+    """
+
+    def __init__(self, score_fn, window_ms, max_batch_size, version="default"):
+        """
+        Args:
+            score_fn: Fonction asynchrone (np.ndarray) -> (classes, probabilités)
+            window_ms (float): Durée maximale d'attente d'un lot, en millisecondes
+            max_batch_size (int): Taille de lot qui déclenche un envoi immédiat
+            version (str): Version du modèle (label de l'histogramme micro_batch_size de /metrics)
+        """
+        self.score_fn = score_fn
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._pending = []
+        self._timer = None
+        self.version = version
+        # Distribution des tailles de lot : {taille: nombre de lots}
+        self.batch_sizes = Counter()
+        # Lots en cours d'évaluation : la boucle asyncio ne garde qu'une référence faible vers
+        # ses tâches, celle-ci les protège du ramasse-miettes jusqu'à la fin du calcul
+        self._tasks = set()
+
+    async def submit(self, row):
+        """
+        Ajoute une ligne au lot en cours et attend son résultat.
+
+        Args:
+            row (tuple): (gender, age, estimated_salary)
+
+        Returns:
+            tuple: (prédiction, probabilité) pour cette ligne
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            # Première ligne du lot : on démarre la fenêtre d'attente
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Détache le lot en attente et lance son évaluation."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self.batch_sizes[len(batch)] += 1
+            metrics.observe("micro_batch_size", len(batch), self.version)
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        """Évalue un lot et distribue les résultats aux appelants."""
+        input_array = np.array([row for row, _ in batch], dtype=float)
+        try:
+            predictions, probabilities = await self.score_fn(input_array)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, future), prediction, probability in zip(batch, predictions.tolist(), probabilities.tolist()):
+            # Un client qui s'est déconnecté a pu annuler son future entre-temps
+            if not future.done():
+                future.set_result((prediction, probability))
+
+    def stats(self):
+        """
+        Retourne les statistiques du micro-batching.
+
+        Returns:
+            dict: Nombre de lots, nombre de lignes, taille moyenne et distribution des tailles de lot
+        """
+        sizes = dict(self.batch_sizes)
+        batches = sum(sizes.values())
+        rows = sum(size * count for size, count in sizes.items())
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+            "batches": batches,
+            "rows": rows,
+            "mean_batch_size": round(rows / batches, 2) if batches else 0.0,
+            "batch_size_distribution": {str(size): sizes[size] for size in sorted(sizes)},
+        }
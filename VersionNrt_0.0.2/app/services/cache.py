@@ -0,0 +1,94 @@
+# ============================================================
+# Fichier du cache de prédictions
+# Ce fichier garde en mémoire les dernières prédictions calculées
+# pour répondre sans appeler le modèle quand les mêmes données
+# reviennent (par exemple un curseur d'âge déplacé dans les deux sens).
+# Utilisé aussi par l'API Iris de la VersionNrt_0.0.1.
+# ============================================================
+
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Cache LRU (Least Recently Used) de prédictions, lié à une version du modèle.
+
+    - La clé est le tuple normalisé des features, par exemple (gender, age, estimated_salary)
+      ou, pour l'API Iris, les quatre mesures en dixièmes de cm
+    - Quand le cache est plein, l'entrée la moins récemment utilisée est supprimée
+    - Quand la version du modèle change, tout le cache est vidé : un autre
+      model.joblib ne doit jamais répondre avec les résultats de l'ancien
+    """
+
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity (int): Nombre maximal d'entrées (0 = cache désactivé)
+        """
+        self.capacity = capacity
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def _check_version(self, version):
+        """Vide le cache si la version du modèle a changé."""
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key, version):
+        """
+        Cherche une prédiction dans le cache.
+
+        Args:
+            key (tuple): Les features normalisées
+            version (str): La version du modèle actuellement chargé
+
+        Returns:
+            La valeur mise en cache, ou None si elle est absente
+        """
+        self._check_version(version)
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        # L'entrée devient la plus récemment utilisée
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value, version):
+        """
+        Ajoute une prédiction dans le cache.
+
+        Args:
+            key (tuple): Les features normalisées
+            value: La valeur à garder, par exemple (prédiction, probabilité)
+            version (str): La version du modèle qui a calculé la valeur
+        """
+        if self.capacity <= 0:
+            return
+        self._check_version(version)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            # last=False : on retire l'entrée la plus ancienne
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Retourne les compteurs du cache.
+
+        Returns:
+            dict: Capacité, taille actuelle, version du modèle, hits, misses et taux de hit
+        """
+        lookups = self.hits + self.misses
+        return {
+            "capacity": self.capacity,
+            "size": len(self._entries),
+            "model_version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,525 @@
+# ============================================================
+# Fichier de la surveillance de la dérive des entrées
+# Le modèle a appris sur data/Social_Network_Ads.csv : si le trafic
+# ne ressemble plus à ces données (autres âges, autres salaires,
+# autre proportion de femmes...), ses prédictions ne valent plus
+# ce qu'annonçaient les métriques d'entraînement.
+#
+# Chaque prédiction met à jour des statistiques de taille fixe
+# (mémoire O(1), quel que soit le nombre de requêtes) :
+#   - âge, salaire et probabilité prédite : moyenne et variance
+#     (algorithme de Welford) et histogramme à intervalles fixes
+#   - genre : nombre d'hommes et de femmes
+# GET /ml/drift les compare au profil des données d'entraînement
+# (<modèle>.drift.json, écrit par py -m app.train) avec le PSI
+# (Population Stability Index) et la statistique de
+# Kolmogorov-Smirnov calculée sur les histogrammes.
+#
+# Comme pour les métriques : pas de verrou sur le chemin des
+# requêtes, chaque thread a ses propres statistiques ("shard"),
+# additionnées à la lecture. Les workers de app.serve déposent les
+# leurs dans DRIFT_DIR (drift-<pid>.json) toutes les
+# DRIFT_SYNC_SECONDS secondes, pour que la réponse couvre tous les workers.
+# ============================================================
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.config.config import (
+    DATA_PATH,
+    DRIFT_BINS,
+    DRIFT_DIR,
+    DRIFT_ENABLED,
+    DRIFT_MIN_ROWS,
+    DRIFT_PSI_ALERT,
+    DRIFT_PSI_WARNING,
+    DRIFT_SYNC_SECONDS,
+    GENDER_ENCODING,
+    STREAM_CHUNK_ROWS,
+)
+from app.schemas.schema import get_field_bounds
+from app.services.scoring import COLUMN_ALIASES, FEATURES, frame_features
+
+logger = logging.getLogger(__name__)
+
+# Colonnes numériques suivies (indices dans la ligne gender, age, estimated_salary), puis la probabilité
+NUMERIC_FEATURES = ("age", "estimated_salary")
+# Proportion minimale d'un intervalle dans le calcul du PSI (un intervalle vide donnerait log(0))
+PSI_EPSILON = 1e-4
+
+
+def default_channels(bins=DRIFT_BINS):
+    """
+    Histogrammes suivis : (nom, borne basse, borne haute, nombre d'intervalles).
+
+    Les bornes sont celles de InputData (et [0, 1] pour la probabilité) : les intervalles
+    ne dépendent pas des données, donc des statistiques de workers ou de périodes
+    différentes s'additionnent directement.
+    """
+    return [(name, *get_field_bounds(name), bins) for name in NUMERIC_FEATURES] + [("probability", 0, 1, bins)]
+
+
+class DriftStats:
+    """
+    Statistiques d'un flux de prédictions, de taille fixe.
+
+    Pour chaque histogramme de channels : nombre de valeurs par intervalle, moyenne et
+    somme des carrés des écarts (M2, variance = M2 / n). Les valeurs hors des bornes
+    comptent dans le premier ou le dernier intervalle.
+    """
+
+    __slots__ = ("channels", "rows", "genders", "means", "m2s", "histograms", "_bins")
+
+    def __init__(self, channels):
+        self.channels = [tuple(channel) for channel in channels]
+        self.rows = 0
+        self.genders = [0] * len(GENDER_ENCODING)
+        self.means = [0.0] * len(self.channels)
+        self.m2s = [0.0] * len(self.channels)
+        self.histograms = [[0] * bins for _, _, _, bins in self.channels]
+        # (borne basse, intervalles par unité, dernier intervalle) : l'intervalle d'une valeur sans bisect
+        self._bins = [(low, bins / (high - low), bins - 1) for _, low, high, bins in self.channels]
+
+    def add(self, gender, values):
+        """
+        Ajoute une prédiction (quelques microsecondes, appelé pour chaque requête).
+
+        Args:
+            gender (int): 0 ou 1
+            values (tuple): Une valeur par histogramme : (age, estimated_salary, probability)
+        """
+        self.rows += 1
+        n = self.rows
+        self.genders[gender] += 1
+        means, m2s, histograms, bins = self.means, self.m2s, self.histograms, self._bins
+        for i, x in enumerate(values):
+            low, scale, last = bins[i]
+            index = int((x - low) * scale)
+            histograms[i][0 if index < 0 else last if index > last else index] += 1
+            # Welford : moyenne et M2 mises à jour sans garder les valeurs
+            delta = x - means[i]
+            means[i] += delta / n
+            m2s[i] += delta * (x - means[i])
+
+    def add_batch(self, input_array, probabilities):
+        """
+        Ajoute un lot de prédictions (calcul vectorisé, puis fusion comme merge).
+
+        Args:
+            input_array (np.ndarray): Matrice (n_lignes, 3) : gender, age, estimated_salary
+            probabilities (np.ndarray): Les probabilités d'achat
+        """
+        if not len(input_array):
+            return
+        columns = [input_array[:, FEATURES.index(name)] for name in NUMERIC_FEATURES]
+        columns.append(np.asarray(probabilities, dtype=np.float64))
+        genders = np.bincount(input_array[:, FEATURES.index("gender")].astype(np.intp), minlength=len(self.genders))
+        means, m2s, histograms = [], [], []
+        for (low, scale, last), column in zip(self._bins, columns):
+            index = np.clip(((column - low) * scale).astype(np.intp), 0, last)
+            histograms.append(np.bincount(index, minlength=last + 1).tolist())
+            mean = float(column.mean())
+            means.append(mean)
+            m2s.append(float(np.square(column - mean).sum()))
+        self._combine(len(input_array), genders.tolist(), means, m2s, histograms)
+
+    def merge(self, other):
+        """Ajoute les statistiques d'un autre shard, worker ou profil (mêmes histogrammes)."""
+        if other.channels != self.channels:
+            raise ValueError("Statistiques de dérive incompatibles (histogrammes différents)")
+        self._combine(other.rows, list(other.genders), list(other.means), list(other.m2s),
+                      [list(histogram) for histogram in other.histograms])
+        return self
+
+    def _combine(self, rows, genders, means, m2s, histograms):
+        """Fusion de deux groupes de valeurs (formule de Chan et al. pour la moyenne et M2)."""
+        if not rows:
+            return
+        total = self.rows + rows
+        for i, (mean, m2) in enumerate(zip(means, m2s)):
+            delta = mean - self.means[i]
+            self.m2s[i] += m2 + delta * delta * self.rows * rows / total
+            self.means[i] += delta * rows / total
+        self.genders = [a + b for a, b in zip(self.genders, genders)]
+        self.histograms = [[a + b for a, b in zip(mine, theirs)] for mine, theirs in zip(self.histograms, histograms)]
+        self.rows = total
+
+    def copy(self):
+        return DriftStats(self.channels).merge(self)
+
+    def to_dict(self):
+        return {
+            "channels": [list(channel) for channel in self.channels],
+            "rows": self.rows,
+            "genders": list(self.genders),
+            "means": list(self.means),
+            "m2s": list(self.m2s),
+            "histograms": [list(histogram) for histogram in self.histograms],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data["channels"])
+        stats._combine(data["rows"], data["genders"], data["means"], data["m2s"], data["histograms"])
+        return stats
+
+
+# ============================================================
+# Profil de référence (données d'entraînement)
+# ============================================================
+
+def profile_path(model_path):
+    """Fichier du profil d'un modèle : model.joblib -> model.drift.json, model-v2.joblib -> model-v2.drift.json."""
+    return model_path.with_suffix(".drift.json")
+
+
+def build_profile(paths, predict_proba, model_sha=None, chunk_rows=STREAM_CHUNK_ROWS, bins=DRIFT_BINS):
+    """
+    Calcule le profil de référence de fichiers au format Social_Network_Ads.csv, bloc par bloc.
+
+    Seules les lignes valides (voir scoring.frame_features) sont comptées ; la probabilité
+    est celle que donne le modèle sur chaque ligne.
+
+    Args:
+        paths (list): Les fichiers CSV d'entraînement
+        predict_proba (callable): Matrice (n, 3) -> probabilités d'achat (n,)
+        model_sha (str | None): L'empreinte du modèle profilé
+
+    Returns:
+        dict: Le profil (sources, empreinte du modèle, statistiques)
+    """
+    import pandas as pd
+
+    stats = DriftStats(default_channels(bins))
+    usecols = [name for name, field in COLUMN_ALIASES.items() if field in FEATURES]
+    for path in paths:
+        for frame in pd.read_csv(path, usecols=usecols, chunksize=chunk_rows):
+            features, errors = frame_features(frame)
+            features = features[errors == None]  # noqa: E711
+            if len(features):
+                stats.add_batch(features, predict_proba(features))
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "data": [str(path) for path in paths],
+        "model_sha": model_sha,
+        "stats": stats,
+    }
+
+
+def save_profile(profile, path):
+    """Écrit le profil en JSON (fichier temporaire puis renommage)."""
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps({**profile, "stats": profile["stats"].to_dict()}, indent=2))
+    temporary.replace(path)
+
+
+def load_profile(path):
+    data = json.loads(path.read_text())
+    return {**data, "stats": DriftStats.from_dict(data["stats"])}
+
+
+# ============================================================
+# Comparaison au profil
+# ============================================================
+
+def psi(actual, expected):
+    """Population Stability Index entre deux histogrammes (mêmes intervalles)."""
+    actual = np.maximum(np.asarray(actual, dtype=np.float64) / max(sum(actual), 1), PSI_EPSILON)
+    expected = np.maximum(np.asarray(expected, dtype=np.float64) / max(sum(expected), 1), PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def ks_statistic(actual, expected):
+    """
+    Statistique de Kolmogorov-Smirnov (écart maximal entre les fonctions de répartition),
+    évaluée aux bornes des intervalles : une borne inférieure de la statistique exacte.
+    """
+    actual = np.cumsum(actual) / max(sum(actual), 1)
+    expected = np.cumsum(expected) / max(sum(expected), 1)
+    return float(np.abs(actual - expected).max())
+
+
+def status_of(value, rows):
+    """Statut d'un PSI : insufficient_data, ok, warning ou alert."""
+    if rows < DRIFT_MIN_ROWS:
+        return "insufficient_data"
+    if value >= DRIFT_PSI_ALERT:
+        return "alert"
+    return "warning" if value >= DRIFT_PSI_WARNING else "ok"
+
+
+STATUS_ORDER = ("insufficient_data", "ok", "warning", "alert")
+
+
+def compare(live, reference):
+    """
+    Compare les statistiques du trafic à celles du profil.
+
+    Returns:
+        dict: Pour chaque feature et pour la probabilité : moyennes, écarts-types, PSI, KS,
+        histogrammes et statut ; puis le statut global (le pire)
+    """
+    results = {}
+    for i, (name, low, high, bins) in enumerate(live.channels):
+        psi_value = psi(live.histograms[i], reference.histograms[i])
+        n, m = live.rows, reference.rows
+        results[name] = {
+            "mean": round(live.means[i], 4),
+            "std": round(math.sqrt(live.m2s[i] / n), 4) if n else 0.0,
+            "reference_mean": round(reference.means[i], 4),
+            "reference_std": round(math.sqrt(reference.m2s[i] / m), 4) if m else 0.0,
+            "psi": round(psi_value, 4),
+            "ks": round(ks_statistic(live.histograms[i], reference.histograms[i]), 4),
+            # Valeur critique du test KS à 5 % pour ces deux effectifs
+            "ks_critical": round(1.358 * math.sqrt((n + m) / (n * m)), 4) if n and m else None,
+            "status": status_of(psi_value, n),
+            "edges": np.linspace(low, high, bins + 1).round(4).tolist(),
+            "histogram": list(live.histograms[i]),
+            "reference_histogram": list(reference.histograms[i]),
+        }
+    female = GENDER_ENCODING["Female"]
+    gender_psi = psi(live.genders, reference.genders)
+    results["gender"] = {
+        "female_ratio": round(live.genders[female] / live.rows, 4) if live.rows else None,
+        "reference_female_ratio": round(reference.genders[female] / max(reference.rows, 1), 4),
+        "psi": round(gender_psi, 4),
+        "status": status_of(gender_psi, live.rows),
+    }
+    return results
+
+
+# ============================================================
+# Le moniteur (un par processus)
+# ============================================================
+
+def _alive(pid):
+    """Le processus existe-t-il encore ? (workers de app.serve : Linux / macOS uniquement)"""
+    if os.name != "posix":
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class DriftMonitor:
+    """
+    Statistiques du trafic par version du modèle, et leur comparaison au profil d'entraînement.
+
+    - observe / observe_batch sont appelés sur le chemin des requêtes, sans verrou :
+      chaque thread met à jour ses propres DriftStats
+    - un thread dépose toutes les sync_seconds secondes les statistiques du processus
+      dans directory/drift-<pid>.json ; report() y ajoute celles des autres workers vivants
+    """
+
+    def __init__(self, enabled=DRIFT_ENABLED, directory=DRIFT_DIR, sync_seconds=DRIFT_SYNC_SECONDS, bins=DRIFT_BINS):
+        self.enabled = enabled
+        self.directory = directory
+        self.sync_seconds = sync_seconds
+        self.channels = default_channels(bins)
+        self._local = threading.local()
+        self._shards = []
+        # Profils de référence déjà lus, rangés par sha du modèle
+        self._references = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self.running = False
+        self.sync_errors = 0
+
+    # --- Chemin des requêtes ---
+
+    def _stats(self, version):
+        """Retourne les statistiques de cette version dans le shard du thread courant."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            # list.append est atomique : pas besoin de verrou, même à la création
+            self._shards.append(shard)
+        stats = shard.get(version)
+        if stats is None:
+            stats = shard[version] = DriftStats(self.channels)
+        return stats
+
+    def observe(self, loaded, row, probability):
+        """
+        Ajoute une prédiction unitaire.
+
+        Args:
+            loaded (LoadedModel): La version du modèle qui a répondu
+            row (tuple): (gender, age, estimated_salary)
+            probability (float): La probabilité d'achat renvoyée au client
+        """
+        if self.enabled:
+            gender, age, estimated_salary = row
+            self._stats(loaded.version).add(gender, (age, estimated_salary, probability))
+
+    def observe_batch(self, loaded, input_array, probabilities):
+        """Ajoute un lot de prédictions (matrice (n, 3) et probabilités)."""
+        if self.enabled:
+            self._stats(loaded.version).add_batch(input_array, probabilities)
+
+    # --- Lecture ---
+
+    def local_stats(self):
+        """
+        Additionne les shards des threads de ce processus.
+
+        Returns:
+            dict: {version: DriftStats}
+        """
+        merged = {}
+        for shard in list(self._shards):
+            for version, stats in list(shard.items()):
+                if version in merged:
+                    merged[version].merge(stats)
+                else:
+                    merged[version] = stats.copy()
+        return merged
+
+    def collect(self):
+        """
+        Statistiques de tous les workers : ce processus (en mémoire) et les autres (drift-<pid>.json).
+
+        Returns:
+            tuple: ({version: DriftStats}, nombre de processus comptés)
+        """
+        merged = self.local_stats()
+        workers = 1
+        for path in sorted(self.directory.glob("drift-*.json")) if self.directory.exists() else ():
+            pid = int(path.stem.split("-")[1])
+            if pid == os.getpid():
+                continue
+            if not _alive(pid):
+                # Worker arrêté sans avoir pu supprimer son fichier
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            workers += 1
+            for version, data in snapshot["versions"].items():
+                stats = DriftStats.from_dict(data)
+                if stats.channels != self.channels:
+                    continue
+                if version in merged:
+                    merged[version].merge(stats)
+                else:
+                    merged[version] = stats
+        return merged, workers
+
+    def reference(self, loaded):
+        """
+        Profil de référence d'une version du modèle.
+
+        Lu dans <modèle>.drift.json ; s'il n'existe pas (modèle du notebook) ou s'il a été
+        calculé avec d'autres histogrammes, il est recalculé en mémoire sur DATA_PATH.
+        """
+        profile = self._references.get(loaded.sha)
+        if profile is not None:
+            return profile
+        path = profile_path(loaded.path)
+        if path.exists():
+            profile = load_profile(path)
+            profile["file"] = path.name
+            if profile["stats"].channels != self.channels:
+                logger.warning("%s ne correspond plus à DRIFT_BINS : profil recalculé sur %s", path.name,
+                               DATA_PATH.name)
+                profile = None
+        if profile is None:
+            profile = build_profile([DATA_PATH], lambda X: loaded.engine.predict_with_proba(X)[1], loaded.sha)
+            profile["file"] = None
+        # Le modèle a été remplacé sans relancer py -m app.train profile : la probabilité de référence est celle
+        # de l'ancien modèle
+        profile["stale"] = profile["model_sha"] not in (None, loaded.sha)
+        self._references[loaded.sha] = profile
+        return profile
+
+    def report(self, loaded):
+        """
+        Compare le trafic d'une version (tous workers confondus) à son profil de référence.
+
+        Returns:
+            dict: Statut global, nombre de prédictions, référence utilisée et détail par feature
+        """
+        merged, workers = self.collect()
+        live = merged.get(loaded.version) or DriftStats(self.channels)
+        profile = self.reference(loaded)
+        features = compare(live, profile["stats"])
+        return {
+            "model_version": loaded.version,
+            "model_sha": loaded.sha,
+            "status": max((result["status"] for result in features.values()), key=STATUS_ORDER.index),
+            "rows": live.rows,
+            "workers": workers,
+            "reference": {
+                "file": profile["file"],
+                "data": profile["data"],
+                "rows": profile["stats"].rows,
+                "created_at": profile["created_at"],
+                "model_sha": profile["model_sha"],
+                "stale": profile["stale"],
+            },
+            "features": features,
+        }
+
+    # --- Partage entre workers ---
+
+    def snapshot_path(self):
+        return self.directory / f"drift-{os.getpid()}.json"
+
+    def write_snapshot(self):
+        """Dépose les statistiques de ce processus pour les autres workers (fichier temporaire puis renommage)."""
+        versions = {version: stats.to_dict() for version, stats in self.local_stats().items()}
+        path = self.snapshot_path()
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps({"pid": os.getpid(), "updated_at": time.time(), "versions": versions}))
+        temporary.replace(path)
+
+    def start(self):
+        """Démarre le thread de partage (à appeler dans chaque processus, après un éventuel fork)."""
+        if self.running or not self.enabled:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="drift-sync", daemon=True)
+        self._thread.start()
+        self.running = True
+
+    def close(self, timeout=5.0):
+        """Arrête le thread et supprime le fichier de ce processus (ses statistiques partent avec lui)."""
+        if not self.running:
+            return
+        self.running = False
+        self._stop.set()
+        self._thread.join(timeout)
+        self.snapshot_path().unlink(missing_ok=True)
+
+    def _run(self):
+        rows = 0
+        while not self._stop.wait(self.sync_seconds):
+            # Rien de nouveau : pas d'écriture
+            current = sum(stats.rows for shard in list(self._shards) for stats in list(shard.values()))
+            if current == rows:
+                continue
+            try:
+                self.write_snapshot()
+                rows = current
+            except OSError:
+                self.sync_errors += 1
+                logger.exception("Écriture des statistiques de dérive impossible")
+
+
+# Moniteur partagé par toute l'application (thread de partage démarré et arrêté par le lifespan de main.py)
+drift_monitor = DriftMonitor()
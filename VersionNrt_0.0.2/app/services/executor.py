@@ -0,0 +1,99 @@
+# ============================================================
+# Fichier de l'exécuteur d'inférence
+# Ce fichier décide où tourne le calcul des prédictions :
+# dans la boucle asyncio, dans un pool de threads dédié
+# ou dans un pool de processus, selon config.py.
+# ============================================================
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+EXECUTOR_KINDS = ("inline", "thread", "process")
+
+
+class InferenceExecutor:
+    """
+    Exécute les fonctions de prédiction selon le mode choisi.
+
+    Le nombre d'appels en attente (pending) sert de jauge de saturation :
+    au-delà du nombre de workers, les appels font la queue dans le pool.
+    Tous les compteurs sont modifiés depuis la boucle asyncio uniquement.
+    """
+
+    def __init__(self, kind, workers=1, initializer=None, initargs=()):
+        """
+        Args:
+            kind (str): "inline", "thread" ou "process"
+            workers (int): Nombre de threads ou de processus du pool
+            initializer: Fonction appelée une fois au démarrage de chaque processus (mode "process")
+            initargs (tuple): Arguments de initializer
+        """
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"INFERENCE_EXECUTOR inconnu : {kind!r} (attendu : {', '.join(EXECUTOR_KINDS)})")
+        self.kind = kind
+        self.workers = 1 if kind == "inline" else workers
+        self.initializer = initializer
+        self.initargs = initargs
+        self._pool = None
+        self.pending = 0
+        self.max_pending = 0
+        self.completed = 0
+
+    def _get_pool(self):
+        """Crée le pool au premier appel (pas de processus lancés à l'import)."""
+        if self._pool is None:
+            if self.kind == "thread":
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+            else:
+                # "spawn" : les processus ne copient pas les threads et verrous du serveur en cours
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self.initializer,
+                    initargs=self.initargs,
+                )
+        return self._pool
+
+    async def run(self, fn, *args):
+        """
+        Exécute fn(*args) selon le mode de l'exécuteur.
+
+        En mode "process", fn et ses arguments doivent pouvoir être envoyés au processus
+        (fonction définie au niveau d'un module, tableaux NumPy...).
+
+        Returns:
+            Le résultat de fn(*args)
+        """
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+        try:
+            if self.kind == "inline":
+                return fn(*args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def stats(self):
+        """
+        Retourne la jauge de file d'attente de l'exécuteur.
+
+        Returns:
+            dict: Mode, nombre de workers, appels en cours, appels en file d'attente, maximum observé
+        """
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "pending": self.pending,
+            "queued": max(0, self.pending - self.workers),
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+        }
+
+    def shutdown(self):
+        """Arrête le pool (appelé à l'arrêt de l'application)."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,156 @@
+# ============================================================
+# Formats binaires des prédictions par lot
+# Ce fichier lit et écrit les corps des requêtes/réponses de
+# POST /ml/predict/batch quand le client n'envoie pas du JSON :
+#   - Arrow IPC (flux) : une colonne par feature
+#   - tableau NumPy brut : float64 little-endian, 3 colonnes
+# Les octets reçus sont lus sans conversion valeur par valeur :
+#   - tableau NumPy brut : la matrice remise au modèle pointe
+#     directement sur le corps (aucune copie)
+#   - Arrow : les colonnes sont lues sans copie, puis recopiées
+#     une fois dans la matrice (n_lignes, 3) ligne par ligne
+#     attendue par le modèle (une copie vectorisée, conversion
+#     en float64 comprise)
+# ============================================================
+
+import numpy as np
+
+from app.services.validation import check_matrix
+
+JSON = "application/json"
+
+# Flux Arrow IPC : colonnes gender, age, estimated_salary (types numériques, sans valeur nulle)
+# Réponse : colonnes prediction (int8) et probability (float64)
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+# Tableau NumPy brut : float64 little-endian, ordre C, forme (n_lignes, 3)
+# dans l'ordre gender, age, estimated_salary (np.ndarray.tobytes() côté client)
+# Réponse : n_lignes enregistrements de RESPONSE_DTYPE (np.frombuffer(corps, RESPONSE_DTYPE) côté client)
+NDARRAY = "application/x-ndarray"
+
+FEATURES = ("gender", "age", "estimated_salary")
+REQUEST_DTYPE = np.dtype("<f8")
+RESPONSE_DTYPE = np.dtype([("prediction", "i1"), ("probability", "<f8")])
+
+
+class FormatError(ValueError):
+    """Corps binaire illisible ou hors des contraintes de InputData (renvoyé en 422)."""
+
+
+def media_type(content_type):
+    """
+    Retourne le format demandé par l'en-tête Content-Type (sans ses paramètres).
+
+    Args:
+        content_type (str | None): La valeur de l'en-tête Content-Type
+
+    Returns:
+        str: JSON, ARROW_STREAM, NDARRAY, ou le type reçu s'il n'est pas pris en charge
+    """
+    if not content_type:
+        return JSON
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def decode_ndarray(body):
+    """
+    Lit un tableau NumPy brut sans copie : le résultat est une vue (lecture seule) sur les octets reçus.
+
+    Args:
+        body (bytes): Le corps de la requête
+
+    Returns:
+        np.ndarray: Matrice (n_lignes, 3) en float64
+    """
+    row_size = REQUEST_DTYPE.itemsize * len(FEATURES)
+    if not body or len(body) % row_size:
+        raise FormatError(f"Le corps doit contenir n x {len(FEATURES)} float64 little-endian ({row_size} octets par ligne)")
+    return np.frombuffer(body, dtype=REQUEST_DTYPE).reshape(-1, len(FEATURES))
+
+
+def decode_arrow(body):
+    """
+    Lit un flux Arrow IPC.
+
+    Les colonnes sont lues sans copie (to_numpy sur le buffer Arrow), puis recopiées
+    côte à côte dans la matrice (n_lignes, 3) attendue par le modèle : Arrow range
+    les valeurs par colonne, le modèle les lit par ligne, une copie est donc inévitable.
+    Un flux en plusieurs lots (record batches) est d'abord rassemblé (combine_chunks), ce qui copie aussi.
+
+    Args:
+        body (bytes): Le corps de la requête
+
+    Returns:
+        np.ndarray: Matrice (n_lignes, 3) en float64
+    """
+    # Import à la demande : pyarrow n'est chargé que si un client envoie de l'Arrow
+    import pyarrow as pa
+
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except (pa.ArrowInvalid, OSError) as exc:
+        raise FormatError(f"Flux Arrow IPC illisible : {exc}")
+
+    missing = [name for name in FEATURES if name not in table.column_names]
+    if missing:
+        raise FormatError(f"Colonnes manquantes : {', '.join(missing)}")
+
+    matrix = np.empty((table.num_rows, len(FEATURES)), dtype=REQUEST_DTYPE)
+    for index, name in enumerate(FEATURES):
+        column = table.column(name)
+        if column.null_count:
+            raise FormatError(f"La colonne {name} contient {column.null_count} valeur(s) nulle(s)")
+        if not (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)):
+            raise FormatError(f"La colonne {name} doit être numérique (reçu {column.type})")
+        matrix[:, index] = column.combine_chunks().to_numpy(zero_copy_only=True)
+    return matrix
+
+
+def validate_matrix(matrix, max_rows):
+    """
+    Applique à la matrice les contraintes de InputData, colonne par colonne (voir app/services/validation.py).
+
+    Args:
+        matrix (np.ndarray): Matrice (n_lignes, 3)
+        max_rows (int): Nombre maximal de lignes (MAX_BATCH_SIZE, comme pour le JSON)
+
+    Raises:
+        FormatError: Si une valeur n'est pas un entier entre les bornes du champ
+    """
+    if not 1 <= len(matrix) <= max_rows:
+        raise FormatError(f"Le lot doit contenir entre 1 et {max_rows} lignes (reçu {len(matrix)})")
+    report = check_matrix(matrix)
+    if report.n_invalid:
+        first = report.errors(limit=1)[0]
+        raise FormatError(
+            f"{report.n_invalid} ligne(s) invalide(s), par exemple la ligne {first['row']} ({first['message']})"
+        )
+
+
+def encode_ndarray(predictions, probabilities):
+    """Écrit les résultats en enregistrements RESPONSE_DTYPE."""
+    records = np.empty(len(predictions), dtype=RESPONSE_DTYPE)
+    records["prediction"] = predictions
+    records["probability"] = probabilities
+    return records.tobytes()
+
+
+def encode_arrow(predictions, probabilities):
+    """Écrit les résultats en flux Arrow IPC (colonnes prediction et probability)."""
+    import pyarrow as pa
+
+    table = pa.table({
+        "prediction": pa.array(np.asarray(predictions, dtype=np.int8)),
+        "probability": pa.array(np.asarray(probabilities, dtype=np.float64)),
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+# Format -> (lecture du corps, écriture de la réponse)
+CODECS = {
+    ARROW_STREAM: (decode_arrow, encode_arrow),
+    NDARRAY: (decode_ndarray, encode_ndarray),
+}
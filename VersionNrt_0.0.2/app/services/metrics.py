@@ -0,0 +1,320 @@
+# ============================================================
+# Métriques au format texte Prometheus
+# Ce fichier compte les requêtes, mesure leur durée et la durée
+# de chaque étape de POST /ml/predict (lecture du corps, décodage
+# JSON, validation, cache, modèle, sérialisation), puis produit
+# le texte lu par GET /metrics.
+# Utilisé aussi par l'API Iris de la VersionNrt_0.0.1, qui y
+# déclare ses propres familles (model_stage_seconds).
+#
+# Pas de verrou sur le chemin des requêtes : chaque thread écrit
+# dans ses propres compteurs ("shard") et GET /metrics additionne
+# les shards au moment de la lecture.
+# ============================================================
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+
+# Bornes (en secondes) des histogrammes de latence : de 50 µs à 10 s
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Bornes de l'histogramme des tailles de lot du micro-batcher (en lignes)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+def _escape(value):
+    """Échappe une valeur de label pour le format texte Prometheus."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=""):
+    """Construit le bloc {nom="valeur",...} d'une ligne de métrique."""
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_number(value):
+    """Écrit un nombre comme Prometheus l'attend (entiers sans décimales, +Inf)."""
+    if isinstance(value, float):
+        if value == float("inf"):
+            return "+Inf"
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return repr(value)
+    return str(int(value))
+
+
+class Metrics:
+    """
+    Registre de compteurs et d'histogrammes, sans verrou.
+
+    Chaque thread a son propre dictionnaire de compteurs : une observation modifie
+    seulement le dictionnaire du thread courant. render() additionne les dictionnaires
+    de tous les threads (une lecture pendant une écriture peut manquer la dernière
+    observation, jamais la corrompre).
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        self._shards = []
+        self._families = {}  # nom -> (type, aide, noms des labels)
+        self._buckets = {}  # nom d'un histogramme -> ses bornes (self.buckets par défaut)
+        self._collectors = []
+        # Requêtes en cours : modifié seulement par la boucle asyncio (middleware)
+        self.in_flight = 0
+
+    def counter(self, name, help_text, labels=()):
+        """Déclare un compteur."""
+        self._families[name] = ("counter", help_text, tuple(labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=None):
+        """Déclare un histogramme (bornes `buckets`, par défaut self.buckets)."""
+        self._families[name] = ("histogram", help_text, tuple(labels))
+        self._buckets[name] = tuple(buckets) if buckets is not None else self.buckets
+
+    def add_collector(self, collector):
+        """
+        Ajoute une fonction appelée à chaque lecture de /metrics.
+
+        Args:
+            collector (callable): Retourne une liste de (nom, type, aide, [(labels dict, valeur), ...])
+        """
+        self._collectors.append(collector)
+
+    def _shard(self):
+        """Retourne le dictionnaire de compteurs du thread courant (créé au premier appel)."""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            # list.append est atomique : pas besoin de verrou, même à la création
+            self._shards.append(shard)
+            return shard
+
+    def inc(self, name, *label_values, amount=1):
+        """Incrémente un compteur (les valeurs des labels sont passées dans l'ordre déclaré)."""
+        shard = self._shard()
+        key = (name, label_values)
+        shard[key] = shard.get(key, 0) + amount
+
+    def observe(self, name, value, *label_values):
+        """Ajoute une mesure (en secondes pour les histogrammes de latence) à un histogramme."""
+        shard = self._shard()
+        key = (name, label_values)
+        buckets = self._buckets[name]
+        entry = shard.get(key)
+        if entry is None:
+            # Un compteur par borne, un pour +Inf, puis la somme des valeurs
+            entry = shard[key] = [0] * (len(buckets) + 1) + [0.0]
+        entry[bisect_left(buckets, value)] += 1
+        entry[-1] += value
+
+    def _merge(self):
+        """Additionne les shards de tous les threads."""
+        merged = {}
+        for shard in list(self._shards):
+            # list(dict.items()) copie le dictionnaire en une seule opération
+            for key, value in list(shard.items()):
+                if isinstance(value, list):
+                    total = merged.get(key)
+                    merged[key] = list(value) if total is None else [a + b for a, b in zip(total, value)]
+                else:
+                    merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def render(self):
+        """
+        Produit le texte Prometheus de toutes les métriques.
+
+        Returns:
+            str: Le contenu de la réponse de GET /metrics
+        """
+        merged = self._merge()
+        samples = {}
+        for (name, label_values), value in merged.items():
+            samples.setdefault(name, []).append((label_values, value))
+
+        lines = []
+        for name, (kind, help_text, label_names) in self._families.items():
+            # Une famille sans mesure n'est pas écrite : chaque API ne montre que ce qu'elle mesure
+            # (les familles de la VersionNrt_0.0.2 n'apparaissent pas dans le /metrics de l'API Iris)
+            if name not in samples:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for label_values, value in sorted(samples[name], key=lambda sample: sample[0]):
+                if kind == "counter":
+                    lines.append(f"{name}{_format_labels(label_names, label_values)} {_format_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(self._buckets[name] + (float("inf"),), value):
+                    cumulative += count
+                    le = f'le="{_format_number(float(bound))}"'
+                    lines.append(f"{name}_bucket{_format_labels(label_names, label_values, le)} {cumulative}")
+                labels = _format_labels(label_names, label_values)
+                lines.append(f"{name}_sum{labels} {_format_number(value[-1])}")
+                lines.append(f"{name}_count{labels} {cumulative}")
+
+        lines.append("# HELP http_requests_in_flight Requêtes HTTP en cours de traitement")
+        lines.append("# TYPE http_requests_in_flight gauge")
+        lines.append(f"http_requests_in_flight {self.in_flight}")
+
+        for collector in self._collectors:
+            for name, kind, help_text, values in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in values:
+                    lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Registre partagé par toute l'application
+metrics = Metrics()
+metrics.counter("http_requests_total", "Requêtes HTTP terminées, par route et par code de statut",
+                ("method", "route", "status"))
+metrics.histogram("http_request_duration_seconds", "Durée totale des requêtes HTTP", ("method", "route"))
+metrics.histogram("request_stage_seconds", "Durée de chaque étape d'une requête de prédiction", ("route", "stage"))
+metrics.histogram("model_inference_seconds", "Durée d'un appel au modèle (attente de l'exécuteur comprise)", ("version",))
+metrics.counter("model_inference_rows_total", "Lignes évaluées par le modèle", ("version",))
+metrics.counter("catalog_model_rows_total", "Lignes évaluées par chaque modèle du catalogue (/models/{name})", ("model",))
+metrics.counter("admission_rejected_total", "Requêtes refusées par le contrôle d'admission (503 / 504), par motif",
+                ("priority", "reason"))
+metrics.histogram("admission_queue_wait_seconds", "Attente dans la file du contrôle d'admission", ("priority",))
+metrics.histogram("micro_batch_size", "Lignes par lot envoyé au modèle par le micro-batcher", ("version",),
+                  buckets=BATCH_SIZE_BUCKETS)
+
+
+# ============================================================
+# Chronométrage des étapes d'une requête
+# ============================================================
+
+# Chronomètre de la requête en cours (None en dehors d'une route chronométrée)
+current_timer = ContextVar("current_timer", default=None)
+
+
+class RequestTimer:
+    """
+    Découpe une requête en étapes successives.
+
+    Chaque appel à mark(étape) attribue à cette étape le temps écoulé depuis la marque précédente.
+    """
+
+    __slots__ = ("route", "last", "stages")
+
+    def __init__(self, route):
+        self.route = route
+        self.last = time.perf_counter()
+        self.stages = []
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+    def finish(self, registry):
+        for stage, seconds in self.stages:
+            registry.observe("request_stage_seconds", seconds, self.route, stage)
+
+
+def mark(stage):
+    """Termine l'étape `stage` de la requête en cours (sans effet hors d'une route chronométrée)."""
+    timer = current_timer.get()
+    if timer is not None:
+        timer.mark(stage)
+
+
+class TimedRequest(Request):
+    """Requête Starlette qui chronomètre la lecture du corps et le décodage JSON."""
+
+    async def body(self):
+        if not hasattr(self, "_body"):
+            await super().body()
+            mark("receive")
+        return self._body
+
+    async def json(self):
+        if not hasattr(self, "_json"):
+            await super().json()
+            mark("decode")
+        return self._json
+
+
+class TimedRoute(APIRoute):
+    """
+    Route FastAPI chronométrée, étape par étape.
+
+    Étapes enregistrées : receive (lecture du corps), decode (JSON), validate (Pydantic,
+    jusqu'à l'entrée dans la fonction de la route, qui appelle mark("validate")), les étapes marquées par la route elle-même
+    avec mark(...), puis serialize (schéma de réponse et JSON, après le return de la route).
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        route = self.path_format
+
+        async def timed_handler(request):
+            timer = RequestTimer(route)
+            token = current_timer.set(timer)
+            try:
+                response = await handler(TimedRequest(request.scope, request.receive))
+            finally:
+                current_timer.reset(token)
+            timer.mark("serialize")
+            timer.finish(metrics)
+            return response
+
+        return timed_handler
+
+
+# ============================================================
+# Middleware : comptage des requêtes par statut et requêtes en cours
+# ============================================================
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI (sans BaseHTTPMiddleware, pour rester léger) qui compte les requêtes
+    par route et par statut, mesure leur durée et tient la jauge des requêtes en cours.
+    """
+
+    def __init__(self, app, registry=metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            registry.in_flight -= 1
+            # FastAPI range la route trouvée dans le scope : on utilise son modèle d'URL
+            # ("/ml/v/{version}/predict") pour ne pas créer une série par valeur de paramètre
+            route = scope.get("route")
+            path = getattr(route, "path_format", None) or "unmatched"
+            method = scope["method"]
+            registry.inc("http_requests_total", method, path, str(status))
+            registry.observe("http_request_duration_seconds", time.perf_counter() - start, method, path)
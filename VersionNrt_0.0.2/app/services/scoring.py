@@ -0,0 +1,300 @@
+# ============================================================
+# Fichier du scoring de fichiers
+# Ce fichier lit des lignes au format de Social_Network_Ads.csv
+# (User ID, Gender, Age, EstimatedSalary), en CSV ou en NDJSON,
+# les valide, les évalue par blocs vectorisés et formate les
+# résultats ligne par ligne, erreurs comprises.
+# ============================================================
+
+import csv
+import json
+
+import numpy as np
+
+from app.config.config import GENDER_ENCODING, STREAM_MAX_LINE_BYTES
+from app.services.validation import validate_columns
+
+# Colonnes du fichier de données -> champ de InputData
+# En NDJSON, on accepte aussi directement les noms des champs de l'API
+COLUMN_ALIASES = {
+    "User ID": "user_id",
+    "Gender": "gender",
+    "Age": "age",
+    "EstimatedSalary": "estimated_salary",
+}
+FEATURES = ("gender", "age", "estimated_salary")
+
+# En-tête du CSV de sortie
+OUTPUT_COLUMNS = ["User ID", "prediction", "probability", "error"]
+
+
+async def iter_lines(byte_stream, max_line_bytes=STREAM_MAX_LINE_BYTES):
+    """
+    Découpe un flux d'octets en lignes de texte, sans jamais lire tout le flux.
+
+    Une ligne trop longue ou qui n'est pas de l'UTF-8 valide ne coupe pas le flux :
+    elle est remplacée par un message d'erreur et la lecture continue à la ligne suivante.
+    Au plus max_line_bytes octets d'une ligne incomplète sont gardés en mémoire.
+
+    Args:
+        byte_stream: Itérateur asynchrone de blocs d'octets (par exemple request.stream())
+        max_line_bytes (int): Longueur maximale d'une ligne, en octets
+
+    Yields:
+        tuple: (ligne sans le retour à la ligne, None), ou (None, message d'erreur) pour une ligne rejetée
+    """
+    # Début de la ligne en cours, reçu dans les blocs précédents
+    pending = bytearray()
+    # La ligne en cours dépasse déjà max_line_bytes : ses octets sont ignorés jusqu'au prochain retour à la ligne
+    overflow = False
+    async for chunk in byte_stream:
+        # La dernière partie est une ligne incomplète : elle attend le bloc suivant
+        *lines, rest = chunk.split(b"\n")
+        for line in lines:
+            if pending or overflow:
+                pending += line
+                line = pending
+            yield decode_line(line, overflow, max_line_bytes)
+            pending = bytearray()
+            overflow = False
+        if not overflow:
+            pending += rest
+            if len(pending) > max_line_bytes:
+                overflow = True
+                pending = bytearray()
+    if overflow or pending.strip():
+        yield decode_line(pending, overflow, max_line_bytes)
+
+
+def decode_line(line, overflow, max_line_bytes):
+    """
+    Décode une ligne complète reçue par iter_lines.
+
+    Returns:
+        tuple: (texte, None), ou (None, message d'erreur) si la ligne est trop longue ou mal encodée
+    """
+    if overflow or len(line) > max_line_bytes:
+        return None, f"Ligne trop longue (plus de {max_line_bytes} octets)"
+    try:
+        return bytes(line).rstrip(b"\r").decode("utf-8"), None
+    except UnicodeDecodeError as exc:
+        return None, f"Ligne mal encodée : octet {exc.start + 1} invalide en UTF-8"
+
+
+def parse_csv_header(line):
+    """
+    Lit l'en-tête CSV et retourne la position de chaque colonne reconnue.
+
+    Args:
+        line (str): La première ligne du fichier
+
+    Returns:
+        dict: {champ: index de colonne}, par exemple {"gender": 1, "age": 2, ...}
+
+    Raises:
+        ValueError: Si une colonne de features manque
+    """
+    names = next(csv.reader([line]))
+    columns = {}
+    for index, name in enumerate(names):
+        name = name.strip()
+        field = COLUMN_ALIASES.get(name, name if name in FEATURES else None)
+        if field is not None:
+            columns[field] = index
+    missing = [name for name, field in COLUMN_ALIASES.items() if field in FEATURES and field not in columns]
+    if missing:
+        raise ValueError(f"Colonnes manquantes dans l'en-tête CSV : {', '.join(missing)}")
+    return columns
+
+
+def read_csv_records(numbered_lines, columns):
+    """
+    Transforme des lignes CSV en dictionnaires {champ: valeur texte}.
+
+    Args:
+        numbered_lines (list): Liste de (numéro de ligne, texte)
+        columns (dict): Le résultat de parse_csv_header()
+
+    Returns:
+        list: Liste de (numéro de ligne, dictionnaire) ; une ligne illisible donne un dictionnaire vide
+    """
+    records = []
+    for (line_no, _), values in zip(numbered_lines, csv.reader(line for _, line in numbered_lines)):
+        record = {}
+        for field, index in columns.items():
+            if index < len(values):
+                record[field] = values[index].strip()
+        records.append((line_no, record))
+    return records
+
+
+def read_ndjson_records(numbered_lines):
+    """
+    Transforme des lignes NDJSON (un objet JSON par ligne) en dictionnaires {champ: valeur}.
+
+    Args:
+        numbered_lines (list): Liste de (numéro de ligne, texte)
+
+    Returns:
+        list: Liste de (numéro de ligne, dictionnaire ou message d'erreur)
+    """
+    records = []
+    for line_no, line in numbered_lines:
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError as exc:
+            records.append((line_no, f"JSON invalide : {exc.msg}"))
+            continue
+        if not isinstance(obj, dict):
+            records.append((line_no, "Chaque ligne doit être un objet JSON"))
+            continue
+        records.append((line_no, {COLUMN_ALIASES.get(key, key): value for key, value in obj.items()}))
+    return records
+
+
+def encode_gender(column):
+    """Encode le genre comme dans le notebook (Male = 0, Female = 1) ; les autres valeurs restent telles quelles."""
+    return [GENDER_ENCODING.get(value, value) if isinstance(value, str) else value for value in column]
+
+
+def score_records(engine, records):
+    """
+    Valide puis évalue un bloc d'enregistrements en un seul appel au moteur d'inférence.
+
+    La validation se fait par colonnes, avec les contraintes de InputData (voir
+    app/services/validation.py). Les lignes invalides ne sont pas évaluées : elles
+    reçoivent un message d'erreur et le reste du bloc est évalué normalement.
+
+    Args:
+        engine: Le moteur d'inférence (predict_with_proba)
+        records (list): Liste de (numéro de ligne, dictionnaire ou message d'erreur)
+
+    Returns:
+        list: Un dictionnaire par ligne : line, user_id, prediction, probability, error
+    """
+    results, parsed = [], []
+    for line_no, record in records:
+        result = {"line": line_no, "user_id": None, "prediction": None, "probability": None, "error": None}
+        if isinstance(record, str):
+            result["error"] = record
+        else:
+            result["user_id"] = record.get("user_id")
+            parsed.append((result, record))
+        results.append(result)
+    if not parsed:
+        return results
+
+    columns = {field: [record.get(field) for _, record in parsed] for field in FEATURES}
+    columns["gender"] = encode_gender(columns["gender"])
+    report = validate_columns(columns)
+    valid = report.valid
+    for (result, _), message in zip(parsed, report.messages().tolist()):
+        result["error"] = message
+
+    if valid.any():
+        predictions, probabilities = engine.predict_with_proba(report.matrix[valid])
+        valid_results = [result for (result, _), ok in zip(parsed, valid.tolist()) if ok]
+        for result, prediction, probability in zip(
+            valid_results, predictions.tolist(), np.round(probabilities, 4).tolist()
+        ):
+            result["prediction"] = prediction
+            result["probability"] = probability
+    return results
+
+
+def format_csv(results):
+    """Formate les résultats en lignes CSV (User ID, prediction, probability, error)."""
+    lines = []
+    for result in results:
+        error = f"ligne {result['line']} : {result['error']}" if result["error"] else ""
+        values = [result["user_id"], result["prediction"], result["probability"], error]
+        lines.append(",".join(_csv_value(value) for value in values))
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _csv_value(value):
+    """Convertit une valeur en champ CSV (guillemets si nécessaire)."""
+    if value is None:
+        return ""
+    text = str(value)
+    if any(char in text for char in ',"\n'):
+        text = '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def format_ndjson(results):
+    """Formate les résultats en NDJSON : un objet par ligne, avec "error" pour les lignes rejetées."""
+    lines = []
+    for result in results:
+        obj = {"User ID": result["user_id"], "line": result["line"]}
+        if result["error"]:
+            obj["error"] = result["error"]
+        else:
+            obj["prediction"] = result["prediction"]
+            obj["probability"] = result["probability"]
+        lines.append(json.dumps(obj, ensure_ascii=False))
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def frame_features(frame):
+    """
+    Valide un DataFrame au format Social_Network_Ads.csv et construit la matrice des features, colonne par colonne.
+
+    Même encodage et mêmes contrôles que pour le streaming (app/services/validation.py),
+    appliqués aux colonnes du DataFrame sans passer par des dictionnaires.
+
+    Args:
+        frame (pd.DataFrame): Un bloc du fichier (colonnes Gender, Age, EstimatedSalary, ou déjà renommées)
+
+    Returns:
+        tuple: (matrice (n_lignes, 3) en float, tableau des erreurs : None pour une ligne valide)
+
+    Raises:
+        ValueError: Si une colonne de features manque
+    """
+    frame = frame.rename(columns=COLUMN_ALIASES)
+    missing = [field for field in FEATURES if field not in frame.columns]
+    if missing:
+        raise ValueError(f"Colonnes manquantes : {', '.join(missing)}")
+
+    columns = {field: frame[field].to_numpy() for field in FEATURES}
+    if columns["gender"].dtype == object:
+        # Male/Female comme dans le notebook, ou déjà encodé en 0/1
+        columns["gender"] = np.array(encode_gender(columns["gender"]), dtype=object)
+    report = validate_columns(columns)
+    return report.matrix, report.messages()
+
+
+def score_frame(engine, frame):
+    """
+    Valide et évalue un DataFrame au format Social_Network_Ads.csv, colonne par colonne.
+
+    Args:
+        engine: Le moteur d'inférence (predict_with_proba)
+        frame (pd.DataFrame): Un bloc du fichier (colonnes User ID, Gender, Age, EstimatedSalary)
+
+    Returns:
+        pd.DataFrame: User ID, prediction, probability, error (dans l'ordre des lignes du bloc)
+    """
+    import pandas as pd
+
+    input_array, errors = frame_features(frame)
+    frame = frame.rename(columns=COLUMN_ALIASES)
+    n_rows = len(frame)
+
+    valid = errors == None  # noqa: E711
+    predictions = np.full(n_rows, -1, dtype=np.int64)
+    probabilities = np.full(n_rows, np.nan)
+    if valid.any():
+        valid_predictions, valid_probabilities = engine.predict_with_proba(input_array[valid])
+        predictions[valid] = valid_predictions
+        probabilities[valid] = np.round(valid_probabilities, 4)
+
+    user_ids = frame["user_id"] if "user_id" in frame.columns else pd.Series([None] * n_rows)
+    return pd.DataFrame({
+        "User ID": user_ids.to_numpy(),
+        # Int8 accepte les valeurs manquantes : les lignes rejetées n'ont pas de prédiction
+        "prediction": pd.arrays.IntegerArray(np.where(valid, predictions, 0).astype(np.int8), mask=~valid),
+        "probability": probabilities,
+        "error": errors,
+    })
@@ -0,0 +1,307 @@
+# ============================================================
+# Fichier de la validation par colonnes
+# InputData (Pydantic) valide une ligne à la fois : pour un lot de
+# 100 000 lignes, construire 100 000 objets coûte bien plus cher
+# que la prédiction elle-même. Ici, les mêmes contraintes, lues
+# dans InputData (champ obligatoire, entier, bornes ge/le),
+# s'appliquent à des colonnes NumPy entières :
+#   - conversion de chaque colonne en float64, avec les règles de
+#     Pydantic pour un champ int (texte "30" ou "30.0" accepté,
+#     "1e3" ou "30.5" refusé)
+#   - détection des valeurs manquantes (None, NaN, chaîne vide)
+#   - masques "entier" et "entre les bornes"
+# Pour chaque ligne, on garde la première erreur rencontrée
+# (code + champ) ; les messages ne sont construits que pour les
+# lignes rejetées.
+#
+# Utilisé par POST /ml/predict/batch (JSON et formats binaires),
+# le scoring en streaming et le scoring de fichiers (batch.py).
+# ============================================================
+
+import math
+import re
+from itertools import compress
+from numbers import Real
+
+import numpy as np
+
+from app.schemas.schema import InputData, get_field_bounds
+
+FEATURES = ("gender", "age", "estimated_salary")
+
+# (champ, borne minimale, borne maximale, entier obligatoire), dans l'ordre des colonnes du modèle
+RULES = [
+    (name, *get_field_bounds(name), InputData.model_fields[name].annotation is int)
+    for name in FEATURES
+]
+
+# Code de la première erreur de chaque ligne (0 = ligne valide)
+VALID, MISSING, INVALID, NOT_INTEGER, OUT_OF_RANGE = range(5)
+ERROR_TYPES = {
+    MISSING: "missing",
+    INVALID: "invalid",
+    NOT_INTEGER: "not_integer",
+    OUT_OF_RANGE: "out_of_range",
+}
+
+
+# Types d'une colonne d'objets convertie d'un bloc en float64 (None devient NaN)
+PLAIN_TYPES = {int, float, bool, type(None)}
+
+# Entier écrit en texte, tel que Pydantic l'accepte pour un champ int (espaces retirés) :
+# signe, chiffres ASCII séparés par des _ isolés, partie décimale nulle facultative ("30.0")
+INT_TEXT = re.compile(r"[+-]?[0-9]+(?:_[0-9]+)*(?:\.0+)?")
+
+
+def coerce_column(values, integer=True):
+    """
+    Convertit une colonne en float64, avec les règles de Pydantic pour le type du champ.
+
+    Cas rapides, en une conversion NumPy : une colonne de nombres (et de None), une colonne
+    de textes qui ne contiennent que des chiffres ASCII. Les autres valeurs sont lues
+    une par une (parse_value) : celles que InputData refuserait sont marquées invalides.
+
+    Args:
+        values: La colonne (liste ou tableau NumPy)
+        integer (bool): True pour un champ int de InputData (règles de texte plus strictes)
+
+    Returns:
+        tuple: (valeurs en float64, NaN pour une valeur manquante ; masque des valeurs non numériques, ou None)
+    """
+    if isinstance(values, np.ndarray):
+        if values.dtype.kind in "biuf":
+            return values.astype(np.float64), None
+        values = values.tolist()
+
+    kinds = set(map(type, values))
+    if kinds <= PLAIN_TYPES:
+        try:
+            if type(None) in kinds:
+                return np.asarray(values, dtype=np.float64), None
+            # np.fromiter est le plus rapide pour une liste de nombres
+            return np.fromiter(values, dtype=np.float64, count=len(values)), None
+        except OverflowError:
+            # Entier trop grand pour un float64 : relu valeur par valeur
+            pass
+
+    numbers = np.full(len(values), np.nan)
+    invalid = np.zeros(len(values), dtype=bool)
+    pending = range(len(values))
+    if kinds == {str}:
+        # Textes (CSV) : ceux qui ne contiennent que des chiffres ASCII sont convertis d'un bloc
+        digits = np.fromiter(map(str.isdigit, values), dtype=bool, count=len(values))
+        digits &= np.fromiter(map(str.isascii, values), dtype=bool, count=len(values))
+        if digits.all():
+            return np.fromiter(values, dtype=np.float64, count=len(values)), None
+        numbers[digits] = np.fromiter(compress(values, digits), dtype=np.float64)
+        pending = np.flatnonzero(~digits).tolist()
+    for index in pending:
+        numbers[index], invalid[index] = parse_value(values[index], integer)
+    return numbers, invalid if invalid.any() else None
+
+
+def parse_value(value, integer):
+    """
+    Convertit une valeur comme InputData le ferait.
+
+    Returns:
+        tuple: (nombre, NaN si la valeur manque ou est invalide ; True si la valeur est invalide)
+    """
+    if value is None:
+        return np.nan, False
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return np.nan, False
+        if integer:
+            if INT_TEXT.fullmatch(text) is None:
+                return np.nan, True
+            return float(text.replace("_", "")), False
+        try:
+            return float(text), False
+        except ValueError:
+            return np.nan, True
+    if isinstance(value, Real):
+        try:
+            return float(value), False
+        except OverflowError:
+            # Entier trop grand : hors des bornes, comme pour Pydantic
+            return (math.inf if value > 0 else -math.inf), False
+    return np.nan, True
+
+
+class ColumnReport:
+    """
+    Résultat de la validation d'un lot : la matrice des features et la première erreur de chaque ligne.
+
+    - matrix : matrice (n_lignes, 3) en float64 ; seules les lignes valides peuvent aller au modèle
+    - codes : code de la première erreur de chaque ligne (VALID, MISSING, ...)
+    - fields : index dans FEATURES du champ en erreur (sans signification pour une ligne valide)
+    """
+
+    __slots__ = ("matrix", "codes", "fields", "raw")
+
+    def __init__(self, matrix, codes, fields, raw=None):
+        self.matrix = matrix
+        self.codes = codes
+        self.fields = fields
+        # Colonnes reçues, pour citer la valeur refusée dans les messages (None = matrix suffit)
+        self.raw = raw
+
+    @property
+    def valid(self):
+        """Masque des lignes valides."""
+        return self.codes == VALID
+
+    @property
+    def n_invalid(self):
+        return int(np.count_nonzero(self.codes))
+
+    def message(self, row):
+        """Message de l'erreur d'une ligne rejetée, par exemple "age : 70 hors de l'intervalle [18, 60]"."""
+        name, low, high, _ = RULES[self.fields[row]]
+        code = self.codes[row]
+        if code == MISSING:
+            return f"{name} : valeur manquante"
+        if code == INVALID:
+            value = self.raw[name][row]
+            # Valeur lue dans un tableau NumPy : on cite la valeur Python ('abc' plutôt que np.str_('abc'))
+            return f"{name} : valeur invalide {value.item() if isinstance(value, np.generic) else value!r}"
+        value = _number(self.matrix[row, self.fields[row]])
+        if code == NOT_INTEGER:
+            return f"{name} : {value} n'est pas un entier"
+        return f"{name} : {value} hors de l'intervalle [{low}, {high}]"
+
+    def messages(self):
+        """
+        Message d'erreur de chaque ligne.
+
+        Returns:
+            np.ndarray: Tableau d'objets, None pour une ligne valide
+        """
+        messages = np.full(len(self.codes), None, dtype=object)
+        for row in np.flatnonzero(self.codes).tolist():
+            messages[row] = self.message(row)
+        return messages
+
+    def errors(self, limit=None):
+        """
+        Rapport compact des lignes rejetées (les lignes valides n'y figurent pas).
+
+        Args:
+            limit (int | None): Nombre maximal de lignes décrites (None = toutes)
+
+        Returns:
+            list: Un dictionnaire par ligne rejetée : row (index dans le lot), field, type, message
+        """
+        rows = np.flatnonzero(self.codes)[:limit].tolist()
+        return [
+            {
+                "row": row,
+                "field": FEATURES[self.fields[row]],
+                "type": ERROR_TYPES[int(self.codes[row])],
+                "message": self.message(row),
+            }
+            for row in rows
+        ]
+
+
+def _number(value):
+    """Affiche 70.0 comme 70, mais garde 30.5 et inf."""
+    return int(value) if math.isfinite(value) and value.is_integer() else float(value)
+
+
+def check_matrix(matrix, invalid=None, raw=None):
+    """
+    Applique les contraintes de InputData à une matrice déjà convertie en float64.
+
+    Chaque contrôle porte sur une colonne entière ; le détail (quelle erreur, sur quel champ)
+    n'est calculé que si la colonne contient au moins une valeur refusée.
+
+    Args:
+        matrix (np.ndarray): Matrice (n_lignes, 3), colonnes dans l'ordre de FEATURES
+        invalid (list | None): Pour chaque colonne, masque des valeurs non numériques (ou None)
+        raw (dict | None): Colonnes reçues, citées dans les messages des valeurs non numériques
+
+    Returns:
+        ColumnReport: La matrice et la première erreur de chaque ligne
+    """
+    n_rows = len(matrix)
+    codes = np.zeros(n_rows, dtype=np.int8)
+    fields = np.zeros(n_rows, dtype=np.int8)
+    for index, (_, low, high, integer) in enumerate(RULES):
+        column = matrix[:, index]
+        # NaN échoue à toutes les comparaisons : les valeurs manquantes tombent dans `bad`
+        ok = (column >= low) & (column <= high)
+        if integer:
+            ok &= column == np.floor(column)
+        if ok.all():
+            continue
+        bad = ~ok
+        column_codes = np.full(n_rows, OUT_OF_RANGE, dtype=np.int8)
+        if integer:
+            column_codes[column != np.floor(column)] = NOT_INTEGER
+        column_codes[np.isnan(column)] = MISSING
+        if invalid is not None and invalid[index] is not None:
+            column_codes[invalid[index]] = INVALID
+        # Seule la première erreur de chaque ligne est gardée
+        first = bad & (codes == VALID)
+        codes[first] = column_codes[first]
+        fields[first] = index
+    return ColumnReport(matrix, codes, fields, raw)
+
+
+def validate_columns(columns):
+    """
+    Valide un lot donné colonne par colonne, avec les contraintes de InputData.
+
+    Args:
+        columns (dict): {champ: colonne} pour gender, age et estimated_salary
+            (listes ou tableaux NumPy ; les autres clés sont ignorées)
+
+    Returns:
+        ColumnReport: La matrice (n_lignes, 3) et la première erreur de chaque ligne
+
+    Raises:
+        ValueError: Si une colonne manque, n'est pas une liste de valeurs
+            ou si les colonnes n'ont pas la même longueur
+    """
+    missing = [name for name in FEATURES if name not in columns]
+    if missing:
+        raise ValueError(f"Colonnes manquantes : {', '.join(missing)}")
+    for name in FEATURES:
+        # Un texte ou un dictionnaire serait parcouru caractère par caractère ou clé par clé
+        if not isinstance(columns[name], (list, np.ndarray)):
+            raise ValueError(f"La colonne {name} doit être une liste de valeurs")
+
+    converted = [coerce_column(columns[name], integer) for name, _, _, integer in RULES]
+    for name, (values, _) in zip(FEATURES, converted):
+        if values.ndim != 1:
+            raise ValueError(f"La colonne {name} doit être une liste de valeurs")
+    lengths = {name: len(values) for name, (values, _) in zip(FEATURES, converted)}
+    if len(set(lengths.values())) > 1:
+        raise ValueError(
+            "Les colonnes n'ont pas la même longueur ("
+            + ", ".join(f"{name} : {length}" for name, length in lengths.items()) + ")"
+        )
+
+    matrix = np.empty((len(converted[0][0]), len(FEATURES)), dtype=np.float64)
+    for index, (values, _) in enumerate(converted):
+        matrix[:, index] = values
+    return check_matrix(matrix, [invalid for _, invalid in converted], columns)
+
+
+def validate_records(records):
+    """
+    Valide une liste de lignes {champ: valeur} (corps "instances" de POST /ml/predict/batch).
+
+    Les colonnes sont extraites une fois, puis validées comme avec validate_columns :
+    aucun objet InputData n'est construit.
+
+    Args:
+        records (list): Liste de dictionnaires ; un champ absent compte comme une valeur manquante
+
+    Returns:
+        ColumnReport: La matrice (n_lignes, 3) et la première erreur de chaque ligne
+    """
+    return validate_columns({name: [record.get(name) for record in records] for name in FEATURES})
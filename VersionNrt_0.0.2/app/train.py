@@ -0,0 +1,343 @@
+# ============================================================
+# Outil en ligne de commande d'entraînement du modèle (hors notebook)
+# Ce fichier entraîne le pipeline StandardScaler + régression
+# logistique en lisant les CSV par blocs : la mémoire utilisée
+# dépend de la taille d'un bloc, pas de la taille des fichiers.
+#   - le StandardScaler apprend ses moyennes/écarts-types avec partial_fit
+#   - la régression logistique est un SGDClassifier(loss="log_loss"),
+#     lui aussi entraîné bloc par bloc avec partial_fit
+# Chaque entraînement écrit une nouvelle version dans app/models/ :
+#   model-<version>.joblib (le pipeline, lu par le registre de l'API)
+#   model-<version>.json   (ordre des features, encodage, métriques, empreintes des données)
+#   model-<version>.drift.json (profil des données, référence de GET /ml/drift)
+#
+# Utilisation (depuis VersionNrt_0.0.2/) :
+#   py -m app.train fit data/Social_Network_Ads.csv --version 2024-06
+#   py -m app.train update 2024-06 nouvelles_donnees.csv --version 2024-07
+#   py -m app.train profile default data/Social_Network_Ads.csv   # profil d'un modèle existant (notebook)
+# ============================================================
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from app.config.config import (
+    GENDER_ENCODING,
+    MODELS_DIR,
+    TRAIN_ALPHA,
+    TRAIN_CHUNK_ROWS,
+    TRAIN_EPOCHS,
+    TRAIN_HOLDOUT_EVERY,
+    TRAIN_TARGET_COLUMN,
+)
+from app.models.load_model import file_sha256, get_model_version
+from app.models.registry import ModelRegistry
+from app.services.drift import build_profile, profile_path, save_profile
+from app.services.scoring import COLUMN_ALIASES, FEATURES, frame_features
+
+CLASSES = np.array([0, 1])
+
+
+def iter_training_chunks(paths, chunk_rows, holdout_every):
+    """
+    Lit les fichiers bloc par bloc et sépare les lignes d'apprentissage des lignes de contrôle.
+
+    Une ligne sur holdout_every (selon sa position dans le fichier) est mise de côté pour
+    les métriques : la séparation est la même à chaque passage et à chaque exécution.
+
+    Args:
+        paths (list): Les fichiers CSV au format Social_Network_Ads.csv (avec la colonne Purchased)
+        chunk_rows (int): Nombre de lignes par bloc
+        holdout_every (int): Une ligne sur N va dans le jeu de contrôle (0 = aucune)
+
+    Yields:
+        tuple: (chemin, X (n, 3), y (n,), masque des lignes de contrôle, nombre de lignes rejetées)
+    """
+    import pandas as pd
+
+    usecols = [*(name for name, field in COLUMN_ALIASES.items() if field in FEATURES), TRAIN_TARGET_COLUMN]
+    for path in paths:
+        offset = 0
+        for frame in pd.read_csv(path, usecols=usecols, chunksize=chunk_rows):
+            features, errors = frame_features(frame)
+            target = pd.to_numeric(frame[TRAIN_TARGET_COLUMN], errors="coerce").to_numpy(dtype=float)
+            valid = (errors == None) & np.isin(target, CLASSES)  # noqa: E711
+
+            positions = offset + np.arange(len(frame))
+            holdout = positions % holdout_every == 0 if holdout_every else np.zeros(len(frame), dtype=bool)
+            offset += len(frame)
+            yield path, features[valid], target[valid].astype(np.int64), holdout[valid], int((~valid).sum())
+
+
+def fit_scaler(scaler, paths, chunk_rows, holdout_every):
+    """
+    Passe 1 : met à jour les moyennes et écarts-types du scaler sur les lignes d'apprentissage.
+
+    Returns:
+        dict: Par fichier, le nombre de lignes lues et rejetées
+    """
+    counts = {str(path): {"rows": 0, "rejected_rows": 0} for path in paths}
+    for path, X, _, holdout, rejected in iter_training_chunks(paths, chunk_rows, holdout_every):
+        counts[str(path)]["rows"] += len(X)
+        counts[str(path)]["rejected_rows"] += rejected
+        if (~holdout).any():
+            scaler.partial_fit(X[~holdout])
+    return counts
+
+
+def fit_classifier(scaler, classifier, paths, chunk_rows, holdout_every, epochs, seed):
+    """
+    Passes suivantes : epochs passages de descente de gradient, bloc par bloc.
+
+    Les lignes de chaque bloc sont mélangées (graine fixe) avant l'appel à partial_fit.
+    """
+    rng = np.random.default_rng(seed)
+    for epoch in range(epochs):
+        for _, X, y, holdout, _ in iter_training_chunks(paths, chunk_rows, holdout_every):
+            X, y = X[~holdout], y[~holdout]
+            if not len(X):
+                continue
+            order = rng.permutation(len(X))
+            classifier.partial_fit(scaler.transform(X[order]), y[order], classes=CLASSES)
+
+
+def evaluate(model, paths, chunk_rows, holdout_every):
+    """
+    Calcule les métriques sur les lignes de contrôle, bloc par bloc (sans garder les prédictions).
+
+    Returns:
+        dict: Nombre de lignes de contrôle, accuracy, precision, recall et log loss
+    """
+    true_positive = false_positive = false_negative = correct = rows = 0
+    log_loss = 0.0
+    for _, X, y, holdout, _ in iter_training_chunks(paths, chunk_rows, holdout_every):
+        X, y = X[holdout], y[holdout]
+        if not len(X):
+            continue
+        probabilities = np.clip(model.predict_proba(X)[:, 1], 1e-15, 1 - 1e-15)
+        predictions = (probabilities >= 0.5).astype(np.int64)
+        rows += len(y)
+        correct += int((predictions == y).sum())
+        true_positive += int(((predictions == 1) & (y == 1)).sum())
+        false_positive += int(((predictions == 1) & (y == 0)).sum())
+        false_negative += int(((predictions == 0) & (y == 1)).sum())
+        log_loss -= float(np.sum(y * np.log(probabilities) + (1 - y) * np.log(1 - probabilities)))
+
+    if not rows:
+        return {"holdout_rows": 0}
+    return {
+        "holdout_rows": rows,
+        "accuracy": round(correct / rows, 4),
+        "precision": round(true_positive / max(true_positive + false_positive, 1), 4),
+        "recall": round(true_positive / max(true_positive + false_negative, 1), 4),
+        "log_loss": round(log_loss / rows, 4),
+    }
+
+
+def artifact_paths(version, models_dir=MODELS_DIR):
+    """Retourne les chemins (modèle .joblib, métadonnées .json) d'une version."""
+    return models_dir / f"model-{version}.joblib", models_dir / f"model-{version}.json"
+
+
+def load_artifact(version, models_dir=MODELS_DIR):
+    """
+    Charge une version entraînée par cet outil (pipeline + métadonnées) pour la mettre à jour.
+
+    Raises:
+        ValueError: Si la version n'existe pas ou n'a pas été produite par app.train
+    """
+    model_path, metadata_path = artifact_paths(version, models_dir)
+    if not model_path.exists() or not metadata_path.exists():
+        raise ValueError(
+            f"Version {version} introuvable ou sans métadonnées ({model_path.name} + {metadata_path.name}) : "
+            "seules les versions produites par app.train peuvent être mises à jour"
+        )
+    return joblib.load(model_path), json.loads(metadata_path.read_text())
+
+
+def save_artifact(model, metadata, version, models_dir=MODELS_DIR, force=False):
+    """
+    Écrit model-<version>.joblib puis model-<version>.json.
+
+    Le modèle est d'abord écrit dans un fichier temporaire puis renommé : le registre
+    de l'API ne voit jamais un fichier à moitié écrit.
+
+    Returns:
+        tuple: Les chemins du modèle et des métadonnées
+    """
+    model_path, metadata_path = artifact_paths(version, models_dir)
+    if model_path.exists() and not force:
+        raise ValueError(f"{model_path.name} existe déjà (utiliser --force pour le remplacer)")
+
+    models_dir.mkdir(parents=True, exist_ok=True)
+    temporary = model_path.with_suffix(".joblib.tmp")
+    joblib.dump(model, temporary)
+    metadata["model_sha256"] = file_sha256(temporary)
+    metadata_path.write_text(json.dumps(metadata, indent=2, ensure_ascii=False))
+    temporary.replace(model_path)
+    return model_path, metadata_path
+
+
+def train(paths, version, base=None, epochs=TRAIN_EPOCHS, chunk_rows=TRAIN_CHUNK_ROWS,
+          holdout_every=TRAIN_HOLDOUT_EVERY, seed=0, models_dir=MODELS_DIR, force=False):
+    """
+    Entraîne une nouvelle version, à partir de zéro (base=None) ou en continuant une version existante.
+
+    En mise à jour, le scaler continue d'accumuler ses statistiques (elles restent celles de toutes
+    les données vues) et le SGDClassifier repart de ses poids actuels : seules les nouvelles données
+    sont relues.
+
+    Args:
+        paths (list): Les fichiers CSV d'entraînement
+        version (str): Le nom de la nouvelle version
+        base (str | None): La version à mettre à jour (None = entraînement complet)
+
+    Returns:
+        dict: Les métadonnées de la nouvelle version
+
+    Raises:
+        ValueError: Si holdout_every vaut 1 ou est négatif, si la version de base n'existe pas
+            ou si la nouvelle version existe déjà (sans force)
+    """
+    if holdout_every < 0 or holdout_every == 1:
+        # Avec 1, toutes les lignes iraient au contrôle : le scaler ne verrait aucune ligne d'apprentissage
+        raise ValueError(
+            f"holdout_every doit valoir 0 (aucune ligne de contrôle) ou au moins 2, pas {holdout_every}"
+        )
+
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    import sklearn
+
+    paths = [Path(path) for path in paths]
+    start = time.perf_counter()
+    if base is None:
+        scaler = StandardScaler()
+        # average=True : les poids retenus sont la moyenne des poids vus pendant la descente,
+        # bien plus stables d'un passage à l'autre que les derniers poids
+        classifier = SGDClassifier(loss="log_loss", alpha=TRAIN_ALPHA, average=True, random_state=seed)
+        history = []
+    else:
+        model, base_metadata = load_artifact(base, models_dir)
+        scaler, classifier = model.steps[0][1], model.steps[1][1]
+        if not hasattr(classifier, "partial_fit"):
+            raise ValueError(f"La version {base} ({type(classifier).__name__}) ne peut pas être mise à jour par blocs")
+        history = base_metadata["data"]
+
+    counts = fit_scaler(scaler, paths, chunk_rows, holdout_every)
+    fit_classifier(scaler, classifier, paths, chunk_rows, holdout_every, epochs, seed)
+    model = make_pipeline(scaler, classifier)
+    metrics = evaluate(model, paths, chunk_rows, holdout_every)
+
+    metadata = {
+        "version": version,
+        "parent_version": base,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "algorithm": "StandardScaler.partial_fit + SGDClassifier(loss='log_loss').partial_fit",
+        # Ordre des colonnes de la matrice attendue par le modèle, et colonnes CSV correspondantes
+        "features": list(FEATURES),
+        "csv_columns": {field: name for name, field in COLUMN_ALIASES.items() if field in FEATURES},
+        "target": TRAIN_TARGET_COLUMN,
+        "gender_encoding": GENDER_ENCODING,
+        "params": {
+            "epochs": epochs,
+            "chunk_rows": chunk_rows,
+            "holdout_every": holdout_every,
+            "seed": seed,
+            "alpha": classifier.alpha,
+        },
+        "rows_seen": int(scaler.n_samples_seen_),
+        "data": history + [
+            {"path": str(path), "sha256": file_sha256(path), **counts[str(path)]} for path in paths
+        ],
+        # Métriques sur les lignes de contrôle des fichiers de cet entraînement
+        "metrics": metrics,
+        "training_seconds": round(time.perf_counter() - start, 3),
+        "versions": {"scikit-learn": sklearn.__version__, "numpy": np.__version__},
+    }
+    model_path, _ = save_artifact(model, metadata, version, models_dir, force)
+    write_profile(model, paths, model_path, chunk_rows)
+    return metadata
+
+
+def write_profile(model, paths, model_path, chunk_rows=TRAIN_CHUNK_ROWS):
+    """
+    Écrit le profil des données d'entraînement (<modèle>.drift.json), référence de GET /ml/drift.
+
+    Returns:
+        Path: Le fichier écrit
+    """
+    profile = build_profile(
+        paths, lambda X: model.predict_proba(X)[:, 1], get_model_version(model_path), chunk_rows=chunk_rows
+    )
+    path = profile_path(model_path)
+    save_profile(profile, path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.train", description="Entraînement du modèle par blocs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(command):
+        command.add_argument("--version", default=None, help="Nom de la nouvelle version (défaut : date et heure)")
+        command.add_argument("--epochs", type=int, default=TRAIN_EPOCHS, help="Passages sur les données")
+        command.add_argument("--chunk-rows", type=int, default=TRAIN_CHUNK_ROWS, help="Lignes lues à la fois")
+        command.add_argument("--holdout-every", type=int, default=TRAIN_HOLDOUT_EVERY,
+                             help="Une ligne sur N sert au contrôle (0 = aucune, sinon au moins 2)")
+        command.add_argument("--seed", type=int, default=0)
+        command.add_argument("--models-dir", type=Path, default=MODELS_DIR)
+        command.add_argument("--force", action="store_true", help="Remplacer une version existante")
+
+    fit = commands.add_parser("fit", help="Entraîner une nouvelle version à partir de zéro")
+    fit.add_argument("data", nargs="+", help="Fichiers CSV d'entraînement")
+    add_common(fit)
+
+    update = commands.add_parser("update", help="Continuer l'entraînement d'une version avec de nouveaux fichiers")
+    update.add_argument("base", help="Version à mettre à jour (produite par app.train)")
+    update.add_argument("data", nargs="+", help="Nouveaux fichiers CSV")
+    add_common(update)
+
+    profile = commands.add_parser("profile", help="Écrire le profil de dérive d'un modèle existant (GET /ml/drift)")
+    profile.add_argument("model_version", help="Version du modèle (default = model.joblib)")
+    profile.add_argument("data", nargs="+", help="Fichiers CSV sur lesquels le modèle a été entraîné")
+    profile.add_argument("--chunk-rows", type=int, default=TRAIN_CHUNK_ROWS, help="Lignes lues à la fois")
+    profile.add_argument("--models-dir", type=Path, default=MODELS_DIR)
+
+    args = parser.parse_args(argv)
+    if args.command == "profile":
+        model_path = ModelRegistry(args.models_dir).discover().get(args.model_version)
+        if model_path is None:
+            print(f"Erreur : version {args.model_version} introuvable dans {args.models_dir}")
+            return 1
+        path = write_profile(joblib.load(model_path), [Path(path) for path in args.data], model_path, args.chunk_rows)
+        print(f"Profil de dérive : {path}")
+        return 0
+
+    version = args.version or datetime.now().strftime("%Y%m%d-%H%M%S")
+    try:
+        metadata = train(
+            args.data, version, base=getattr(args, "base", None), epochs=args.epochs, chunk_rows=args.chunk_rows,
+            holdout_every=args.holdout_every, seed=args.seed, models_dir=args.models_dir, force=args.force,
+        )
+    except (ValueError, FileNotFoundError) as exc:
+        print(f"Erreur : {exc}")
+        return 1
+
+    print(f"Version {version} : {metadata['rows_seen']} lignes apprises en {metadata['training_seconds']} s")
+    print(f"Métriques de contrôle : {metadata['metrics']}")
+    model_path = artifact_paths(version, args.models_dir)[0]
+    print(f"Modèle : {model_path} (POST /ml/v/{version}/predict)")
+    print(f"Profil de dérive : {profile_path(model_path)} (GET /ml/drift?version={version})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+# ============================================================
+# Client HTTP de l'API pour les pages Streamlit
+# Streamlit réexécute tout le script à chaque interaction
+# (clic, curseur déplacé...) : sans précaution, chaque
+# réexécution ouvre une nouvelle connexion TCP et rappelle l'API.
+# Ce fichier garde :
+#   - une session HTTP (connexions keep-alive) par serveur, partagée
+#     par tous les utilisateurs du dashboard (st.cache_resource)
+#   - l'état de l'API en cache quelques secondes (st.cache_data + ttl)
+#   - les prédictions déjà demandées (st.cache_data)
+# Plusieurs lignes partent en un seul appel (predict_batch, predict_grid,
+# score_csv_chunk) ; quand une page a plusieurs appels indépendants à faire,
+# le client asynchrone (httpx.AsyncClient) les lance en même temps
+# (score_csv_chunks, utilisé par la page de scoring de fichier).
+# La session et les délais servent aussi au client de l'API Iris
+# (VersionNrt_0.0.1/api_client.py).
+# ============================================================
+
+import asyncio
+import csv
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+# Adresse de l'API FastAPI (lancée avec : py -m uvicorn app.main:app depuis VersionNrt_0.0.2/)
+API_BASE_URL = "http://127.0.0.1:8000"
+
+# Délais maximum (en secondes) : (établissement de la connexion, attente de la réponse)
+TIMEOUT = (3.05, 10)
+HEALTH_TIMEOUT = (1, 2)
+
+# Durée de validité (en secondes) de l'état de l'API gardé en cache
+HEALTH_TTL = 5
+
+# Durée de validité et nombre maximal de prédictions gardées en cache
+# (le TTL borne le temps pendant lequel un ancien modèle peut encore répondre après un rechargement)
+PREDICTION_TTL = 600
+PREDICTION_CACHE_ENTRIES = 10_000
+
+# Nombre maximal de connexions gardées ouvertes vers un serveur
+POOL_SIZE = 10
+
+# Délai de réponse pour un bloc du scoring de fichier (plusieurs dizaines de milliers de lignes)
+SCORING_TIMEOUT = (3.05, 120)
+
+
+@st.cache_resource(show_spinner=False)
+def get_session(base_url=API_BASE_URL):
+    """
+    Retourne la session HTTP partagée pour ce serveur.
+
+    st.cache_resource crée la session une seule fois (par valeur de base_url)
+    et la partage entre toutes les réexécutions et tous les utilisateurs :
+    les connexions TCP restent ouvertes d'un appel à l'autre.
+
+    Args:
+        base_url (str): L'adresse du serveur
+
+    Returns:
+        requests.Session: La session avec son pool de connexions
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_data(ttl=HEALTH_TTL, show_spinner=False)
+def api_is_ready(base_url=API_BASE_URL):
+    """
+    Indique si l'API est prête (GET /health/ready), avec un résultat gardé HEALTH_TTL secondes.
+
+    Returns:
+        bool: True si l'API répond 200
+    """
+    try:
+        return get_session(base_url).get(f"{base_url}/health/ready", timeout=HEALTH_TIMEOUT).status_code == 200
+    except requests.RequestException:
+        return False
+
+
+@st.cache_data(ttl=PREDICTION_TTL, max_entries=PREDICTION_CACHE_ENTRIES, show_spinner=False)
+def predict(gender, age, estimated_salary, base_url=API_BASE_URL):
+    """
+    Demande une prédiction à POST /ml/predict.
+
+    Le résultat est mémorisé pour ces valeurs exactes : revenir sur une saisie déjà
+    faite ne rappelle pas l'API. Une erreur n'est jamais mise en cache.
+
+    Args:
+        gender (int): 0 (Homme) ou 1 (Femme)
+        age (int): L'âge
+        estimated_salary (int): Le salaire estimé
+
+    Returns:
+        dict: {"prediction": 0 ou 1, "probability": float}
+
+    Raises:
+        requests.RequestException: Si l'API est injoignable ou répond une erreur (response.status_code)
+    """
+    response = get_session(base_url).post(
+        f"{base_url}/ml/predict",
+        json={"gender": gender, "age": age, "estimated_salary": estimated_salary},
+        timeout=TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+@st.cache_data(ttl=PREDICTION_TTL, max_entries=100, show_spinner=False)
+def predict_batch(rows, base_url=API_BASE_URL):
+    """
+    Demande les prédictions d'un lot en un seul appel à POST /ml/predict/batch.
+
+    Args:
+        rows (tuple): Tuple de (gender, age, estimated_salary) (un tuple pour servir de clé de cache)
+
+    Returns:
+        dict: {"predictions": [...], "probabilities": [...]}, dans l'ordre des lignes
+    """
+    instances = [{"gender": g, "age": a, "estimated_salary": s} for g, a, s in rows]
+    response = get_session(base_url).post(
+        f"{base_url}/ml/predict/batch", json={"instances": instances}, timeout=TIMEOUT
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+@st.cache_data(ttl=PREDICTION_TTL, max_entries=20, show_spinner=False)
+def predict_grid(age_step=1, salary_step=1000, base_url=API_BASE_URL):
+    """
+    Demande toute la grille âge x salaire de probabilités, pour chaque genre, en un seul appel
+    (GET /ml/predict/grid).
+
+    La grille est gardée en cache : changer le point sélectionné sur la page ne rappelle pas l'API.
+
+    Args:
+        age_step (int): Pas de la grille des âges
+        salary_step (int): Pas de la grille des salaires
+
+    Returns:
+        dict: Le contenu de GridPredictionResponse (axes, predictions, probabilities)
+    """
+    response = get_session(base_url).get(
+        f"{base_url}/ml/predict/grid",
+        params={"age_step": age_step, "salary_step": salary_step},
+        timeout=TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def score_csv_chunk(header, lines, base_url=API_BASE_URL):
+    """
+    Évalue un bloc de lignes CSV avec POST /ml/predict/stream (non mis en cache : les blocs sont gros).
+
+    Args:
+        header (bytes): La ligne d'en-tête du fichier (User ID, Gender, Age, EstimatedSalary)
+        lines (list): Les lignes de données du bloc (bytes, sans retour à la ligne ni ligne vide)
+
+    Returns:
+        list: Une liste [User ID, prediction, probability, error] par ligne, dans l'ordre des lignes
+
+    Raises:
+        ValueError: Si l'API n'a pas pu lire le bloc (en-tête invalide)
+        requests.RequestException: Si l'API est injoignable ou répond une erreur
+    """
+    response = get_session(base_url).post(
+        f"{base_url}/ml/predict/stream", data=_chunk_body(header, lines), headers={"Content-Type": "text/csv"},
+        timeout=SCORING_TIMEOUT
+    )
+    response.raise_for_status()
+    return _chunk_rows(response.text, lines)
+
+
+def _chunk_body(header, lines):
+    """Corps CSV d'un bloc : l'en-tête du fichier puis les lignes du bloc."""
+    return b"\n".join([header, *lines]) + b"\n"
+
+
+def _chunk_rows(text, lines):
+    """Lit la réponse CSV de POST /ml/predict/stream : une ligne de résultat par ligne envoyée."""
+    # La première ligne de la réponse est son propre en-tête (User ID, prediction, probability, error)
+    rows = list(csv.reader(io.StringIO(text)))[1:]
+    if len(rows) != len(lines):
+        raise ValueError(rows[0][-1] if rows else "réponse vide de l'API")
+    return rows
+
+
+# ============================================================
+# Client asynchrone : plusieurs appels en même temps
+# ============================================================
+
+def run_async(coroutine):
+    """
+    Exécute une coroutine jusqu'au bout depuis du code synchrone (script Streamlit).
+
+    Le script Streamlit tourne normalement dans un thread sans boucle asyncio : asyncio.run
+    en crée une. Si une boucle tourne déjà dans ce thread, asyncio.run échouerait :
+    la coroutine est alors exécutée dans un thread à part, avec sa propre boucle.
+
+    Returns:
+        Le résultat de la coroutine
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coroutine).result()
+
+
+async def score_csv_chunks_async(header, chunks, base_url=API_BASE_URL):
+    """
+    Évalue plusieurs blocs de lignes CSV en même temps, avec un client httpx asynchrone.
+
+    Args:
+        header (bytes): La ligne d'en-tête du fichier
+        chunks (list): Les blocs de lignes (chaque bloc comme pour score_csv_chunk)
+
+    Returns:
+        list: Les résultats de chaque bloc (comme score_csv_chunk), dans l'ordre des blocs
+
+    Raises:
+        ValueError: Si l'API n'a pas pu lire un bloc
+        httpx.HTTPError: Si l'API est injoignable ou répond une erreur
+    """
+    async def score(client, lines):
+        response = await client.post(
+            "/ml/predict/stream", content=_chunk_body(header, lines), headers={"Content-Type": "text/csv"}
+        )
+        response.raise_for_status()
+        return _chunk_rows(response.text, lines)
+
+    timeout = httpx.Timeout(SCORING_TIMEOUT[1], connect=SCORING_TIMEOUT[0])
+    limits = httpx.Limits(max_connections=POOL_SIZE)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        return await asyncio.gather(*(score(client, lines) for lines in chunks))
+
+
+def score_csv_chunks(header, chunks, base_url=API_BASE_URL):
+    """Version synchrone de score_csv_chunks_async, appelable depuis une page Streamlit."""
+    return run_async(score_csv_chunks_async(header, chunks, base_url))
@@ -11,6 +11,10 @@ import streamlit as st
 # Importation de requests : la bibliothèque pour envoyer des requêtes HTTP à notre API
 import requests
 
+# Importation du client de l'API (api_client.py, dans ce dossier) :
+# session HTTP partagée, état de l'API et prédictions gardés en cache
+from api_client import api_is_ready, predict
+
 # --- CONFIGURATION DE LA PAGE ---
 # st.set_page_config() configure les paramètres de la page du navigateur
 # Doit être appelé en PREMIER avant tout autre appel Streamlit
@@ -20,11 +24,6 @@ st.set_page_config(
     layout="centered"                  # Disposition centrée de la page (pas en pleine largeur)
 )
 
-# --- URL DE L'API ---
-# L'adresse de notre API FastAPI qui tourne en local sur le port 8000
-# /ml/predict est l'endpoint POST défini dans route.py
-API_URL = "http://127.0.0.1:8000/ml/predict"
-
 # --- TITRE DE L'APPLICATION ---
 # st.title() affiche un grand titre en haut de la page
 st.title("🛒 Prédiction d'Achat")
@@ -32,6 +31,12 @@ st.title("🛒 Prédiction d'Achat")
 # st.write() affiche du texte dans l'application
 st.write("Entrez les informations d'un utilisateur pour prédire s'il va acheter le produit.")
 
+# --- ÉTAT DE L'API ---
+# api_is_ready() interroge GET /health/ready au plus une fois toutes les quelques secondes :
+# déplacer un curseur ne rappelle pas l'API juste pour savoir si elle est en marche
+if not api_is_ready():
+    st.warning("⏳ L'API n'est pas encore prête (ou n'est pas lancée) : py -m uvicorn app.main:app")
+
 # st.markdown("---") crée une ligne horizontale de séparation visuelle
 st.markdown("---")
 
@@ -80,67 +85,52 @@ st.markdown("---")
 # use_container_width=True fait que le bouton prend toute la largeur disponible
 if st.button("🔮 Prédire", use_container_width=True):
 
-    # --- PRÉPARATION DES DONNÉES ---
-    # On crée un dictionnaire Python avec les données saisies par l'utilisateur
-    # Les clés ("gender", "age", "estimated_salary") doivent correspondre exactement
-    # aux champs du schéma InputData défini dans schema.py
-    payload = {
-        "gender": gender,                       # 0 (Homme) ou 1 (Femme)
-        "age": age,                             # L'âge choisi avec le slider
-        "estimated_salary": estimated_salary    # Le salaire entré dans le champ numérique
-    }
-
     # --- ENVOI DE LA REQUÊTE À L'API ---
-    # On utilise try/except pour gérer les erreurs possibles (API éteinte, réseau, etc.)
+    # On utilise try/except pour gérer les erreurs possibles (API éteinte, réseau, délai dépassé, etc.)
     try:
-        # requests.post() envoie une requête HTTP POST à l'URL de notre API
-        # json=payload convertit automatiquement le dictionnaire Python en JSON
-        # C'est exactement comme si on envoyait depuis Swagger UI ou Postman
-        response = requests.post(API_URL, json=payload)
-
-        # --- TRAITEMENT DE LA RÉPONSE ---
-        # response.status_code contient le code HTTP retourné par l'API
-        # 200 signifie que la requête a réussi (OK)
-        if response.status_code == 200:
-
-            # response.json() convertit la réponse JSON en dictionnaire Python
-            # Le dictionnaire contient "prediction" et "probability" (définis dans PredictionResponse)
-            result = response.json()
-
-            # On extrait la prédiction (0 ou 1) du dictionnaire de réponse
-            prediction = result["prediction"]
-
-            # On extrait la probabilité (entre 0.0 et 1.0) du dictionnaire de réponse
-            probability = result["probability"]
-
-            # --- AFFICHAGE DU RÉSULTAT ---
-            st.markdown("---")
-
-            # st.subheader() affiche un sous-titre pour la section résultats
-            st.subheader("📊 Résultat de la prédiction")
-
-            # On affiche un message différent selon la prédiction du modèle
-            if prediction == 1:
-                # st.success() affiche un message en vert (succès/positif)
-                # Le modèle prédit que la personne VA acheter le produit
-                st.success(f"✅ Cette personne VA probablement acheter le produit !")
-            else:
-                # st.warning() affiche un message en orange (avertissement)
-                # Le modèle prédit que la personne NE VA PAS acheter le produit
-                st.warning(f"❌ Cette personne NE VA probablement PAS acheter le produit.")
-
-            # st.metric() affiche une métrique avec un label et une valeur
-            # On affiche la probabilité d'achat en pourcentage (ex: 87.50%)
-            # f"{probability * 100:.2f}%" multiplie par 100 et formate avec 2 décimales
-            st.metric(
-                label="Probabilité d'achat",          # Le label affiché au-dessus de la valeur
-                value=f"{probability * 100:.2f} %"     # La valeur formatée en pourcentage
-            )
+        # predict() envoie POST /ml/predict avec la session partagée (connexion déjà ouverte)
+        # et un délai maximum ; les mêmes valeurs déjà demandées sont servies depuis le cache
+        # Le dictionnaire retourné contient "prediction" et "probability" (définis dans PredictionResponse)
+        result = predict(gender, age, estimated_salary)
+
+        # On extrait la prédiction (0 ou 1) du dictionnaire de réponse
+        prediction = result["prediction"]
+
+        # On extrait la probabilité (entre 0.0 et 1.0) du dictionnaire de réponse
+        probability = result["probability"]
+
+        # --- AFFICHAGE DU RÉSULTAT ---
+        st.markdown("---")
+
+        # st.subheader() affiche un sous-titre pour la section résultats
+        st.subheader("📊 Résultat de la prédiction")
 
+        # On affiche un message différent selon la prédiction du modèle
+        if prediction == 1:
+            # st.success() affiche un message en vert (succès/positif)
+            # Le modèle prédit que la personne VA acheter le produit
+            st.success(f"✅ Cette personne VA probablement acheter le produit !")
         else:
-            # Si le code HTTP n'est pas 200, il y a eu une erreur côté API
-            # st.error() affiche un message en rouge (erreur)
-            st.error(f"❌ Erreur API — Code : {response.status_code}")
+            # st.warning() affiche un message en orange (avertissement)
+            # Le modèle prédit que la personne NE VA PAS acheter le produit
+            st.warning(f"❌ Cette personne NE VA probablement PAS acheter le produit.")
+
+        # st.metric() affiche une métrique avec un label et une valeur
+        # On affiche la probabilité d'achat en pourcentage (ex: 87.50%)
+        # f"{probability * 100:.2f}%" multiplie par 100 et formate avec 2 décimales
+        st.metric(
+            label="Probabilité d'achat",          # Le label affiché au-dessus de la valeur
+            value=f"{probability * 100:.2f} %"     # La valeur formatée en pourcentage
+        )
+
+    # Si l'API répond avec un code d'erreur (422, 500...), raise_for_status() lève une HTTPError
+    except requests.exceptions.HTTPError as error:
+        # st.error() affiche un message en rouge (erreur)
+        st.error(f"❌ Erreur API — Code : {error.response.status_code}")
+
+    # Si l'API ne répond pas dans le délai maximum (TIMEOUT dans api_client.py)
+    except requests.exceptions.Timeout:
+        st.error("⌛ L'API met trop de temps à répondre, réessayez dans un instant.")
 
     # except requests.exceptions.ConnectionError gère le cas où l'API n'est pas accessible
     # Cela arrive si le serveur FastAPI n'est pas lancé ou si l'URL est incorrecte
@@ -0,0 +1,86 @@
+# ============================================================
+# Page "Et si... ?" — Carte de probabilité d'achat
+# Cette page affiche la probabilité d'achat sur toute la grille
+# âge x salaire, pour chaque genre, avec la frontière de décision
+# (probabilité = 0.5) et le point choisi par l'utilisateur.
+#
+# Toute la grille est demandée en UN seul appel (GET /ml/predict/grid)
+# et gardée en cache : déplacer le point ne fait que redessiner le graphique.
+# ============================================================
+
+import matplotlib
+
+# Backend sans fenêtre : le graphique est seulement rendu en image pour Streamlit
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import requests
+import streamlit as st
+
+from api_client import predict_grid
+
+st.set_page_config(page_title="Et si... ?", page_icon="🔍", layout="wide")
+
+st.title("🔍 Et si... ?")
+st.write(
+    "Probabilité d'achat pour chaque âge et chaque salaire. La ligne noire est la frontière de décision : "
+    "au-dessus de 50 %, le modèle prédit un achat."
+)
+
+# --- POINT SÉLECTIONNÉ ---
+st.sidebar.subheader("📍 Point sélectionné")
+gender_label = st.sidebar.radio("Genre :", options=["Homme", "Femme"], horizontal=True)
+gender = 0 if gender_label == "Homme" else 1
+age = st.sidebar.slider("Âge :", min_value=18, max_value=60, value=30)
+estimated_salary = st.sidebar.slider("Salaire estimé (€) :", min_value=0, max_value=150000, value=50000, step=1000)
+
+# --- RÉSOLUTION DE LA GRILLE ---
+# Un pas plus petit donne une carte plus fine, mais une réponse plus lourde
+salary_step = st.sidebar.select_slider("Pas des salaires (€) :", options=[500, 1000, 2500, 5000], value=1000)
+
+try:
+    grid = predict_grid(age_step=1, salary_step=salary_step)
+except requests.exceptions.RequestException as error:
+    st.error(f"🚫 Impossible d'obtenir la grille depuis l'API : {error}")
+    st.stop()
+
+ages = np.array(grid["ages"])
+salaries = np.array(grid["salaries"])
+# Forme (genres, âges, salaires)
+probabilities = np.array(grid["probabilities"])
+
+# Le point de la grille le plus proche de la sélection
+age_index = int(np.abs(ages - age).argmin())
+salary_index = int(np.abs(salaries - estimated_salary).argmin())
+probability = probabilities[gender, age_index, salary_index]
+
+col1, col2 = st.columns(2)
+col1.metric("Probabilité d'achat (point le plus proche de la grille)", f"{probability * 100:.2f} %")
+col2.metric("Prédiction", "Achète ✅" if probability >= 0.5 else "N'achète pas ❌")
+
+# --- CARTES DE PROBABILITÉ ---
+# extent place les cellules sur les vraies valeurs des axes (salaire en x, âge en y)
+extent = [salaries[0], salaries[-1], ages[0], ages[-1]]
+fig, axes = plt.subplots(1, 2, figsize=(13, 5), sharey=True, constrained_layout=True)
+for index, (ax, label) in enumerate(zip(axes, ["Homme", "Femme"])):
+    image = ax.imshow(
+        probabilities[index], origin="lower", aspect="auto", extent=extent,
+        cmap="RdYlGn", vmin=0.0, vmax=1.0, interpolation="nearest",
+    )
+    # Frontière de décision : la courbe où la probabilité vaut 0.5
+    ax.contour(salaries, ages, probabilities[index], levels=[0.5], colors="black", linewidths=2)
+    if index == gender:
+        ax.scatter([salaries[salary_index]], [ages[age_index]], s=160, c="white", edgecolors="black", zorder=3)
+    ax.set_title(f"{label}{' (sélection)' if index == gender else ''}")
+    ax.set_xlabel("Salaire estimé (€)")
+axes[0].set_ylabel("Âge")
+fig.colorbar(image, ax=axes, label="Probabilité d'achat")
+
+st.pyplot(fig)
+plt.close(fig)
+
+st.caption(
+    f"Modèle {grid['model_version']} ({grid['model_sha']}) — grille de {probabilities.size:,} points "
+    "calculée en un seul appel et gardée en cache."
+)
@@ -0,0 +1,197 @@
+# ============================================================
+# Page "Scoring de fichier" — Évaluer toute une liste de clients
+# L'utilisateur envoie un CSV au format Social_Network_Ads.csv
+# (User ID, Gender, Age, EstimatedSalary) et récupère le même
+# fichier avec trois colonnes en plus : prediction, probability, error.
+#
+# Le fichier est envoyé à l'API par blocs de lignes (POST /ml/predict/stream),
+# plusieurs blocs en même temps (client asynchrone de api_client.py),
+# et chaque bloc évalué est écrit directement dans un fichier temporaire :
+# le résultat complet n'est jamais gardé en mémoire, même pour un fichier
+# de plusieurs centaines de Mo.
+# ============================================================
+
+import csv
+import io
+import os
+import tempfile
+import time
+from itertools import islice
+
+import httpx
+import requests
+import streamlit as st
+
+from api_client import score_csv_chunk, score_csv_chunks
+
+st.set_page_config(page_title="Scoring de fichier", page_icon="📂", layout="centered")
+
+st.title("📂 Scoring de fichier")
+st.write(
+    "Envoyez une liste de clients au format **Social_Network_Ads.csv** (User ID, Gender, Age, EstimatedSalary) "
+    "pour obtenir la prédiction et la probabilité d'achat de chaque ligne."
+)
+
+SCORE_COLUMNS = ["prediction", "probability", "error"]
+
+
+def iter_chunks(file, chunk_rows):
+    """
+    Lit le fichier ligne par ligne et regroupe les lignes par blocs de chunk_rows.
+
+    Les lignes vides sont ignorées (comme le fait l'API) pour que chaque ligne
+    envoyée corresponde exactement à une ligne de résultat.
+    """
+    lines = []
+    for raw in file:
+        line = raw.rstrip(b"\r\n")
+        if not line.strip():
+            continue
+        lines.append(line)
+        if len(lines) >= chunk_rows:
+            yield lines
+            lines = []
+    if lines:
+        yield lines
+
+
+def iter_groups(chunks, size):
+    """Regroupe les blocs par `size` : les blocs d'un groupe sont envoyés à l'API en même temps."""
+    chunks = iter(chunks)
+    while group := list(islice(chunks, size)):
+        yield group
+
+
+def score_file(uploaded, chunk_rows, output_path, on_progress, parallel=1):
+    """
+    Évalue le fichier bloc par bloc et écrit chaque ligne d'origine suivie de ses scores.
+
+    Args:
+        uploaded: Le fichier envoyé (st.file_uploader)
+        chunk_rows (int): Nombre de lignes par appel à l'API
+        output_path (str): Le fichier CSV de résultat
+        on_progress (callable): Appelée après chaque bloc avec (fraction lue, lignes, lignes en erreur, secondes)
+        parallel (int): Nombre de blocs envoyés en même temps (au plus parallel blocs en mémoire)
+
+    Returns:
+        tuple: (lignes évaluées, lignes en erreur, colonnes du fichier de résultat)
+    """
+    uploaded.seek(0)
+    # "utf-8-sig" retire l'éventuel BOM ajouté par Excel
+    header_text = uploaded.readline().decode("utf-8-sig").rstrip("\r\n")
+    header = header_text.encode()
+    columns = next(csv.reader([header_text])) + SCORE_COLUMNS
+
+    rows = errors = 0
+    start = time.perf_counter()
+    with open(output_path, "w", encoding="utf-8", newline="") as output:
+        output.write(header_text + "," + ",".join(SCORE_COLUMNS) + "\n")
+        for group in iter_groups(iter_chunks(uploaded, chunk_rows), parallel):
+            if len(group) == 1:
+                group_results = [score_csv_chunk(header, group[0])]
+            else:
+                group_results = score_csv_chunks(header, group)
+
+            for lines, results in zip(group, group_results):
+                # Le bloc formaté est écrit d'un coup, puis libéré avant de lire le bloc suivant
+                block = io.StringIO()
+                writer = csv.writer(block, lineterminator="\n")
+                for line, (_, prediction, probability, error) in zip(lines, results):
+                    # L'API numérote les lignes à l'intérieur du bloc ("ligne 12 : ...") : ce numéro ne
+                    # correspond pas à la ligne du fichier, et l'erreur est de toute façon sur sa propre ligne
+                    if error.startswith("ligne "):
+                        error = error.split(" : ", 1)[-1]
+                    block.write(line.decode("utf-8", errors="replace") + ",")
+                    writer.writerow([prediction, probability, error])
+                    errors += bool(error)
+                output.write(block.getvalue())
+                rows += len(lines)
+            on_progress(uploaded.tell() / uploaded.size, rows, errors, time.perf_counter() - start)
+    return rows, errors, columns
+
+
+def csv_to_parquet(csv_path, parquet_path, columns):
+    """
+    Convertit le CSV de résultat en Parquet, bloc par bloc (pyarrow).
+
+    Les colonnes d'origine restent du texte (le fichier peut contenir des valeurs invalides) ;
+    les colonnes de scores sont typées.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    column_types = {name: pa.string() for name in columns}
+    column_types.update({"prediction": pa.int8(), "probability": pa.float64(), "error": pa.string()})
+    reader = pa_csv.open_csv(csv_path, convert_options=pa_csv.ConvertOptions(column_types=column_types))
+    with pq.ParquetWriter(parquet_path, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+
+
+# --- PARAMÈTRES ---
+uploaded = st.file_uploader("Fichier CSV :", type=["csv"])
+output_format = st.radio("Format du fichier résultat :", options=["CSV", "Parquet"], horizontal=True)
+chunk_rows = st.select_slider(
+    "Lignes par envoi à l'API :", options=[5_000, 20_000, 50_000, 100_000], value=50_000
+)
+parallel = st.select_slider("Envois simultanés :", options=[1, 2, 4, 8], value=4)
+
+# Le résultat est gardé dans st.session_state : cliquer sur "Télécharger" relance le script
+# mais ne relance pas le scoring
+result = st.session_state.get("bulk_result")
+
+if uploaded is not None and st.button("🚀 Lancer le scoring", use_container_width=True):
+    # On supprime le fichier du scoring précédent
+    if result is not None and os.path.exists(result["path"]):
+        os.remove(result["path"])
+    st.session_state.pop("bulk_result", None)
+
+    progress_bar = st.progress(0.0, text="Envoi du fichier...")
+    stats = st.empty()
+
+    def on_progress(fraction, rows, errors, seconds):
+        progress_bar.progress(min(fraction, 1.0), text=f"{fraction:.0%} du fichier évalué")
+        stats.markdown(
+            f"**{rows:,}** lignes évaluées — **{rows / max(seconds, 1e-9):,.0f}** lignes/s — "
+            f"{errors:,} ligne(s) en erreur"
+        )
+
+    csv_path = tempfile.NamedTemporaryFile(prefix="scores-", suffix=".csv", delete=False).name
+    try:
+        start = time.perf_counter()
+        rows, errors, columns = score_file(uploaded, chunk_rows, csv_path, on_progress, parallel)
+        path = csv_path
+        if output_format == "Parquet":
+            progress_bar.progress(1.0, text="Conversion en Parquet...")
+            path = csv_path[:-len(".csv")] + ".parquet"
+            csv_to_parquet(csv_path, path, columns[:-len(SCORE_COLUMNS)])
+            os.remove(csv_path)
+        progress_bar.progress(1.0, text="Terminé")
+        result = st.session_state["bulk_result"] = {
+            "path": path,
+            "name": os.path.splitext(uploaded.name)[0] + "_scores." + output_format.lower(),
+            "format": output_format,
+            "rows": rows,
+            "errors": errors,
+            "seconds": time.perf_counter() - start,
+        }
+    except (requests.exceptions.RequestException, httpx.HTTPError, ValueError) as error:
+        os.remove(csv_path)
+        result = None
+        st.error(f"❌ Le scoring a échoué : {error}")
+
+# --- TÉLÉCHARGEMENT ---
+if result is not None and os.path.exists(result["path"]):
+    st.success(
+        f"✅ {result['rows']:,} lignes évaluées en {result['seconds']:.1f} s "
+        f"({result['rows'] / max(result['seconds'], 1e-9):,.0f} lignes/s), {result['errors']:,} en erreur."
+    )
+    with open(result["path"], "rb") as file:
+        st.download_button(
+            f"⬇️ Télécharger le résultat ({result['format']})",
+            data=file,
+            file_name=result["name"],
+            mime="text/csv" if result["format"] == "CSV" else "application/vnd.apache.parquet",
+            use_container_width=True,
+        )
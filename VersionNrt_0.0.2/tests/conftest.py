@@ -0,0 +1,34 @@
+# ============================================================
+# Configuration commune des tests (pytest)
+# Les tests importent le paquet app comme l'API elle-même :
+# VersionNrt_0.0.2/ est ajouté au chemin d'import, quel que soit
+# le dossier depuis lequel pytest est lancé.
+# ============================================================
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture(scope="session")
+def model():
+    """Le pipeline scikit-learn de référence (app/models/model.joblib)."""
+    from app.models.load_model import get_model
+
+    return get_model()
+
+
+@pytest.fixture(scope="session")
+def data_matrix():
+    """Toutes les lignes de Social_Network_Ads.csv, encodées comme dans le notebook (matrice (400, 3))."""
+    import pandas as pd
+
+    from app.config.config import DATA_PATH
+    from app.services.scoring import frame_features
+
+    features, errors = frame_features(pd.read_csv(DATA_PATH))
+    assert all(error is None for error in errors)
+    return features
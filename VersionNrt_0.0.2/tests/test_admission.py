@@ -0,0 +1,150 @@
+# ============================================================
+# Contrôle d'admission : file par priorité, éviction, Retry-After
+# et échéance du client (504)
+# ============================================================
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.services.admission import AdmissionController, AdmissionMiddleware, Rejected
+
+
+def make_controller(**options):
+    settings = {"enabled": True, "max_concurrent": 1, "queue_size": 2, "queue_timeout_ms": 1_000,
+                "routes": [("/ml/*", 1)], **options}
+    return AdmissionController(**settings)
+
+
+async def queue(controller, priority, deadline=None):
+    """Met une requête dans la file et laisse la boucle l'y installer."""
+    task = asyncio.create_task(controller.acquire(priority, deadline))
+    await asyncio.sleep(0)
+    return task
+
+
+def test_release_serves_the_highest_priority_then_the_oldest():
+    async def scenario():
+        controller = make_controller(queue_size=3)
+        await controller.acquire(1)
+        first_low, high, second_low = [await queue(controller, priority) for priority in (1, 5, 1)]
+        assert controller.queued == 3
+
+        names = {first_low: "first_low", high: "high", second_low: "second_low"}
+        order, pending = [], set(names)
+        while pending:
+            # Chaque place rendue passe à une seule requête de la file
+            controller.release(0.01)
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            order.extend(names[task] for task in done)
+        controller.release(0.01)
+        return order, controller.in_flight, controller.queued
+
+    assert asyncio.run(scenario()) == (["high", "first_low", "second_low"], 0, 0)
+
+
+def test_full_queue_evicts_the_newest_lower_priority_request():
+    async def scenario():
+        controller = make_controller()
+        await controller.acquire(1)
+        old_low, new_low = await queue(controller, 1), await queue(controller, 1)
+        high = await queue(controller, 5)
+        await asyncio.sleep(0)
+
+        with pytest.raises(Rejected) as evicted:
+            await new_low
+        assert (evicted.value.status, evicted.value.reason) == (503, "evicted")
+        assert evicted.value.retry_after >= 1
+        assert not old_low.done()
+
+        # Même priorité que la plus basse de la file : rien à évincer, refus immédiat
+        with pytest.raises(Rejected) as full:
+            await controller.acquire(1)
+        assert full.value.reason == "queue_full"
+
+        controller.release(0.01)
+        await high
+        assert not old_low.done()
+        old_low.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_retry_after_is_the_time_to_drain_the_queue():
+    controller = make_controller(max_concurrent=2)
+    assert controller.retry_after() == 1
+    controller.queued, controller.service_seconds = 6, 0.5
+    # 6 requêtes de 0,5 s sur 2 places : 1,5 s, arrondi au-dessus
+    assert controller.retry_after() == 2
+
+
+def test_expired_deadline_is_a_504_before_and_while_waiting():
+    async def scenario():
+        controller = make_controller(queue_timeout_ms=5_000)
+        with pytest.raises(Rejected) as expired:
+            await controller.acquire(1, deadline=time.time() - 1)
+        assert expired.value.status == 504
+        assert controller.in_flight == 0
+
+        await controller.acquire(1)
+        start = time.perf_counter()
+        with pytest.raises(Rejected) as during:
+            await controller.acquire(1, deadline=time.time() + 0.05)
+        # L'attente s'arrête à l'échéance du client, pas à queue_timeout
+        assert during.value.status == 504 and time.perf_counter() - start < 1
+        assert controller.queued == 0
+
+    asyncio.run(scenario())
+
+
+def test_release_skips_requests_whose_deadline_passed_in_the_queue():
+    async def scenario():
+        controller = make_controller(queue_timeout_ms=5_000)
+        await controller.acquire(1)
+        # L'échéance tombe pendant l'attente mais la place est rendue avant que asyncio.wait expire
+        expiring = await queue(controller, 5, deadline=time.time() + 0.2)
+        waiting = await queue(controller, 1)
+        expiring_waiter = next(waiter for _, _, waiter in controller._heap if waiter.priority == 5)
+        expiring_waiter.deadline = time.time() - 1
+        controller.release(0.01)
+        with pytest.raises(Rejected) as expired:
+            await expiring
+        assert expired.value.status == 504
+        await waiting
+        assert controller.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+def test_middleware_sends_retry_after_and_504():
+    async def app(scope, receive, send):
+        await asyncio.sleep(0.2)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def call(middleware, headers=()):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "path": "/ml/predict", "headers": list(headers)}
+        await middleware(scope, None, send)
+        start = messages[0]
+        return start["status"], dict(start["headers"]), json.loads(messages[1]["body"])
+
+    async def scenario():
+        controller = make_controller(queue_size=0)
+        middleware = AdmissionMiddleware(app, controller)
+        busy = asyncio.create_task(call(middleware))
+        await asyncio.sleep(0)
+        status, headers, body = await call(middleware)
+        assert status == 503 and headers[b"retry-after"] == b"1" and "detail" in body
+        assert (await busy)[0] == 200
+
+        status, headers, _ = await call(middleware, [(b"x-request-deadline", str(time.time() - 1).encode())])
+        assert status == 504 and b"retry-after" not in headers
+
+    asyncio.run(scenario())
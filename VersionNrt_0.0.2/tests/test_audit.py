@@ -0,0 +1,85 @@
+# ============================================================
+# Journal d'audit : tampon plein (politiques "drop" et "block")
+# et relecture des fichiers écrits
+# ============================================================
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services.audit import AuditLog, read_audit
+
+LOADED = SimpleNamespace(version="v1", sha="abc123")
+
+
+def make_log(tmp_path, **options):
+    # Le thread d'écriture ne vide le tampon que toutes les flush_seconds (ou à l'arrêt)
+    settings = {"directory": tmp_path, "capacity": 2, "flush_rows": 1_000, "flush_seconds": 60.0, **options}
+    log = AuditLog(enabled=True, **settings)
+    log.start()
+    return log
+
+
+def test_drop_policy_loses_rows_beyond_capacity(tmp_path):
+    log = make_log(tmp_path, policy="drop")
+
+    async def scenario():
+        for age in (30, 40, 50):
+            await log.record(LOADED, "predict", (1, age, 50_000), 0, 0.25)
+        await log.record_batch(LOADED, "batch", np.array([[0.0, 20.0, 10_000.0]]), np.array([1]), np.array([0.9]))
+
+    asyncio.run(scenario())
+    assert log.stats()["appended_rows"] == 2
+    assert log.stats()["dropped_rows"] == 2
+    log.close()
+    frame = read_audit(tmp_path)
+    assert frame["Age"].tolist() == [30, 40]
+    assert frame["Gender"].tolist() == ["Female", "Female"]
+
+
+def test_block_policy_waits_without_blocking_the_event_loop(tmp_path):
+    log = make_log(tmp_path, policy="block", block_timeout_ms=5_000, flush_seconds=0.3)
+
+    async def scenario():
+        await log.record(LOADED, "predict", (1, 30, 50_000), 0, 0.25)
+        await log.record(LOADED, "predict", (1, 40, 50_000), 0, 0.25)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        # Tampon plein : attend que le thread d'écriture le vide (flush_seconds)
+        await log.record(LOADED, "predict", (0, 50, 50_000), 1, 0.75)
+        waited = time.perf_counter() - start
+        task.cancel()
+        return ticks, waited
+
+    ticks, waited = asyncio.run(scenario())
+    stats = log.stats()
+    assert stats["blocked_calls"] == 1
+    assert stats["appended_rows"] == 3 and stats["dropped_rows"] == 0
+    # La boucle a continué de tourner pendant l'attente
+    assert waited > 0.05 and ticks >= 3
+    log.close()
+    assert read_audit(tmp_path)["Age"].tolist() == [30, 40, 50]
+
+
+def test_block_policy_drops_after_the_timeout(tmp_path):
+    log = make_log(tmp_path, policy="block", block_timeout_ms=50)
+
+    async def scenario():
+        for age in (30, 40, 50):
+            await log.record(LOADED, "predict", (1, age, 50_000), 0, 0.25)
+
+    asyncio.run(scenario())
+    stats = log.stats()
+    assert stats["blocked_calls"] == 1
+    assert stats["dropped_rows"] == 1
+    log.close()
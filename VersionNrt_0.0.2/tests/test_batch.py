@@ -0,0 +1,37 @@
+# ============================================================
+# Scoring de fichiers en ligne de commande (app/batch.py) :
+# blocs avec et sans lignes rejetées dans le même fichier Parquet
+# ============================================================
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.batch import score_file
+
+
+def test_parquet_accepts_chunks_with_and_without_rejected_rows(tmp_path):
+    n_rows = 800
+    frame = pd.DataFrame({
+        "User ID": range(15_000_000, 15_000_000 + n_rows),
+        "Gender": ["Male", "Female"] * (n_rows // 2),
+        "Age": [30] * n_rows,
+        "EstimatedSalary": [50_000] * n_rows,
+    })
+    # Lignes invalides dans le second bloc seulement : le premier n'a aucune erreur
+    frame.loc[[450, 799], "Age"] = 99
+    input_path = tmp_path / "entree.csv"
+    frame.to_csv(input_path, index=False)
+    output_path = str(tmp_path / "sortie.parquet")
+
+    report = score_file(str(input_path), output_path, workers=1, chunk_rows=400)
+
+    assert report["rows"] == n_rows and report["rejected"] == 2
+    table = pq.read_table(output_path)
+    assert table.schema.field("error").type == pa.string()
+    assert table.schema.field("prediction").type == pa.int8()
+    assert table.schema.field("User ID").type == pa.int64()
+    result = table.to_pandas()
+    assert result["User ID"].tolist() == frame["User ID"].tolist()
+    assert result["error"].notna().sum() == 2 and result.loc[450, "error"].startswith("age")
+    assert result["prediction"].isna().tolist() == result["error"].notna().tolist()
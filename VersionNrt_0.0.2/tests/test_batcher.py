@@ -0,0 +1,66 @@
+# ============================================================
+# Micro-batching : regroupement des lignes, tâches en cours et
+# histogramme micro_batch_size de GET /metrics
+# ============================================================
+
+import asyncio
+
+import numpy as np
+
+from app.services.batcher import MicroBatcher
+from app.services.metrics import metrics
+
+
+async def _score(input_array):
+    await asyncio.sleep(0)
+    return (input_array[:, 0] > 0).astype(int), input_array[:, 1] / 100
+
+
+def test_rows_are_batched_and_answered_in_order():
+    async def scenario():
+        batcher = MicroBatcher(_score, window_ms=5, max_batch_size=4, version="test-order")
+        rows = [(i % 2, 20 + i, 1000) for i in range(6)]
+        results = await asyncio.gather(*(batcher.submit(row) for row in rows))
+        # Toutes les tâches de lot sont terminées et plus référencées
+        assert not batcher._tasks
+        return batcher, results
+
+    batcher, results = asyncio.run(scenario())
+    assert results == [(i % 2, (20 + i) / 100) for i in range(6)]
+    # Un lot plein (4 lignes) puis le reste à la fin de la fenêtre
+    assert batcher.stats()["batch_size_distribution"] == {"2": 1, "4": 1}
+
+
+def test_batch_size_histogram_is_exported():
+    async def scenario():
+        batcher = MicroBatcher(_score, window_ms=1, max_batch_size=64, version="test-histogram")
+        await asyncio.gather(*(batcher.submit((0, 30, 1000)) for _ in range(3)))
+
+    asyncio.run(scenario())
+    text = metrics.render()
+    assert '# TYPE micro_batch_size histogram' in text
+    assert 'micro_batch_size_bucket{version="test-histogram",le="2"} 0' in text
+    assert 'micro_batch_size_bucket{version="test-histogram",le="4"} 1' in text
+    assert 'micro_batch_size_sum{version="test-histogram"} 3' in text
+
+
+def test_pending_batch_task_is_referenced():
+    async def scenario():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow(input_array):
+            started.set()
+            await release.wait()
+            return np.zeros(len(input_array), dtype=int), np.zeros(len(input_array))
+
+        batcher = MicroBatcher(slow, window_ms=1, max_batch_size=64, version="test-pending")
+        waiting = asyncio.ensure_future(batcher.submit((0, 30, 1000)))
+        await started.wait()
+        assert len(batcher._tasks) == 1
+        release.set()
+        assert await waiting == (0, 0.0)
+        await asyncio.sleep(0)
+        assert not batcher._tasks
+
+    asyncio.run(scenario())
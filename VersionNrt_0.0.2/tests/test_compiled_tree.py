@@ -0,0 +1,38 @@
+# ============================================================
+# Arbre compilé de l'API Iris (VersionNrt_0.0.1/compiled_tree.py) :
+# mêmes prédictions que scaler + model, et avertissement journalisé
+# quand iris_tree.npz ne correspond plus au modèle
+# ============================================================
+
+import importlib.util
+import logging
+from pathlib import Path
+
+import pytest
+
+V1_DIR = Path(__file__).resolve().parents[2] / "VersionNrt_0.0.1"
+
+
+@pytest.fixture(scope="module")
+def compiled_tree():
+    spec = importlib.util.spec_from_file_location("compiled_tree", V1_DIR / "compiled_tree.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_compiled_tree_matches_scaler_and_model(compiled_tree):
+    tree = compiled_tree.load_tree()
+    assert compiled_tree.verify(tree, rows=20_000) == 0
+
+
+def test_stale_tree_is_recompiled_with_a_logged_warning(compiled_tree, monkeypatch, caplog, capsys):
+    # Empreinte de model.joblib + scaler.joblib différente de celle gardée dans iris_tree.npz
+    monkeypatch.setattr(compiled_tree, "source_version", lambda *paths: "autre-modele")
+
+    with caplog.at_level(logging.WARNING, logger="compiled_tree"):
+        tree = compiled_tree.load_tree()
+
+    assert tree.version == "autre-modele"
+    assert "iris_tree.npz ne correspond plus à model.joblib" in caplog.text
+    assert capsys.readouterr().out == ""
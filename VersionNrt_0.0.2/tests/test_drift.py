@@ -0,0 +1,133 @@
+# ============================================================
+# Surveillance de la dérive : Welford et fusion des shards,
+# fusion des fichiers drift-<pid>.json des workers, PSI et KS
+# ============================================================
+
+import json
+import math
+import os
+import subprocess
+import sys
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.drift import DriftMonitor, DriftStats, default_channels, ks_statistic, psi
+
+LOADED = SimpleNamespace(version="v1")
+
+
+def random_rows(seed, n):
+    rng = np.random.default_rng(seed)
+    matrix = np.column_stack([rng.integers(0, 2, n), rng.integers(18, 70, n), rng.integers(15_000, 150_000, n)])
+    return matrix.astype(np.float64), rng.uniform(0, 1, n)
+
+
+def expected_stats(matrix, probabilities):
+    """Moyennes, variances et histogrammes calculés directement avec NumPy sur toutes les valeurs."""
+    columns = [matrix[:, 1], matrix[:, 2], probabilities]
+    histograms = [
+        np.bincount(np.clip(((column - low) * bins / (high - low)).astype(int), 0, bins - 1), minlength=bins).tolist()
+        for column, (_, low, high, bins) in zip(columns, default_channels())
+    ]
+    return [column.mean() for column in columns], [column.var() for column in columns], histograms
+
+
+def assert_matches(stats, matrix, probabilities):
+    means, variances, histograms = expected_stats(matrix, probabilities)
+    assert stats.rows == len(matrix)
+    assert stats.genders == np.bincount(matrix[:, 0].astype(int), minlength=2).tolist()
+    np.testing.assert_allclose(stats.means, means, rtol=1e-12)
+    np.testing.assert_allclose(np.array(stats.m2s) / stats.rows, variances, rtol=1e-9)
+    assert stats.histograms == histograms
+
+
+def test_rows_batches_and_threads_merge_to_the_exact_statistics():
+    matrix, probabilities = random_rows(0, 3_000)
+    monitor = DriftMonitor(enabled=True)
+
+    def observe(part):
+        # Une moitié ligne par ligne (Welford), l'autre en lot (formule de Chan)
+        rows, batch = part[: len(part) // 2], part[len(part) // 2:]
+        for i in rows:
+            # Comme predict_row : la ligne validée par InputData (des int)
+            monitor.observe(LOADED, tuple(int(value) for value in matrix[i]), float(probabilities[i]))
+        monitor.observe_batch(LOADED, matrix[batch], probabilities[batch])
+
+    threads = [threading.Thread(target=observe, args=(part,)) for part in np.array_split(np.arange(3_000), 4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(monitor._shards) == 4
+    assert_matches(monitor.local_stats()["v1"], matrix, probabilities)
+
+
+def test_snapshots_of_other_workers_are_merged(tmp_path):
+    matrix, probabilities = random_rows(1, 2_000)
+    local = DriftMonitor(enabled=True, directory=tmp_path)
+    local.observe_batch(LOADED, matrix[:500], probabilities[:500])
+
+    # Un autre worker vivant (le processus parent de pytest) et un worker arrêté
+    other = DriftStats(local.channels)
+    other.add_batch(matrix[500:], probabilities[500:])
+    snapshot = {"pid": os.getppid(), "updated_at": 0, "versions": {"v1": json.loads(json.dumps(other.to_dict()))}}
+    (tmp_path / f"drift-{os.getppid()}.json").write_text(json.dumps(snapshot))
+    dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    dead_path = tmp_path / f"drift-{int(dead.stdout)}.json"
+    dead_path.write_text(json.dumps({**snapshot, "pid": int(dead.stdout)}))
+
+    merged, workers = local.collect()
+    if os.name == "posix":
+        assert workers == 2
+        assert not dead_path.exists()
+        assert_matches(merged["v1"], matrix, probabilities)
+
+    # Le fichier de ce processus n'est pas compté deux fois
+    local.write_snapshot()
+    assert local.collect()[0]["v1"].rows == merged["v1"].rows
+
+
+def test_incompatible_histograms_are_not_merged():
+    stats = DriftStats(default_channels(10))
+    with pytest.raises(ValueError):
+        stats.merge(DriftStats(default_channels(20)))
+
+
+def test_psi_and_ks():
+    reference = [100, 200, 300, 400]
+    assert psi(reference, reference) == 0.0
+    assert ks_statistic(reference, reference) == 0.0
+    # Mêmes proportions, autre effectif : pas de dérive
+    assert psi([10, 20, 30, 40], reference) == pytest.approx(0.0)
+
+    actual = [400, 300, 200, 100]
+    p, q = np.array(actual) / 1000, np.array(reference) / 1000
+    assert psi(actual, reference) == pytest.approx(float(np.sum((p - q) * np.log(p / q))))
+    assert ks_statistic(actual, reference) == pytest.approx(0.4)
+    # Distributions disjointes : KS maximal, PSI fini grâce au plancher PSI_EPSILON
+    assert ks_statistic([10, 0, 0, 0], [0, 0, 0, 10]) == 1.0
+    assert math.isfinite(psi([10, 0, 0, 0], [0, 0, 0, 10]))
+
+
+def test_merged_snapshots_give_the_same_psi_as_one_stream():
+    matrix, probabilities = random_rows(2, 1_000)
+    whole = DriftStats(default_channels())
+    whole.add_batch(matrix, probabilities)
+    reference = DriftStats(default_channels())
+    reference.add_batch(*random_rows(3, 1_000))
+
+    parts = DriftStats(default_channels())
+    for chunk in np.array_split(np.arange(1_000), 3):
+        part = DriftStats(default_channels())
+        part.add_batch(matrix[chunk], probabilities[chunk])
+        parts.merge(DriftStats.from_dict(json.loads(json.dumps(part.to_dict()))))
+
+    for i in range(len(whole.channels)):
+        assert psi(parts.histograms[i], reference.histograms[i]) == psi(whole.histograms[i], reference.histograms[i])
+        assert ks_statistic(parts.histograms[i], reference.histograms[i]) == ks_statistic(
+            whole.histograms[i], reference.histograms[i]
+        )
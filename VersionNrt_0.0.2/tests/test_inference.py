@@ -0,0 +1,68 @@
+# ============================================================
+# Parité des moteurs d'inférence
+# Le moteur NumPy (poids du scaler repliés dans la régression
+# logistique) doit donner les mêmes classes et les mêmes
+# probabilités que le pipeline scikit-learn.
+# ============================================================
+
+import numpy as np
+
+from app.models.inference import NumpyInference, SklearnInference, build_inference, check_parity
+from app.schemas.schema import get_field_bounds
+
+
+def test_numpy_engine_matches_sklearn_on_dataset(model, data_matrix):
+    sklearn_labels, sklearn_probas = SklearnInference(model).predict_with_proba(data_matrix)
+    numpy_labels, numpy_probas = NumpyInference.from_pipeline(model).predict_with_proba(data_matrix)
+
+    np.testing.assert_array_equal(numpy_labels, sklearn_labels)
+    np.testing.assert_array_equal(numpy_labels, model.predict(data_matrix))
+    np.testing.assert_allclose(numpy_probas, sklearn_probas, rtol=0, atol=1e-9)
+
+
+def test_numpy_engine_matches_sklearn_on_input_bounds(model):
+    # Coins et points au hasard de l'espace accepté par InputData
+    rng = np.random.default_rng(0)
+    bounds = [get_field_bounds(name) for name in ("gender", "age", "estimated_salary")]
+    input_array = np.column_stack([rng.integers(low, high + 1, 5_000) for low, high in bounds]).astype(float)
+    input_array[:2] = [[low for low, _ in bounds], [high for _, high in bounds]]
+
+    sklearn_labels, sklearn_probas = SklearnInference(model).predict_with_proba(input_array)
+    numpy_labels, numpy_probas = NumpyInference.from_pipeline(model).predict_with_proba(input_array)
+
+    np.testing.assert_array_equal(numpy_labels, sklearn_labels)
+    np.testing.assert_allclose(numpy_probas, sklearn_probas, rtol=0, atol=1e-9)
+
+
+def test_check_parity_report(model):
+    from app.config.config import DATA_PATH
+
+    report = check_parity(model, DATA_PATH)
+    assert report["ok"], report
+    assert report["rows"] == 400
+
+
+def test_build_inference_backends(model):
+    assert isinstance(build_inference(model, "numpy"), NumpyInference)
+    assert isinstance(build_inference(model, "sklearn"), SklearnInference)
+
+
+def test_proba_table_matches_sklearn(model, tmp_path):
+    from app.models.proba_table import build_table, load_table
+
+    path = tmp_path / "proba_table.npy"
+    build_table(build_inference(model), "test", path=path, salary_step=5_000)
+    table = load_table("test", path)
+
+    rng = np.random.default_rng(0)
+    bounds = [get_field_bounds(name) for name in ("gender", "age")]
+    rows = np.column_stack(
+        [rng.integers(low, high + 1, 500) for low, high in bounds] + [rng.integers(0, 31, 500) * 5_000]
+    )
+    sklearn_labels, sklearn_probas = SklearnInference(model).predict_with_proba(rows.astype(float))
+    looked_up = [table.lookup(*row) for row in rows.tolist()]
+
+    np.testing.assert_array_equal([label for label, _ in looked_up], sklearn_labels)
+    np.testing.assert_array_equal([proba for _, proba in looked_up], np.round(sklearn_probas, 4))
+    # Salaire hors de la grille : pas de valeur dans la table
+    assert table.lookup(0, 30, 5_001) is None
@@ -0,0 +1,19 @@
+# ============================================================
+# Registre de métriques partagé par les deux API
+# (app/services/metrics.py) : seules les familles mesurées
+# apparaissent dans GET /metrics
+# ============================================================
+
+from app.services.metrics import Metrics
+
+
+def test_families_without_samples_are_not_rendered():
+    registry = Metrics()
+    registry.counter("used_total", "Compteur utilisé", ("route",))
+    registry.histogram("unused_seconds", "Histogramme jamais mesuré", ("stage",))
+    registry.inc("used_total", "/predict")
+
+    text = registry.render()
+    assert '# TYPE used_total counter' in text
+    assert 'used_total{route="/predict"} 1' in text
+    assert "unused_seconds" not in text
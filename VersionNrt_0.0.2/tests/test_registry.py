@@ -0,0 +1,67 @@
+# ============================================================
+# Tests du registre des modèles (app/models/registry.py)
+# Un chargement demandé par une route asynchrone se fait dans
+# un thread, et la version (sha) est celle des octets chargés.
+# ============================================================
+
+import asyncio
+import os
+import shutil
+import threading
+
+from app.config.config import MODEL_PATH
+from app.models import registry as registry_module
+from app.models.load_model import file_sha256
+from app.models.registry import ModelRegistry
+
+
+def test_load_and_reload_run_outside_the_event_loop(tmp_path, monkeypatch):
+    shutil.copy(MODEL_PATH, tmp_path / "model.joblib")
+    registry = ModelRegistry(tmp_path, reload_interval=0)
+
+    threads = []
+    read_model = registry_module.read_model
+
+    def recording_read_model(path):
+        threads.append(threading.current_thread())
+        return read_model(path)
+
+    monkeypatch.setattr(registry_module, "read_model", recording_read_model)
+
+    async def scenario():
+        first = await registry.get_async()
+        # Même contenu, nouvelle date de modification : le registre recharge le fichier
+        stat = os.stat(tmp_path / "model.joblib")
+        os.utime(tmp_path / "model.joblib", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        second = await registry.get_async()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert len(threads) == 2
+    assert all(thread is not threading.main_thread() for thread in threads)
+    assert second is not first
+    assert first.sha == second.sha == file_sha256(tmp_path / "model.joblib")[:12]
+    # Sans changement du fichier, le modèle est servi directement, sans rechargement
+    assert asyncio.run(registry.get_async()) is second
+    assert len(threads) == 2
+
+
+def test_catalog_version_describes_the_bytes_that_were_loaded(tmp_path, monkeypatch):
+    from app.models import catalog as catalog_module
+
+    path = tmp_path / "model.joblib"
+    shutil.copyfile(MODEL_PATH, path)
+    spec = catalog_module.ModelSpec("copy", "pipeline", path, "InputData")
+    read_model = catalog_module.read_model
+
+    def read_then_replace(model_path):
+        # Le fichier est remplacé juste après avoir été lu : la version doit rester celle des octets lus
+        loaded = read_model(model_path)
+        path.write_bytes(b"autre contenu")
+        return loaded
+
+    monkeypatch.setattr(catalog_module, "read_model", read_then_replace)
+    loaded = catalog_module.ModelCache({"copy": spec}, budget_bytes=1 << 30).get("copy")
+    assert loaded.sha == file_sha256(MODEL_PATH)[:12]
+    assert loaded.file_size == os.path.getsize(MODEL_PATH)
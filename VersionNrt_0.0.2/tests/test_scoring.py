@@ -0,0 +1,62 @@
+# ============================================================
+# Lecture du flux de POST /ml/predict/stream : découpage en
+# lignes par-dessus les blocs reçus, lignes mal encodées ou
+# trop longues rejetées sans interrompre le reste du fichier
+# ============================================================
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.services.scoring import iter_lines
+
+
+def _lines(chunks, max_line_bytes=64):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [item async for item in iter_lines(stream(), max_line_bytes)]
+
+    return asyncio.run(collect())
+
+
+def test_lines_are_split_across_chunks():
+    assert _lines([b"a,b\r\nc", b"d", b",e\nf"]) == [("a,b", None), ("cd,e", None), ("f", None)]
+
+
+def test_invalid_utf8_rejects_only_its_line():
+    lines = _lines([b"ok\n\xff\xfe,1\nsuite\n"])
+    assert lines[0] == ("ok", None)
+    assert lines[1][0] is None and "UTF-8" in lines[1][1]
+    assert lines[2] == ("suite", None)
+
+
+def test_long_line_is_rejected_without_buffering_it():
+    # La ligne trop longue arrive en plusieurs blocs, sans retour à la ligne entre eux
+    lines = _lines([b"debut\n" + b"x" * 50, b"x" * 50, b"x" * 50, b"\nfin"], max_line_bytes=64)
+    assert lines[0] == ("debut", None)
+    assert lines[1][0] is None and "trop longue" in lines[1][1]
+    assert lines[2] == ("fin", None)
+    assert _lines([b"x" * 100])[0][0] is None
+
+
+def test_stream_reports_bad_lines_in_order():
+    from app.main import app
+
+    body = (
+        b"User ID,Gender,Age,EstimatedSalary\n"
+        b"1,Male,30,50000\n"
+        b"2,Fem\xe9le,30,50000\n"
+        b"3," + b"9" * 70_000 + b",30,50000\n"
+        b"4,Female,47,110000\n"
+    )
+    with TestClient(app) as client:
+        response = client.post("/ml/predict/stream", content=body, headers={"content-type": "text/csv"})
+    assert response.status_code == 200
+    rows = response.text.splitlines()[1:]
+    assert [row.split(",")[0] for row in rows] == ["1", "", "", "4"]
+    assert "ligne 3 : Ligne mal encodée" in rows[1]
+    assert "ligne 4 : Ligne trop longue" in rows[2]
+    assert rows[3].split(",")[1] == "1"
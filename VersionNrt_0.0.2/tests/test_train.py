@@ -0,0 +1,98 @@
+# ============================================================
+# Entraînement par blocs (app/train.py) : séparation apprentissage /
+# contrôle, écriture des fichiers d'une version, mise à jour
+# ============================================================
+
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.config.config import DATA_PATH
+from app.models.load_model import file_sha256, get_model_version
+from app.services.drift import load_profile
+from app.train import artifact_paths, iter_training_chunks, main, train
+
+
+@pytest.fixture(scope="module")
+def halves(tmp_path_factory):
+    """Social_Network_Ads.csv coupé en deux fichiers (entraînement initial, puis mise à jour)."""
+    directory = tmp_path_factory.mktemp("data")
+    frame = pd.read_csv(DATA_PATH)
+    first, second = directory / "first.csv", directory / "second.csv"
+    frame.iloc[:250].to_csv(first, index=False)
+    frame.iloc[250:].to_csv(second, index=False)
+    return first, second
+
+
+def test_holdout_split_follows_the_file_position_across_chunks(tmp_path):
+    path = tmp_path / "rows.csv"
+    rows = [f"{i},Male,{20 + i},{20_000 + i},{i % 2}" for i in range(10)]
+    # Ligne 3 illisible, ligne 7 sans cible valide : rejetées sans décaler la position des autres
+    rows[3] = "3,Robot,23,20003,1"
+    rows[7] = "7,Male,27,20007,2"
+    path.write_text("User ID,Gender,Age,EstimatedSalary,Purchased\n" + "\n".join(rows) + "\n")
+
+    chunks = list(iter_training_chunks([path], chunk_rows=3, holdout_every=4))
+    ages = np.concatenate([X[:, 1] for _, X, _, _, _ in chunks])
+    holdout = np.concatenate([mask for _, _, _, mask, _ in chunks])
+    assert ages.tolist() == [20, 21, 22, 24, 25, 26, 28, 29]
+    # Positions 0, 4 et 8 du fichier
+    assert ages[holdout].tolist() == [20, 24, 28]
+    assert sum(rejected for *_, rejected in chunks) == 2
+
+    # Même séparation quelle que soit la taille des blocs
+    again = np.concatenate([mask for *_, mask, _ in iter_training_chunks([path], chunk_rows=100, holdout_every=4)])
+    assert again.tolist() == holdout.tolist()
+    none = np.concatenate([mask for *_, mask, _ in iter_training_chunks([path], chunk_rows=3, holdout_every=0)])
+    assert not none.any()
+
+
+def test_fit_writes_the_model_metadata_and_drift_profile(tmp_path, halves):
+    metadata = train([halves[0]], "v1", epochs=3, chunk_rows=64, holdout_every=5, models_dir=tmp_path)
+    model_path, metadata_path = artifact_paths("v1", tmp_path)
+
+    assert json.loads(metadata_path.read_text()) == metadata
+    assert metadata["model_sha256"] == file_sha256(model_path)
+    assert metadata["parent_version"] is None
+    assert metadata["rows_seen"] == 200 and metadata["metrics"]["holdout_rows"] == 50
+    assert metadata["data"] == [{"path": str(halves[0]), "sha256": file_sha256(halves[0]), "rows": 250,
+                                 "rejected_rows": 0}]
+    assert not list(tmp_path.glob("*.tmp"))
+
+    model = joblib.load(model_path)
+    assert model.predict_proba(np.array([[0.0, 30.0, 50_000.0]])).shape == (1, 2)
+    profile = load_profile(model_path.with_suffix(".drift.json"))
+    assert profile["model_sha"] == get_model_version(model_path)
+    assert profile["stats"].rows == 250
+
+    with pytest.raises(ValueError):
+        train([halves[0]], "v1", epochs=1, models_dir=tmp_path)
+
+
+def test_update_continues_from_the_base_version(tmp_path, halves):
+    train([halves[0]], "v1", epochs=3, chunk_rows=64, holdout_every=5, models_dir=tmp_path)
+    base_bytes = artifact_paths("v1", tmp_path)[0].read_bytes()
+    base_scaler = joblib.load(artifact_paths("v1", tmp_path)[0]).steps[0][1]
+
+    metadata = train([halves[1]], "v2", base="v1", epochs=3, chunk_rows=64, holdout_every=5, models_dir=tmp_path)
+    assert metadata["parent_version"] == "v1"
+    assert [entry["path"] for entry in metadata["data"]] == [str(halves[0]), str(halves[1])]
+    # Le scaler a accumulé les lignes d'apprentissage des deux fichiers (150 lignes, 30 de contrôle)
+    assert metadata["rows_seen"] == 200 + 120
+    scaler = joblib.load(artifact_paths("v2", tmp_path)[0]).steps[0][1]
+    assert not np.allclose(scaler.mean_, base_scaler.mean_)
+    assert base_scaler.n_samples_seen_ == 200
+    # La version de base n'est pas modifiée
+    assert artifact_paths("v1", tmp_path)[0].read_bytes() == base_bytes
+
+    with pytest.raises(ValueError):
+        train([halves[1]], "v3", base="absente", models_dir=tmp_path)
+
+
+def test_main_rejects_a_holdout_of_one(tmp_path, halves, capsys):
+    assert main(["fit", str(halves[0]), "--version", "v1", "--holdout-every", "1", "--models-dir", str(tmp_path)]) == 1
+    assert "holdout_every" in capsys.readouterr().out
+    assert not list(tmp_path.iterdir())
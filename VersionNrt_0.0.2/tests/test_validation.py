@@ -0,0 +1,132 @@
+# ============================================================
+# Validation par colonnes (app/services/validation.py) contre
+# InputData : pour les mêmes valeurs, les mêmes lignes refusées
+# ============================================================
+
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.schemas.schema import InputData
+from app.services.validation import FEATURES, validate_columns, validate_records
+
+VALID_ROW = {"gender": 1, "age": 30, "estimated_salary": 50_000}
+
+# Valeurs délicates pour un champ int : nombres, textes acceptés ou refusés par Pydantic, autres types
+TRICKY_VALUES = [
+    0, 1, 30, 30.0, 30.5, 1e3, 1e30, 10**400, -1, True, False, None, float("nan"), float("inf"),
+    "1", "30", " 30 ", "+30", "-0", "30.0", "30.00", "0030.000", "3_0", "1_000", "\t45\n",
+    "1e3", "30.5", "30.", ".0", "3__0", "_30", "0x1e", "", " ", "abc", "٣٠", "30.0.0",
+    [30], {"age": 30},
+]
+
+
+def rejected_by_pydantic(records):
+    rejected = set()
+    for row, record in enumerate(records):
+        try:
+            InputData(**record)
+        except ValidationError:
+            rejected.add(row)
+    return rejected
+
+
+def rejected_by_columns(report):
+    return set(np.flatnonzero(report.codes).tolist())
+
+
+def tricky_records():
+    """Chaque valeur délicate dans chaque champ, les autres champs étant valides."""
+    records = []
+    for name in FEATURES:
+        for value in TRICKY_VALUES:
+            records.append({**VALID_ROW, name: value})
+    return records
+
+
+def test_records_reject_the_same_rows_as_input_data():
+    records = tricky_records()
+    assert rejected_by_columns(validate_records(records)) == rejected_by_pydantic(records)
+
+
+@pytest.mark.parametrize("name", FEATURES)
+def test_each_value_alone_in_its_column(name):
+    # Colonne homogène (que des textes, que des nombres...) : chemins rapides de coerce_column
+    for value in TRICKY_VALUES:
+        if isinstance(value, (list, dict)):
+            continue
+        records = [{**VALID_ROW, name: value}] * 3
+        report = validate_records(records)
+        assert rejected_by_columns(report) == rejected_by_pydantic(records), value
+
+
+def test_text_columns_as_read_from_csv():
+    # En CSV, toutes les valeurs arrivent sous forme de texte
+    rng = np.random.default_rng(0)
+    texts = ["30", "45", " 52", "30.0", "1e3", "30.5", "", "+41", "4_0", "abc", "٣٠", "70", "18.000"]
+    records = [
+        {"gender": str(rng.integers(0, 2)), "age": texts[i % len(texts)], "estimated_salary": str(rng.integers(0, 200_000))}
+        for i in range(500)
+    ]
+    columns = {name: [record[name] for record in records] for name in FEATURES}
+    assert rejected_by_columns(validate_columns(columns)) == rejected_by_pydantic(records)
+
+
+def test_random_mixed_batches():
+    rng = np.random.default_rng(1)
+    records = []
+    for _ in range(2_000):
+        record = dict(VALID_ROW)
+        for name in FEATURES:
+            if rng.random() < 0.2:
+                record[name] = TRICKY_VALUES[rng.integers(len(TRICKY_VALUES))]
+        records.append(record)
+    assert rejected_by_columns(validate_records(records)) == rejected_by_pydantic(records)
+
+
+def test_unreadable_instances_are_a_422_not_a_500():
+    from app.main import app
+
+    with TestClient(app) as client:
+        for row in ({"gender": [1], "age": 30, "estimated_salary": 1}, {**VALID_ROW, "age": "1e3"}):
+            response = client.post("/ml/predict/batch", content=json.dumps({"instances": [row]}))
+            assert response.status_code == 422, response.text
+        response = client.post("/ml/predict/batch", json={"instances": [{**VALID_ROW, "age": "30.0"}]})
+        assert response.status_code == 200
+
+
+def test_body_that_is_not_utf8_is_a_422():
+    from app.main import app
+
+    with TestClient(app) as client:
+        response = client.post("/ml/predict/batch", content=b"\xff\xfe", headers={"content-type": "application/json"})
+    assert response.status_code == 422, response.text
+    assert response.json()["detail"][0]["type"] == "json_invalid"
+
+
+def test_columns_that_are_not_lists_are_a_422():
+    from app.main import app
+
+    bodies = [
+        ({"gender": {"x": 0}, "age": [30], "estimated_salary": [1000]}, "gender"),
+        ({"gender": "01", "age": "33", "estimated_salary": [1000, 2000]}, "gender"),
+        ({"gender": [0], "age": 30, "estimated_salary": [1000]}, "age"),
+    ]
+    with TestClient(app) as client:
+        for columns, name in bodies:
+            response = client.post("/ml/predict/batch", json={"columns": columns})
+            assert response.status_code == 422, response.text
+            assert response.json()["detail"] == f"La colonne {name} doit être une liste de valeurs"
+
+
+@pytest.mark.parametrize("name", ["purchase", "iris"])
+def test_catalog_body_that_is_not_utf8_is_a_422(name):
+    from app.main import app
+
+    with TestClient(app) as client:
+        response = client.post(f"/models/{name}/predict", content=b"\xff\xfe", headers={"content-type": "application/json"})
+    assert response.status_code == 422, response.text
+    assert response.json()["detail"][0]["type"] == "json_invalid"
@@ -0,0 +1,369 @@
+# ============================================================
+# Suite de benchmarks des deux versions de l'API
+# - micro-benchmarks : inférence, validation Pydantic et sérialisation
+#   de la réponse, mesurées isolément (timeit)
+# - charge : générateur de requêtes dans le même processus (httpx +
+#   transport ASGI, sans réseau) contre POST /ml/predict (v0.0.2) et
+#   GET /predict (v0.0.1), à plusieurs niveaux de concurrence
+# Les résultats sont écrits en JSON et comparés à une référence
+# (baseline) : toute métrique dégradée au-delà du seuil est signalée.
+#
+# La référence dépend de la machine : aucune n'est versionnée par
+# défaut. On l'enregistre une fois sur la machine de mesure (elle
+# peut ensuite être versionnée) ; tant qu'elle n'existe pas, la
+# comparaison est simplement sautée, avec un message.
+#
+# Utilisation (depuis la racine du dépôt) :
+#   python benchmarks/bench_api.py --save-baseline        # enregistre la référence (benchmarks/baseline.json)
+#   python benchmarks/bench_api.py --fail-on-regression   # compare à la référence
+# ============================================================
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import timeit
+import warnings
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent
+REPO = ROOT.parent
+V1_DIR = REPO / "VersionNrt_0.0.1"
+V2_DIR = REPO / "VersionNrt_0.0.2"
+DEFAULT_OUTPUT = ROOT / "results" / "latest.json"
+DEFAULT_BASELINE = ROOT / "baseline.json"
+
+# Le package "app" de la v0.0.2 doit passer avant VersionNrt_0.0.1/app.py (le frontend Streamlit)
+sys.path.insert(0, str(V2_DIR))
+
+# Le modèle d'achat a été entraîné sur un DataFrame : les appels avec un tableau NumPy
+# déclenchent un avertissement de scikit-learn à chaque prédiction
+warnings.filterwarnings("ignore", category=UserWarning)
+
+
+def load_v1():
+    """Importe VersionNrt_0.0.1/main.py sous le nom iris_main (son import local : compiled_tree)."""
+    sys.path.append(str(V1_DIR))
+    spec = importlib.util.spec_from_file_location("iris_main", V1_DIR / "main.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def environment():
+    """Décrit la machine et le code mesurés (pour ne comparer que des runs comparables)."""
+    import fastapi
+    import pydantic
+    import sklearn
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "scikit-learn": sklearn.__version__,
+        "fastapi": fastapi.__version__,
+        "pydantic": pydantic.__version__,
+    }
+
+
+# ============================================================
+# Micro-benchmarks
+# ============================================================
+
+def measure(fn, repeat=5):
+    """
+    Mesure une fonction sans argument avec timeit.
+
+    timeit choisit le nombre d'appels par mesure (au moins 0,2 s), puis on répète
+    `repeat` fois : le minimum est la valeur la plus stable, la médiane montre le bruit.
+
+    Returns:
+        dict: Durée d'un appel en nanosecondes (min et médiane) et nombre d'appels par mesure
+    """
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    runs = [total / number * 1e9 for total in timer.repeat(repeat=repeat, number=number)]
+    return {"ns_per_op": round(min(runs), 1), "median_ns_per_op": round(float(np.median(runs)), 1), "number": number}
+
+
+def micro_benchmarks(v1):
+    """
+    Mesure isolément chaque étape d'une prédiction.
+
+    Returns:
+        dict: Les mesures, par nom de benchmark
+    """
+    from app.models.inference import build_inference
+    from app.models.registry import registry
+    from app.router.route import get_table
+    from app.schemas.schema import InputData, PredictionResponse, BatchInputData, BatchPredictionResponse
+
+    loaded = registry.get()
+    numpy_engine = build_inference(loaded.model, "numpy")
+    sklearn_engine = build_inference(loaded.model, "sklearn")
+
+    rng = np.random.default_rng(0)
+    rows = np.column_stack([
+        rng.integers(0, 2, 1000), rng.integers(18, 61, 1000), rng.integers(0, 150_001, 1000)
+    ]).astype(float)
+    one_row = rows[:1]
+    row = {"gender": 1, "age": 42, "estimated_salary": 87_000}
+    row_json = json.dumps(row).encode()
+    batch = {"instances": [
+        {"gender": int(g), "age": int(a), "estimated_salary": int(s)} for g, a, s in rows
+    ]}
+    predictions, probabilities = numpy_engine.predict_with_proba(rows)
+    batch_response = {"predictions": predictions.tolist(), "probabilities": np.round(probabilities, 4).tolist()}
+
+    benchmarks = {
+        "inference.numpy.1_row": lambda: numpy_engine.predict_with_proba(one_row),
+        "inference.numpy.1000_rows": lambda: numpy_engine.predict_with_proba(rows),
+        "inference.sklearn.1_row": lambda: sklearn_engine.predict_with_proba(one_row),
+        "inference.sklearn.1000_rows": lambda: sklearn_engine.predict_with_proba(rows),
+        "validation.InputData.dict": lambda: InputData.model_validate(row),
+        "validation.InputData.json": lambda: InputData.model_validate_json(row_json),
+        "validation.BatchInputData.1000_rows": lambda: BatchInputData.model_validate(batch),
+        "serialization.PredictionResponse": lambda: PredictionResponse.model_validate(
+            {"prediction": 1, "probability": 0.8734}
+        ).model_dump_json(),
+        "serialization.BatchPredictionResponse.1000_rows": lambda: BatchPredictionResponse.model_validate(
+            batch_response
+        ).model_dump_json(),
+        "v0.0.1.inference.1_row": lambda: v1._predict(5.1, 3.5, 1.4, 0.2),
+    }
+    table = get_table(loaded)
+    if table is not None:
+        benchmarks["inference.proba_table.1_row"] = lambda: table.lookup(1, 42, 87_000)
+
+    results = {}
+    for name, fn in benchmarks.items():
+        results[name] = measure(fn)
+        print(f"  {name:<50} {results[name]['ns_per_op'] / 1000:>10.2f} µs", flush=True)
+    return results
+
+
+# ============================================================
+# Charge : générateur de requêtes en mémoire (httpx + ASGI)
+# ============================================================
+
+def purchase_requests(seed):
+    """Requêtes POST /ml/predict aléatoires (graine fixe : les mêmes à chaque run)."""
+    rng = random.Random(seed)
+    while True:
+        yield "POST", "/ml/predict", {"json": {
+            "gender": rng.randint(0, 1), "age": rng.randint(18, 60), "estimated_salary": rng.randint(0, 150_000)
+        }}
+
+
+def purchase_batch_requests(seed, size=100):
+    """Requêtes POST /ml/predict/batch de `size` lignes aléatoires."""
+    rng = random.Random(seed)
+    while True:
+        yield "POST", "/ml/predict/batch", {"json": {"instances": [
+            {"gender": rng.randint(0, 1), "age": rng.randint(18, 60), "estimated_salary": rng.randint(0, 150_000)}
+            for _ in range(size)
+        ]}}
+
+
+def iris_requests(seed):
+    """Requêtes GET /predict aléatoires, au pas de 0.1 des sliders du frontend."""
+    rng = random.Random(seed)
+    while True:
+        yield "GET", "/predict", {"params": {
+            "sepal_length": rng.randint(43, 79) / 10, "sepal_width": rng.randint(20, 44) / 10,
+            "petal_length": rng.randint(10, 69) / 10, "petal_width": rng.randint(1, 25) / 10,
+        }}
+
+
+async def run_load(client, make_requests, concurrency, total, warmup=50):
+    """
+    Envoie `total` requêtes avec `concurrency` clients simultanés.
+
+    Returns:
+        dict: Débit (requêtes/s), latences p50/p95/p99/max en ms et nombre de réponses par statut
+    """
+    requests = make_requests(seed=concurrency)
+    for _ in range(warmup):
+        method, path, kwargs = next(requests)
+        await client.request(method, path, **kwargs)
+
+    queue = [next(requests) for _ in range(total)]
+    latencies = []
+    statuses = Counter()
+
+    async def worker(worker_index):
+        for method, path, kwargs in queue[worker_index::concurrency]:
+            start = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+        "status": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+async def load_target(app, make_requests, levels, total, ready_path=None):
+    """Démarre l'application (lifespan compris), attend qu'elle soit prête puis mesure chaque niveau de concurrence."""
+    import httpx
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            if ready_path:
+                while (await client.get(ready_path)).status_code != 200:
+                    await asyncio.sleep(0.05)
+            for concurrency in levels:
+                results[f"c{concurrency}"] = result = await run_load(client, make_requests, concurrency, total)
+                print(
+                    f"    concurrence {concurrency:>4} : {result['throughput_rps']:>9} req/s, "
+                    f"p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, p99 {result['p99_ms']} ms",
+                    flush=True,
+                )
+    return results
+
+
+def load_benchmarks(v1, levels, total):
+    """Mesure les endpoints de prédiction des deux versions."""
+    from app.main import app as purchase_app
+
+    targets = {
+        "v0.0.2 POST /ml/predict": (purchase_app, purchase_requests, "/health/ready"),
+        "v0.0.2 POST /ml/predict/batch (100 lignes)": (purchase_app, purchase_batch_requests, "/health/ready"),
+        "v0.0.1 GET /predict": (v1.app, iris_requests, None),
+    }
+    results = {}
+    for name, (app, make_requests, ready_path) in targets.items():
+        print(f"  {name}", flush=True)
+        results[name] = asyncio.run(load_target(app, make_requests, levels, total, ready_path))
+    return results
+
+
+# ============================================================
+# Comparaison avec la référence
+# ============================================================
+
+# Sens de chaque métrique : +1 = plus grand est meilleur, -1 = plus petit est meilleur
+DIRECTIONS = {"ns_per_op": -1, "throughput_rps": 1, "p50_ms": -1, "p95_ms": -1, "p99_ms": -1}
+
+
+def flatten(results):
+    """Aplatit les résultats en {"micro/<nom>/ns_per_op": valeur, "load/<cible>/c8/p99_ms": valeur, ...}."""
+    values = {}
+    for name, result in results.get("micro", {}).items():
+        values[f"micro/{name}/ns_per_op"] = result["ns_per_op"]
+    for target, levels in results.get("load", {}).items():
+        for level, result in levels.items():
+            for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+                values[f"load/{target}/{level}/{metric}"] = result[metric]
+    return values
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare un run à la référence.
+
+    Args:
+        results (dict): Les résultats du run courant
+        baseline (dict): Les résultats de référence
+        threshold (float): Dégradation relative tolérée (0.15 = 15 %)
+
+    Returns:
+        list: Une entrée par métrique présente dans les deux runs, avec regression=True si elle s'est dégradée
+    """
+    current, reference = flatten(results), flatten(baseline)
+    report = []
+    for key in sorted(current.keys() & reference.keys()):
+        before, after = reference[key], current[key]
+        if not before:
+            continue
+        direction = DIRECTIONS[key.rsplit("/", 1)[1]]
+        # change > 0 : amélioration, change < 0 : dégradation (quel que soit le sens de la métrique)
+        change = (after - before) / before * direction
+        report.append({
+            "metric": key,
+            "baseline": before,
+            "current": after,
+            "change": round(change, 4),
+            "regression": change < -threshold,
+        })
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks des deux versions de l'API")
+    parser.add_argument("--only", choices=("micro", "load"), help="Ne lancer qu'une partie de la suite")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64], help="Niveaux de concurrence")
+    parser.add_argument("--requests", type=int, default=2000, help="Requêtes mesurées par niveau et par endpoint")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="Fichier JSON des résultats")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Fichier JSON de référence")
+    parser.add_argument("--save-baseline", action="store_true", help="Enregistrer ce run comme nouvelle référence")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Dégradation tolérée avant de signaler (0.15 = 15 %%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Code de sortie 1 si une métrique régresse")
+    args = parser.parse_args(argv)
+
+    v1 = load_v1()
+    results = {"environment": environment()}
+    if args.only in (None, "micro"):
+        print("Micro-benchmarks", flush=True)
+        results["micro"] = micro_benchmarks(v1)
+    if args.only in (None, "load"):
+        print("Charge (httpx + transport ASGI)", flush=True)
+        results["load"] = load_benchmarks(v1, args.concurrency, args.requests)
+
+    regressions = []
+    if not args.baseline.exists() and not args.save_baseline:
+        print(f"Pas de référence {args.baseline} : comparaison sautée "
+              f"(pour en créer une sur cette machine : python benchmarks/bench_api.py --save-baseline)")
+    elif not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())
+        results["baseline"] = {"file": str(args.baseline), "environment": baseline.get("environment")}
+        results["comparison"] = compare(results, baseline, args.threshold)
+        regressions = [entry for entry in results["comparison"] if entry["regression"]]
+        print(f"Comparaison avec {args.baseline} (seuil {args.threshold:.0%}) : "
+              f"{len(regressions)} régression(s) sur {len(results['comparison'])} métriques")
+        for entry in regressions:
+            print(f"  RÉGRESSION {entry['metric']} : {entry['baseline']} -> {entry['current']} ({entry['change']:+.1%})")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+    print(f"Résultats : {args.output}")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+        print(f"Référence enregistrée : {args.baseline}")
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+# ============================================================
+# Benchmark des formats de POST /ml/predict/batch
+# Compare JSON (lignes ou colonnes), Arrow IPC et tableau NumPy brut sur des lots de
+# 10 000 lignes : débit de bout en bout (encodage client, requête
+# via httpx + transport ASGI, décodage de la réponse) et coût du
+# seul décodage côté serveur.
+#
+# Utilisation (depuis la racine du dépôt) :
+#   python benchmarks/bench_formats.py --rows 10000 --calls 50
+# ============================================================
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import timeit
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "VersionNrt_0.0.2"))
+warnings.filterwarnings("ignore", category=UserWarning)
+
+from app.services.formats import (  # noqa: E402
+    ARROW_STREAM, NDARRAY, RESPONSE_DTYPE, decode_arrow, decode_ndarray,
+)
+from app.router.route import validate_json_batch  # noqa: E402
+
+
+def make_rows(rows, seed=0):
+    """Matrice (rows, 3) aléatoire dans les bornes de InputData."""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.integers(0, 2, rows), rng.integers(18, 61, rows), rng.integers(0, 150_001, rows)
+    ]).astype(np.float64)
+
+
+def arrow_bytes(matrix):
+    """Encode la matrice en flux Arrow IPC (colonnes entières, comme un client typique)."""
+    import pyarrow as pa
+
+    table = pa.table({
+        "gender": matrix[:, 0].astype(np.int8),
+        "age": matrix[:, 1].astype(np.int16),
+        "estimated_salary": matrix[:, 2].astype(np.int32),
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+# Format -> (encodage de la requête côté client, Content-Type, décodage de la réponse côté client)
+def json_request(matrix):
+    instances = [
+        {"gender": int(g), "age": int(a), "estimated_salary": int(s)} for g, a, s in matrix.tolist()
+    ]
+    return json.dumps({"instances": instances}).encode()
+
+
+def json_columns_request(matrix):
+    names = ("gender", "age", "estimated_salary")
+    columns = {name: matrix[:, index].astype(int).tolist() for index, name in enumerate(names)}
+    return json.dumps({"columns": columns}).encode()
+
+
+def json_response(content):
+    body = json.loads(content)
+    return np.asarray(body["predictions"]), np.asarray(body["probabilities"])
+
+
+def arrow_response(content):
+    import pyarrow as pa
+
+    table = pa.ipc.open_stream(content).read_all()
+    return table["prediction"].to_numpy(), table["probability"].to_numpy()
+
+
+def ndarray_response(content):
+    records = np.frombuffer(content, dtype=RESPONSE_DTYPE)
+    return records["prediction"], records["probability"]
+
+
+FORMATS = {
+    "json": (json_request, "application/json", json_response),
+    "json_columns": (json_columns_request, "application/json", json_response),
+    "arrow": (arrow_bytes, ARROW_STREAM, arrow_response),
+    "ndarray": (lambda matrix: matrix.tobytes(), NDARRAY, ndarray_response),
+}
+
+
+async def end_to_end(matrix, calls):
+    """Mesure chaque format de bout en bout et vérifie que les résultats sont identiques."""
+    import httpx
+    from app.main import app
+
+    results, reference = {}, None
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            while (await client.get("/health/ready")).status_code != 200:
+                await asyncio.sleep(0.05)
+            for name, (encode, content_type, decode) in FORMATS.items():
+                durations = []
+                for _ in range(calls + 2):
+                    start = time.perf_counter()
+                    response = await client.post(
+                        "/ml/predict/batch", content=encode(matrix), headers={"content-type": content_type}
+                    )
+                    response.raise_for_status()
+                    predictions, probabilities = decode(response.content)
+                    durations.append(time.perf_counter() - start)
+                durations = durations[2:]  # les deux premiers appels servent de chauffe
+                if reference is None:
+                    reference = (predictions, probabilities)
+                identical = bool(
+                    np.array_equal(predictions, reference[0]) and np.array_equal(probabilities, reference[1])
+                )
+                mean = sum(durations) / len(durations)
+                results[name] = {
+                    "mean_ms": round(mean * 1000, 3),
+                    "p50_ms": round(float(np.median(durations)) * 1000, 3),
+                    "calls_per_s": round(1 / mean, 1),
+                    "rows_per_s": round(len(matrix) / mean),
+                    "request_bytes": len(encode(matrix)),
+                    "response_bytes": len(response.content),
+                    "identical_to_json": identical,
+                }
+    return results
+
+
+def server_decode(matrix):
+    """Mesure le seul décodage + validation côté serveur (hors HTTP) pour chaque format."""
+    bodies = {name: encode(matrix) for name, (encode, _, _) in FORMATS.items()}
+    benchmarks = {
+        "json": lambda: validate_json_batch(bodies["json"]),
+        "json_columns": lambda: validate_json_batch(bodies["json_columns"]),
+        "arrow": lambda: decode_arrow(bodies["arrow"]),
+        "ndarray": lambda: decode_ndarray(bodies["ndarray"]),
+    }
+    results = {}
+    for name, fn in benchmarks.items():
+        timer = timeit.Timer(fn)
+        number, _ = timer.autorange()
+        results[name] = {"decode_ms": round(min(timer.repeat(5, number)) / number * 1000, 4)}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark des formats de POST /ml/predict/batch")
+    parser.add_argument("--rows", type=int, default=10_000, help="Lignes par appel")
+    parser.add_argument("--calls", type=int, default=50, help="Appels mesurés par format")
+    parser.add_argument("--output", type=Path, help="Fichier JSON des résultats")
+    args = parser.parse_args(argv)
+
+    matrix = make_rows(args.rows)
+    results = {"rows": args.rows, "end_to_end": asyncio.run(end_to_end(matrix, args.calls)),
+               "server_decode": server_decode(matrix)}
+
+    base = results["end_to_end"]["json"]["mean_ms"]
+    print(f"Lots de {args.rows} lignes")
+    for name, result in results["end_to_end"].items():
+        print(
+            f"  {name:<12} {result['mean_ms']:>9.2f} ms/appel  {result['rows_per_s']:>11,} lignes/s  "
+            f"x{base / result['mean_ms']:.1f} vs JSON  décodage serveur "
+            f"{results['server_decode'][name]['decode_ms']:.3f} ms  "
+            f"requête {result['request_bytes']:,} o  identique={result['identical_to_json']}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
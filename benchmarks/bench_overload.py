@@ -0,0 +1,306 @@
+# ============================================================
+# Benchmark : surcharge et contrôle d'admission
+# Lance l'API (uvicorn, un processus) avec puis sans contrôle
+# d'admission et lui envoie des requêtes POST /ml/predict/batch à
+# débit fixe ("boucle ouverte" : les clients n'attendent pas les
+# réponses pour envoyer les suivantes, comme du vrai trafic), à
+# 0.5x, 1x, 2x et 4x la capacité mesurée du serveur.
+# En parallèle, une sonde (autre processus) appelle GET /health/live
+# toutes les 50 ms.
+#
+# Attendu : sans contrôle, au-delà de la capacité, la file grossit
+# pendant tout le test et la latence de toutes les requêtes (sondes
+# comprises) explose ; avec le contrôle, les requêtes en trop sont
+# refusées tout de suite (503 + Retry-After, ou 504 si l'échéance
+# X-Request-Deadline est passée) et la latence des requêtes
+# servies reste bornée.
+#
+# Sur une machine à un seul cœur, le générateur, la sonde et le
+# serveur se partagent le CPU : la latence de /health/live mesure
+# alors surtout ce partage. Pour des chiffres exacts, lancer le
+# client sur une autre machine (ou épingler serveur et client sur
+# des cœurs différents avec taskset).
+#
+# Utilisation (depuis la racine du dépôt) :
+#   python benchmarks/bench_overload.py --duration 5 --output benchmarks/results/overload.json
+# ============================================================
+
+import argparse
+import asyncio
+import http.client
+import json
+import multiprocessing
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+APP_DIR = ROOT / "VersionNrt_0.0.2"
+sys.path.insert(0, str(APP_DIR))
+
+from app.config.config import ADMISSION_MAX_CONCURRENT  # noqa: E402
+
+# Serveur de test : le contrôle d'admission est activé ou non selon le premier argument.
+# Le journal d'audit est coupé : ce benchmark mesure la surcharge, pas l'écriture des fichiers Parquet.
+SERVER = """
+import sys
+import uvicorn
+from app.services.admission import admission
+from app.services.audit import audit_log
+admission.enabled = sys.argv[1] == "on"
+admission.max_concurrent = int(sys.argv[3])
+audit_log.enabled = False
+from app.main import app
+uvicorn.run(app, host="127.0.0.1", port=int(sys.argv[2]), log_level="error")
+"""
+
+
+def batch_body(rows, seed=0):
+    """Corps JSON d'un lot de `rows` lignes aléatoires (encodé une fois : le client ne doit pas limiter le débit)."""
+    rng = random.Random(seed)
+    return json.dumps({"instances": [
+        {"gender": rng.randint(0, 1), "age": rng.randint(18, 60), "estimated_salary": rng.randint(0, 150_000)}
+        for _ in range(rows)
+    ]}).encode()
+
+
+async def ready(port):
+    """GET /health/ready répond-il 200 ?"""
+    connection = await Connection.open(port)
+    try:
+        status, _ = await connection.request("GET", "/health/ready")
+    finally:
+        connection.close()
+    return status == 200
+
+
+def start_server(admission, port, max_concurrent):
+    server = subprocess.Popen(
+        [sys.executable, "-W", "ignore", "-c", SERVER, "on" if admission else "off", str(port), str(max_concurrent)],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if asyncio.run(ready(port)):
+                return server
+        except OSError:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    raise TimeoutError("le serveur n'est pas prêt")
+
+
+def percentiles(latencies):
+    """p50 / p99 / max en millisecondes."""
+    if not latencies:
+        return {"p50_ms": None, "p99_ms": None, "max_ms": None}
+    p50, p99 = np.percentile(np.array(latencies) * 1000, [50, 99])
+    return {"p50_ms": round(float(p50), 1), "p99_ms": round(float(p99), 1), "max_ms": round(max(latencies) * 1000, 1)}
+
+
+class Connection:
+    """
+    Client HTTP/1.1 minimal (asyncio, une requête à la fois par connexion).
+
+    httpx coûte trop de CPU pour générer plusieurs centaines de requêtes par seconde sur la même
+    machine que le serveur : c'est le client qui saturerait, pas l'API.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, port):
+        return cls(*await asyncio.open_connection("127.0.0.1", port))
+
+    async def request(self, method, path, body=b"", headers=()):
+        """Envoie une requête et retourne (statut, en-têtes) ; le corps de la réponse est lu et ignoré."""
+        lines = [f"{method} {path} HTTP/1.1", "host: bench", f"content-length: {len(body)}", *headers, "", ""]
+        self.writer.write("\r\n".join(lines).encode() + body)
+        status = int((await self.reader.readline()).split()[1])
+        response_headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+        await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+        return status, response_headers
+
+    def close(self):
+        self.writer.close()
+
+
+async def measure_capacity(port, body, duration, concurrency=4):
+    """Débit maximal (boucle fermée : chaque client renvoie une requête dès qu'il a sa réponse)."""
+    count = 0
+    end = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal count
+        connection = await Connection.open(port)
+        while time.perf_counter() < end:
+            status, _ = await connection.request("POST", "/ml/predict/batch", body, ["content-type: application/json"])
+            count += status == 200
+        connection.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return count / (time.perf_counter() - start)
+
+
+def probe(port, duration, results):
+    """
+    Sonde GET /health/live toutes les 50 ms, dans un processus à part.
+
+    Dans le processus du générateur, la mesure inclurait le retard de sa propre boucle asyncio
+    (des centaines de requêtes en cours) au lieu du temps de réponse du serveur.
+    """
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    latencies = []
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        connection.request("GET", "/health/live")
+        connection.getresponse().read()
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.05)
+    connection.close()
+    results.put(latencies)
+
+
+async def open_loop(port, body, rate, duration, deadline_ms, timeout):
+    """
+    Envoie rate requêtes par seconde pendant duration secondes, sans attendre les réponses.
+
+    Returns:
+        dict: Débit offert et servi, réponses par statut, latences des réponses 200, de toutes les réponses
+        et de la sonde GET /health/live
+    """
+    statuses = Counter()
+    served, answered = [], []
+    # Connexions libres (keep-alive) ; une nouvelle est ouverte quand toutes sont occupées
+    idle = []
+
+    async def one():
+        headers = ["content-type: application/json"]
+        if deadline_ms:
+            headers.append(f"x-request-deadline: {time.time() + deadline_ms / 1000:.3f}")
+        start = time.perf_counter()
+        connection = None
+        try:
+            connection = idle.pop() if idle else await Connection.open(port)
+            status, response_headers = await asyncio.wait_for(
+                connection.request("POST", "/ml/predict/batch", body, headers), timeout
+            )
+        except asyncio.TimeoutError:
+            statuses["timeout"] += 1
+            connection.close()
+            return
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+            statuses["error"] += 1
+            if connection is not None:
+                connection.close()
+            return
+        latency = time.perf_counter() - start
+        statuses[str(status)] += 1
+        answered.append(latency)
+        if status == 200:
+            served.append(latency)
+        if response_headers.get("connection") == "close":
+            connection.close()
+        else:
+            idle.append(connection)
+
+    probes = multiprocessing.Queue()
+    prober = multiprocessing.Process(target=probe, args=(port, duration, probes))
+    prober.start()
+    start = time.perf_counter()
+    tasks = []
+    for i in range(int(rate * duration)):
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one()))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    probe_latencies = probes.get()
+    prober.join()
+    for connection in idle:
+        connection.close()
+
+    return {
+        "offered_rps": round(rate, 1),
+        "served_rps": round(len(served) / elapsed, 1),
+        "status": dict(sorted(statuses.items())),
+        "served": percentiles(served),
+        "all_responses": percentiles(answered),
+        "health_live": percentiles(probe_latencies),
+        "seconds": round(elapsed, 2),
+    }
+
+
+def run(admission, args, body):
+    server = start_server(admission, args.port, args.max_concurrent)
+    try:
+        capacity = asyncio.run(measure_capacity(args.port, body, args.capacity_seconds))
+        results = {"capacity_rps": round(capacity, 1), "levels": {}}
+        print(f"  capacité mesurée : {capacity:.1f} req/s", flush=True)
+        for load in args.loads:
+            result = asyncio.run(open_loop(args.port, body, capacity * load, args.duration, args.deadline_ms,
+                                           args.timeout))
+            results["levels"][f"x{load}"] = result
+            print(
+                f"  {load:>4}x ({result['offered_rps']:>7} req/s) : servies {result['served_rps']:>7} req/s, "
+                f"p99 servies {result['served']['p99_ms']} ms, "
+                f"p99 /health/live {result['health_live']['p99_ms']} ms, "
+                f"{result['status']}",
+                flush=True,
+            )
+            # Le serveur doit vider sa file avant le niveau suivant
+            time.sleep(1)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Surcharge de POST /ml/predict/batch avec et sans contrôle d'admission"
+    )
+    parser.add_argument("--rows", type=int, default=1000, help="Lignes par lot (le coût d'une requête)")
+    parser.add_argument("--loads", type=float, nargs="+", default=[0.5, 1, 2, 4],
+                        help="Débits en multiples de la capacité")
+    parser.add_argument("--duration", type=float, default=5.0, help="Durée de chaque niveau (secondes)")
+    parser.add_argument("--capacity-seconds", type=float, default=3.0, help="Durée de la mesure de capacité")
+    parser.add_argument("--deadline-ms", type=float, default=2000,
+                        help="Échéance envoyée par le client (0 = aucune)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Timeout du client (secondes)")
+    parser.add_argument("--max-concurrent", type=int, default=ADMISSION_MAX_CONCURRENT,
+                        help="Requêtes traitées en même temps par le serveur (ADMISSION_MAX_CONCURRENT)")
+    parser.add_argument("--port", type=int, default=8791)
+    parser.add_argument("--output", type=Path, help="Fichier JSON où écrire les résultats")
+    args = parser.parse_args(argv)
+
+    body = batch_body(args.rows)
+    results = {"rows_per_request": args.rows, "deadline_ms": args.deadline_ms, "max_concurrent": args.max_concurrent}
+    for admission in (False, True):
+        name = "admission" if admission else "sans_admission"
+        print(f"{name}", flush=True)
+        results[name] = run(admission, args, body)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+        print(f"Résultats : {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# ============================================================
+# Benchmark de la validation des lots
+# Compare, pour le même lot (100 000 lignes par défaut) :
+#   - la construction d'un InputData (Pydantic) par ligne
+#   - BatchInputData.model_validate_json sur le corps JSON
+#   - la validation par colonnes (app/services/validation.py) :
+#     colonnes déjà séparées, lignes {champ: valeur}, et corps JSON
+#     complet ("instances" ou "columns", décodage compris)
+# Une partie des lignes peut être invalide (--invalid) : le
+# rapport d'erreurs est alors construit et vérifié contre Pydantic.
+#
+# Utilisation (depuis la racine du dépôt) :
+#   python benchmarks/bench_validation.py --rows 100000 --invalid 0.01
+# ============================================================
+
+import argparse
+import json
+import sys
+import timeit
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "VersionNrt_0.0.2"))
+warnings.filterwarnings("ignore", category=UserWarning)
+
+from pydantic import ValidationError  # noqa: E402
+
+from app.schemas.schema import BatchInputData, InputData  # noqa: E402
+from app.services.validation import FEATURES, validate_columns, validate_records  # noqa: E402
+
+
+def make_records(rows, invalid, seed=0):
+    """Lignes aléatoires dans les bornes de InputData, dont une fraction `invalid` hors bornes ou manquantes."""
+    rng = np.random.default_rng(seed)
+    matrix = np.column_stack([
+        rng.integers(0, 2, rows), rng.integers(18, 61, rows), rng.integers(0, 150_001, rows)
+    ])
+    records = [dict(zip(FEATURES, row)) for row in matrix.tolist()]
+    for index in rng.choice(rows, int(rows * invalid), replace=False).tolist():
+        if index % 2:
+            records[index]["age"] = 75
+        else:
+            del records[index]["estimated_salary"]
+    return records
+
+
+def per_row(records):
+    """Un InputData par ligne ; les lignes refusées sont comptées."""
+    rejected = 0
+    for record in records:
+        try:
+            InputData(**record)
+        except ValidationError:
+            rejected += 1
+    return rejected
+
+
+def validate_json(body):
+    """BatchInputData sur le corps JSON ; un lot invalide lève ValidationError, comme dans l'API."""
+    try:
+        return BatchInputData.model_validate_json(body)
+    except ValidationError as exc:
+        return exc.error_count()
+
+
+def timed(fn):
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(3, number)) / number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validation par lignes (Pydantic) contre validation par colonnes")
+    parser.add_argument("--rows", type=int, default=100_000, help="Lignes du lot")
+    parser.add_argument("--invalid", type=float, default=0.01, help="Fraction de lignes invalides")
+    parser.add_argument("--output", type=Path, help="Fichier JSON des résultats")
+    args = parser.parse_args(argv)
+
+    records = make_records(args.rows, args.invalid)
+    columns = {name: [record.get(name) for record in records] for name in FEATURES}
+    instances_body = json.dumps({"instances": records}).encode()
+    columns_body = json.dumps({"columns": columns}).encode()
+
+    # Même verdict ligne par ligne que Pydantic
+    report = validate_records(records)
+    assert report.n_invalid == per_row(records), "la validation par colonnes ne refuse pas les mêmes lignes"
+
+    benchmarks = {
+        "pydantic_par_ligne": lambda: per_row(records),
+        "pydantic_model_validate_json": lambda: validate_json(instances_body),
+        "colonnes": lambda: validate_columns(columns).errors(),
+        "colonnes_depuis_lignes": lambda: validate_records(records).errors(),
+        "corps_json_instances": lambda: validate_records(json.loads(instances_body)["instances"]).errors(),
+        "corps_json_columns": lambda: validate_columns(json.loads(columns_body)["columns"]).errors(),
+    }
+    results = {"rows": args.rows, "invalid_rows": report.n_invalid, "timings": {}}
+    base = None
+    print(f"Lot de {args.rows:,} lignes, dont {report.n_invalid:,} invalides")
+    for name, fn in benchmarks.items():
+        seconds = timed(fn)
+        base = base or seconds
+        results["timings"][name] = {"ms": round(seconds * 1000, 3), "speedup": round(base / seconds, 1)}
+        print(f"  {name:<30} {seconds * 1000:>10.2f} ms  x{base / seconds:>6.1f}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+# ============================================================
+# Benchmark : montée en charge du lanceur multi-processus
+# Lance "python -m app.serve" avec 1, 2, 4... workers, envoie
+# des requêtes POST /ml/predict depuis plusieurs processus clients
+# et mesure le débit, la latence et la mémoire de chaque worker.
+#
+# Utilisation (depuis la racine du dépôt, Linux) :
+#   python benchmarks/bench_workers.py --workers 1 2 4 --duration 10
+# ============================================================
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP_DIR = ROOT / "VersionNrt_0.0.2"
+sys.path.insert(0, str(APP_DIR))
+
+from app.serve import read_memory  # noqa: E402
+
+
+def wait_ready(port, timeout=60):
+    """Attend que GET /health/ready réponde 200."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/health/ready")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError("le serveur n'est pas prêt")
+
+
+def client(port, duration, seed, results):
+    """Un processus client : une connexion keep-alive, requêtes en boucle pendant duration secondes."""
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    headers = {"Content-Type": "application/json"}
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        body = json.dumps({
+            "gender": rng.randint(0, 1),
+            "age": rng.randint(18, 60),
+            "estimated_salary": rng.randint(0, 150_000),
+        })
+        start = time.perf_counter()
+        connection.request("POST", "/ml/predict", body, headers)
+        connection.getresponse().read()
+        latencies.append(time.perf_counter() - start)
+    results.put(latencies)
+
+
+def worker_pids(parent_pid):
+    """Liste les processus enfants du lanceur (Linux)."""
+    try:
+        with open(f"/proc/{parent_pid}/task/{parent_pid}/children") as file:
+            return [int(pid) for pid in file.read().split()]
+    except OSError:
+        return []
+
+
+def run(workers, clients, duration, port):
+    """Mesure un lanceur avec `workers` workers."""
+    server = subprocess.Popen(
+        [sys.executable, "-W", "ignore", "-m", "app.serve", "--workers", str(workers),
+         "--port", str(port), "--report-interval", "0"],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(port)
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=client, args=(port, duration, seed, results))
+            for seed in range(clients)
+        ]
+        for process in processes:
+            process.start()
+        latencies = sorted(latency for _ in processes for latency in results.get())
+        for process in processes:
+            process.join()
+        memory = [read_memory(pid) for pid in worker_pids(server.pid)]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    count = len(latencies)
+    return {
+        "workers": workers,
+        "clients": clients,
+        "requests": count,
+        "throughput_rps": round(count / duration, 1),
+        "p50_ms": round(latencies[count // 2] * 1000, 3) if count else None,
+        "p99_ms": round(latencies[int(count * 0.99)] * 1000, 3) if count else None,
+        "worker_rss_mb": [m["rss_mb"] for m in memory],
+        "worker_pss_mb": [m["pss_mb"] for m in memory],
+        "worker_shared_mb": [m["shared_mb"] for m in memory],
+    }
+
+
+def main(argv=None):
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, cores}))
+    parser.add_argument("--clients", type=int, default=2 * cores, help="Processus clients (défaut : 2 x cœurs)")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for workers in args.workers:
+        row = run(workers, args.clients, args.duration, args.port)
+        row["speedup"] = round(row["throughput_rps"] / rows[0]["throughput_rps"], 2) if rows else 1.0
+        rows.append(row)
+        print(
+            f"{workers:>3} workers : {row['throughput_rps']:>9} req/s (x{row['speedup']}), "
+            f"p50 {row['p50_ms']} ms, p99 {row['p99_ms']} ms, PSS/worker {row['worker_pss_mb']} Mo",
+            flush=True,
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"cores": cores, "results": rows}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+# ============================================================
+# Recherche de modèles pour les deux versions de l'API
+# Le notebook entraîne une seule configuration par version
+# (LogisticRegression par défaut pour l'achat, DecisionTreeClassifier
+# par défaut pour Iris). Ce script évalue une grille de candidats
+# (régularisation, poids des classes, profondeur des arbres, autres
+# estimateurs) par validation croisée, sur tous les cœurs, et donne
+# pour chacun :
+#   - l'accuracy moyenne (et son écart-type) sur les folds
+#   - le temps d'entraînement
+#   - la latence d'inférence par ligne : une ligne seule (cas de
+#     POST /ml/predict et GET /predict) et par lot
+# pour choisir un modèle sur le compromis latence / qualité, pas
+# seulement sur l'accuracy.
+#
+# Les folds prétraités (StandardScaler ajusté sur chaque fold
+# d'entraînement, comme dans les notebooks) sont gardés sur disque
+# avec joblib.Memory : relancer une recherche ne les recalcule pas,
+# tant que le fichier de données n'a pas changé (son empreinte fait
+# partie de la clé du cache).
+#
+# Utilisation (depuis la racine du dépôt) :
+#   python benchmarks/search_models.py                     # les deux jeux de données
+#   python benchmarks/search_models.py --dataset iris --folds 10 --jobs 4
+# ============================================================
+
+import argparse
+import json
+import os
+import sys
+import time
+import timeit
+import warnings
+from pathlib import Path
+
+import numpy as np
+from joblib import Memory, Parallel, delayed
+
+ROOT = Path(__file__).resolve().parent
+REPO = ROOT.parent
+V2_DIR = REPO / "VersionNrt_0.0.2"
+DEFAULT_OUTPUT = ROOT / "results" / "model_search.json"
+DEFAULT_CACHE_DIR = ROOT / "results" / "cache"
+
+sys.path.insert(0, str(V2_DIR))
+warnings.filterwarnings("ignore", category=UserWarning)
+# Certains candidats (C très petit, peu d'itérations) ne convergent pas : ils sont évalués quand même
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+from app.config.config import DATA_PATH, GENDER_ENCODING  # noqa: E402
+from app.models.load_model import file_sha256  # noqa: E402
+
+# Graine des folds : la même à chaque recherche (les folds en cache restent valables)
+SEED = 42
+
+
+def load_dataset(name):
+    """
+    Charge un jeu de données comme dans les notebooks.
+
+    Returns:
+        tuple: (X, y) en float64 / int64
+    """
+    if name == "purchase":
+        import pandas as pd
+
+        data = pd.read_csv(DATA_PATH)
+        X = np.column_stack([
+            data["Gender"].map(GENDER_ENCODING), data["Age"], data["EstimatedSalary"]
+        ]).astype(np.float64)
+        return X, data["Purchased"].to_numpy(dtype=np.int64)
+    if name == "iris":
+        from sklearn.datasets import load_iris
+
+        data = load_iris()
+        return data.data.astype(np.float64), data.target.astype(np.int64)
+    raise ValueError(f"Jeu de données inconnu : {name}")
+
+
+def data_version(name):
+    """
+    Empreinte des données d'un jeu : SHA-256 du CSV pour purchase, version de scikit-learn pour iris
+    (jeu fourni avec la bibliothèque).
+    """
+    if name == "purchase":
+        return file_sha256(DATA_PATH)
+    import sklearn
+
+    return f"scikit-learn {sklearn.__version__}"
+
+
+def prepare_fold(dataset, data_sha, n_splits, fold):
+    """
+    Prétraite un fold : StandardScaler ajusté sur la partie entraînement seulement.
+
+    Mise en cache sur disque par main() (joblib.Memory) : la clé est (dataset, data_sha, n_splits, fold).
+    data_sha (data_version) n'est pas utilisé par le calcul : il change la clé quand le fichier
+    de données change, pour ne pas relire des folds calculés sur d'anciennes données.
+
+    Returns:
+        tuple: (X_train, X_test, y_train, y_test) standardisés
+    """
+    from sklearn.model_selection import StratifiedKFold
+    from sklearn.preprocessing import StandardScaler
+
+    X, y = load_dataset(dataset)
+    splits = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=SEED).split(X, y)
+    train, test = list(splits)[fold]
+    scaler = StandardScaler().fit(X[train])
+    return scaler.transform(X[train]), scaler.transform(X[test]), y[train], y[test]
+
+
+def prepare_full(dataset, data_sha):
+    """Tout le jeu de données standardisé (pour mesurer la latence du modèle final ; data_sha : voir prepare_fold)."""
+    from sklearn.preprocessing import StandardScaler
+
+    X, y = load_dataset(dataset)
+    return StandardScaler().fit_transform(X), y
+
+
+def candidates(dataset):
+    """
+    La grille de candidats d'un jeu de données.
+
+    Returns:
+        list: Des (nom, estimateur non entraîné), le premier étant le modèle actuel du notebook
+    """
+    from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression, SGDClassifier
+    from sklearn.model_selection import ParameterGrid
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.svm import SVC
+    from sklearn.tree import DecisionTreeClassifier
+
+    # (nom, classe, grille de paramètres) ; {} = paramètres par défaut
+    if dataset == "purchase":
+        grids = [
+            ("actuel", LogisticRegression, {}),
+            ("logreg", LogisticRegression, {"C": [0.01, 0.1, 1.0, 10.0], "class_weight": [None, "balanced"]}),
+            ("sgd", SGDClassifier, {"loss": ["log_loss"], "alpha": [1e-4, 1e-3, 1e-2], "average": [True]}),
+            ("tree", DecisionTreeClassifier, {"max_depth": [3, 5, 8, None], "class_weight": [None, "balanced"]}),
+            ("forest", RandomForestClassifier, {"n_estimators": [50, 200], "max_depth": [4, 8]}),
+            ("hgb", HistGradientBoostingClassifier, {"max_depth": [3, None], "learning_rate": [0.05, 0.1]}),
+            ("knn", KNeighborsClassifier, {"n_neighbors": [5, 15, 31]}),
+            ("svc", SVC, {"C": [0.3, 1.0, 3.0], "probability": [True]}),
+        ]
+    else:
+        grids = [
+            ("actuel", DecisionTreeClassifier, {}),
+            ("tree", DecisionTreeClassifier, {"max_depth": [2, 3, 4, 6], "min_samples_leaf": [1, 5]}),
+            ("logreg", LogisticRegression, {"C": [0.1, 1.0, 10.0], "max_iter": [1000]}),
+            ("forest", RandomForestClassifier, {"n_estimators": [50, 200], "max_depth": [3, None]}),
+            ("knn", KNeighborsClassifier, {"n_neighbors": [3, 7, 15]}),
+            ("svc", SVC, {"C": [0.3, 1.0, 3.0]}),
+        ]
+
+    result = []
+    for name, estimator, grid in grids:
+        for params in ParameterGrid(grid):
+            # Graine fixe pour les estimateurs aléatoires : les résultats sont reproductibles
+            if "random_state" in estimator().get_params():
+                params = {**params, "random_state": SEED}
+            label = name if not grid else name + "(" + ", ".join(
+                f"{key}={value}" for key, value in sorted(params.items()) if key != "random_state"
+            ) + ")"
+            result.append((label, estimator(**params)))
+    return result
+
+
+def evaluate_fold(prepare, dataset, data_sha, n_splits, fold, estimator):
+    """
+    Entraîne un candidat sur un fold (exécuté dans un processus du pool).
+
+    Returns:
+        tuple: (accuracy, durée d'entraînement en secondes)
+    """
+    from sklearn.base import clone
+
+    X_train, X_test, y_train, y_test = prepare(dataset, data_sha, n_splits, fold)
+    model = clone(estimator)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    return float((model.predict(X_test) == y_test).mean()), fit_seconds
+
+
+def measure_latency(estimator, X, y, batch_rows=1000):
+    """
+    Mesure la latence d'inférence du candidat entraîné sur tout le jeu de données.
+
+    La mesure est faite dans le processus principal, après la validation croisée, pour
+    ne pas être faussée par les autres entraînements qui occupent les cœurs.
+
+    Returns:
+        dict: Latence d'une ligne seule (µs) et latence par ligne d'un lot de batch_rows lignes (µs)
+    """
+    from sklearn.base import clone
+
+    model = clone(estimator).fit(X, y)
+    # predict_proba quand il existe : c'est ce que l'API appelle
+    predict = model.predict_proba if hasattr(model, "predict_proba") else model.predict
+    row = X[:1]
+    batch = np.resize(X, (batch_rows, X.shape[1]))
+
+    def best(fn, budget=0.02):
+        # Environ budget secondes par répétition (autorange, qui vise 0.2 s, rendrait la recherche trop longue)
+        timer = timeit.Timer(fn)
+        number = max(1, int(budget / max(timer.timeit(1), 1e-7)))
+        return min(timer.repeat(5, number)) / number
+
+    return {
+        "single_row_us": round(best(lambda: predict(row)) * 1e6, 2),
+        "batch_us_per_row": round(best(lambda: predict(batch)) / batch_rows * 1e6, 3),
+    }
+
+
+def pareto_front(results):
+    """
+    Marque les candidats qu'aucun autre ne bat à la fois en accuracy et en latence d'une ligne.
+
+    Ce sont les seuls choix raisonnables : tout autre candidat a un concurrent plus précis et plus rapide.
+    """
+    for result in results:
+        result["pareto"] = not any(
+            other["accuracy"] >= result["accuracy"] and other["single_row_us"] <= result["single_row_us"]
+            and (other["accuracy"] > result["accuracy"] or other["single_row_us"] < result["single_row_us"])
+            for other in results
+        )
+
+
+def search(dataset, n_splits, jobs, memory):
+    """
+    Évalue tous les candidats d'un jeu de données.
+
+    Returns:
+        dict: Les résultats triés par accuracy décroissante, et l'état du cache des folds
+    """
+    prepare = memory.cache(prepare_fold)
+    data_sha = data_version(dataset)
+    cached_folds = sum(prepare.check_call_in_cache(dataset, data_sha, n_splits, fold) for fold in range(n_splits))
+    # Les folds manquants sont calculés une fois ici : les processus du pool ne font que les relire
+    for fold in range(n_splits):
+        prepare(dataset, data_sha, n_splits, fold)
+
+    grid = candidates(dataset)
+    start = time.perf_counter()
+    scores = Parallel(n_jobs=jobs)(
+        delayed(evaluate_fold)(prepare, dataset, data_sha, n_splits, fold, estimator)
+        for _, estimator in grid
+        for fold in range(n_splits)
+    )
+    search_seconds = time.perf_counter() - start
+
+    X, y = memory.cache(prepare_full)(dataset, data_sha)
+    results = []
+    for index, (name, estimator) in enumerate(grid):
+        accuracies, fit_times = zip(*scores[index * n_splits:(index + 1) * n_splits])
+        results.append({
+            "candidate": name,
+            "accuracy": round(float(np.mean(accuracies)), 4),
+            "accuracy_std": round(float(np.std(accuracies)), 4),
+            "fit_ms": round(float(np.mean(fit_times)) * 1000, 2),
+            **measure_latency(estimator, X, y),
+        })
+    pareto_front(results)
+    results.sort(key=lambda result: (-result["accuracy"], result["single_row_us"]))
+    return {
+        "rows": len(y),
+        "folds": n_splits,
+        "cached_folds": cached_folds,
+        "search_seconds": round(search_seconds, 2),
+        "candidates": results,
+    }
+
+
+def print_results(dataset, report):
+    print(
+        f"\n{dataset} : {len(report['candidates'])} candidats x {report['folds']} folds en "
+        f"{report['search_seconds']} s ({report['cached_folds']}/{report['folds']} folds lus depuis le cache)"
+    )
+    print(f"  {'candidat':<58} {'accuracy':>15} {'fit ms':>8} {'1 ligne µs':>11} {'lot µs/ligne':>13}")
+    for result in report["candidates"]:
+        marker = "*" if result["pareto"] else " "
+        print(
+            f"{marker} {result['candidate']:<58} {result['accuracy']:>7.4f} ±{result['accuracy_std']:.3f} "
+            f"{result['fit_ms']:>8.2f} {result['single_row_us']:>11.1f} {result['batch_us_per_row']:>13.3f}"
+        )
+    print("  * : front de Pareto (aucun autre candidat n'est à la fois plus précis et plus rapide)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recherche de modèles (validation croisée parallèle)")
+    parser.add_argument("--dataset", nargs="+", choices=["purchase", "iris"], default=["purchase", "iris"])
+    parser.add_argument("--folds", type=int, default=5, help="Nombre de folds de la validation croisée")
+    parser.add_argument("--jobs", type=int, default=-1, help="Processus en parallèle (-1 = tous les cœurs)")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR, help="Cache des folds prétraités")
+    parser.add_argument("--clear-cache", action="store_true", help="Recalculer les folds")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="Fichier JSON des résultats")
+    args = parser.parse_args(argv)
+
+    memory = Memory(args.cache_dir, verbose=0)
+    if args.clear_cache:
+        memory.clear(warn=False)
+
+    results = {"cpu_count": os.cpu_count(), "jobs": args.jobs}
+    for dataset in args.dataset:
+        results[dataset] = search(dataset, args.folds, args.jobs, memory)
+        print_results(dataset, results[dataset])
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"\nRésultats : {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())